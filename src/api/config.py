@@ -41,6 +41,7 @@ CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost
 LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://localhost:11434/v1")
 LLM_API_KEY = os.getenv("LLM_API_KEY") or os.getenv("ANTHROPIC_API_KEY") or "ollama"
 LLM_MODEL = os.getenv("LLM_MODEL", "qwen3-coder:latest")  # Default model for evals judge
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() == "true"  # Request response_format=json_object from the judge
 
 # Agent LLM (can be different from eval judge)
 # Key resolution order: AGENT_LLM_API_KEY → LLM_API_KEY → ANTHROPIC_API_KEY → "ollama"
@@ -65,6 +66,12 @@ CUA_API_KEY = os.getenv("CUA_API_KEY") or os.getenv("LLM_API_KEY") or os.getenv(
 # Evaluation Configuration
 MAX_CONCURRENT_TESTS = int(os.getenv("MAX_CONCURRENT_TESTS", "1"))
 EVALUATION_TIMEOUT_SECONDS = int(os.getenv("EVALUATION_TIMEOUT_SECONDS", "900"))  # 15 min — CU Agent with larger models needs time for multi-step browser tasks
+RESULT_FLUSH_DELAY_SECONDS = float(os.getenv("RESULT_FLUSH_DELAY_SECONDS", "0.5"))  # Debounce window for batching test-result DB writes
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # Max in-flight LLM calls across the process (provider RPM guard)
+JUDGE_COALESCE_WINDOW_MS = int(os.getenv("JUDGE_COALESCE_WINDOW_MS", "0"))  # >0 merges batched judge prompts from concurrent tests arriving within this window (0 = off)
+JUDGE_COALESCE_MAX_BATCH = int(os.getenv("JUDGE_COALESCE_MAX_BATCH", "8"))  # Max prompts merged into one coalesced judge call
+JUDGE_CACHE_MAX_ENTRIES = int(os.getenv("JUDGE_CACHE_MAX_ENTRIES", "2048"))  # LRU size for cached judge responses (runs with judge_cache_enabled)
+PROPOSAL_MAX_INPUT_TOKENS = int(os.getenv("PROPOSAL_MAX_INPUT_TOKENS", "24000"))  # Estimated input-token budget per proposal LLM call (0 = no limit)
 
 # ==============================================================================
 # RETRY CONFIGURATION FOR RATE LIMITING (Feature: rate-limit-retry)
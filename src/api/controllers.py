@@ -56,6 +56,10 @@ evaluator = get_evaluator_service(db)
 # ===========================================================================
 from dataclasses import dataclass, field as dc_field
 
+_JOB_QUEUE_MAXSIZE = 8
+# Window for coalescing bursts of status/error messages into one SSE write
+_SSE_COALESCE_SECONDS = 0.05
+
 @dataclass
 class _GenerationJob:
     agent_id: str
@@ -65,8 +69,31 @@ class _GenerationJob:
     errors: list = dc_field(default_factory=list)
     completed: bool = False
     task: asyncio.Task = None  # type: ignore[assignment]
-    # Queue for SSE consumers — proposals are pushed here AND saved to DB
-    queue: asyncio.Queue = dc_field(default_factory=asyncio.Queue)
+    # Queue for SSE consumers — proposals are pushed here AND saved to DB.
+    # Bounded so a slow client throttles the producer instead of letting
+    # proposals pile up in memory.
+    queue: asyncio.Queue = dc_field(default_factory=lambda: asyncio.Queue(maxsize=_JOB_QUEUE_MAXSIZE))
+    consumers: int = 0  # Number of SSE streams currently reading the queue
+
+    async def publish(self, msg: dict) -> None:
+        """Push a message for SSE consumers.
+
+        With a consumer attached this awaits queue space (backpressure). With
+        nobody listening the oldest queued message is dropped instead so the
+        task never stalls — proposals are already persisted to the DB and a
+        reconnecting page reloads them from there.
+        """
+        if self.consumers > 0:
+            await self.queue.put(msg)
+            return
+        while self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(msg)
+
+    def drain(self) -> None:
+        """Discard queued messages, unblocking a producer waiting in publish()."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
 
 _active_proposal_generations: Dict[str, _GenerationJob] = {}
 
@@ -1275,7 +1302,7 @@ async def generate_proposals(agent_id: str, request: GenerateProposalsRequest =
 async def _run_generation_task(job: _GenerationJob, evaluation_ids, judge_rubric, include_reasoning):
     """Background task that runs the LLM proposal generation.
 
-    Pushes each proposal (or error/done sentinel) onto job.queue so that
+    Pushes each proposal (or error/status/done sentinel) onto job.queue so that
     any connected SSE consumer can read them. Also saves proposals to DB
     (handled by the evaluator).  Survives SSE disconnects — the task keeps
     running even if no client is listening.
@@ -1294,19 +1321,21 @@ async def _run_generation_task(job: _GenerationJob, evaluation_ids, judge_rubric
 
             if isinstance(proposal, dict) and proposal.get("_error"):
                 job.errors.append(proposal.get("message", "Unknown error"))
-                await job.queue.put({"_type": "error", "pattern": proposal.get("pattern"), "message": proposal.get("message")})
+                await job.publish({"_type": "error", "pattern": proposal.get("pattern"), "message": proposal.get("message")})
+            elif isinstance(proposal, dict) and proposal.get("_status"):
+                await job.publish({"_type": "status", "pattern": proposal.get("pattern"), "message": proposal.get("message")})
             else:
                 proposal_data = proposal if isinstance(proposal, dict) else proposal.dict() if hasattr(proposal, 'dict') else proposal
                 job.proposals_generated += 1
                 logger.info(f"Generation task: proposal {job.proposals_generated} for agent {job.agent_id}: {proposal_data.get('title', '?')}")
-                await job.queue.put({"_type": "proposal", "data": proposal_data})
+                await job.publish({"_type": "proposal", "data": proposal_data})
 
     except Exception as e:
         logger.error(f"Generation task error for agent {job.agent_id}: {e}", exc_info=True)
-        await job.queue.put({"_type": "fatal_error", "message": str(e)})
+        await job.publish({"_type": "fatal_error", "message": str(e)})
     finally:
         job.completed = True
-        await job.queue.put({"_type": "done", "total": job.proposals_generated, "errors": job.errors,
+        await job.publish({"_type": "done", "total": job.proposals_generated, "errors": job.errors,
                              "cancelled": job.cancel_event.is_set()})
         _active_proposal_generations.pop(job.agent_id, None)
         logger.info(f"Generation task finished for agent {job.agent_id}: {job.proposals_generated} proposals, {len(job.errors)} errors")
@@ -1343,7 +1372,19 @@ async def generate_proposals_stream(agent_id: str, request: GenerateProposalsReq
             include_reasoning=request.include_reasoning if request else False,
         ))
 
+    def format_event(msg: dict) -> str:
+        if msg["_type"] == "proposal":
+            return f"data: {json.dumps(msg['data'], default=str)}\n\n"
+        if msg["_type"] == "error":
+            return f"data: {json.dumps({'status': 'llm_error', 'pattern': msg.get('pattern'), 'message': msg.get('message')})}\n\n"
+        if msg["_type"] == "status":
+            return f"data: {json.dumps({'status': 'skipped', 'pattern': msg.get('pattern'), 'message': msg.get('message')})}\n\n"
+        if msg["_type"] == "fatal_error":
+            return f"data: {json.dumps({'error': msg['message']})}\n\n"
+        return f"data: {json.dumps({'done': True, 'total': msg['total'], 'errors': msg.get('errors', []), 'cancelled': msg.get('cancelled', False)})}\n\n"
+
     async def event_generator():
+        job.consumers += 1
         try:
             yield f"data: {json.dumps({'status': 'analyzing', 'message': 'Analyzing annotation patterns...'})}\n\n"
             while True:
@@ -1354,20 +1395,35 @@ async def generate_proposals_stream(agent_id: str, request: GenerateProposalsReq
                     yield f"data: {json.dumps({'status': 'keepalive', 'proposals_so_far': job.proposals_generated})}\n\n"
                     continue
 
-                if msg["_type"] == "proposal":
-                    yield f"data: {json.dumps(msg['data'], default=str)}\n\n"
-                elif msg["_type"] == "error":
-                    yield f"data: {json.dumps({'status': 'llm_error', 'pattern': msg.get('pattern'), 'message': msg.get('message')})}\n\n"
-                elif msg["_type"] == "fatal_error":
-                    yield f"data: {json.dumps({'error': msg['message']})}\n\n"
-                elif msg["_type"] == "done":
-                    yield f"data: {json.dumps({'done': True, 'total': msg['total'], 'errors': msg.get('errors', []), 'cancelled': msg.get('cancelled', False)})}\n\n"
+                # Coalesce a burst of messages into a single write; status
+                # messages (LLM errors, skipped patterns) briefly wait for followers.
+                frames = [format_event(msg)]
+                done = msg["_type"] == "done"
+                while not done:
+                    if job.queue.empty():
+                        if msg["_type"] not in ("error", "status"):
+                            break
+                        try:
+                            msg = await asyncio.wait_for(job.queue.get(), timeout=_SSE_COALESCE_SECONDS)
+                        except asyncio.TimeoutError:
+                            break
+                    else:
+                        msg = job.queue.get_nowait()
+                    frames.append(format_event(msg))
+                    done = msg["_type"] == "done"
+                yield "".join(frames)
+                if done:
                     return
         except asyncio.CancelledError:
             logger.info(f"SSE consumer disconnected for agent {agent_id} — background task continues")
         except Exception as e:
             logger.error(f"SSE event_generator error for agent {agent_id}: {e}", exc_info=True)
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            job.consumers -= 1
+            if job.consumers == 0 and not job.completed:
+                # Nobody is listening any more — release a producer blocked on a full queue
+                job.drain()
 
     return StreamingResponse(
         event_generator(),
@@ -2241,6 +2297,8 @@ async def rerun_evaluation(evaluation_id: str, background_tasks: BackgroundTasks
         agent_endpoint=agent.agent_invocation_url,
         timeout_seconds=original.timeout_seconds,
         verbose_logging=original.verbose_logging,
+        judge_cache_enabled=original.judge_cache_enabled,
+        fast_fail_enabled=original.fast_fail_enabled,
     )
     eval_run = await evaluator.create_evaluation_run(eval_request)
     background_tasks.add_task(evaluator.start_evaluation, eval_run.id)
@@ -2273,6 +2331,8 @@ async def rerun_selected(evaluation_id: str, body: RerunSelectedRequest, backgro
         agent_endpoint=agent.agent_invocation_url,
         timeout_seconds=original.timeout_seconds,
         verbose_logging=original.verbose_logging,
+        judge_cache_enabled=original.judge_cache_enabled,
+        fast_fail_enabled=original.fast_fail_enabled,
         prompt_version=original.prompt_version,
         prompt_id=original.prompt_id,
         judge_config_id=original.judge_config_id,
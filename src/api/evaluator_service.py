@@ -31,7 +31,7 @@ FEATURES IMPLEMENTED IN THIS MODULE:
 5. EVALUATION CANCELLATION (Feature: cancel-evaluation)
    - cancel_evaluation_run() API endpoint to manually cancel evaluations
    - Properly marks evaluation as "cancelled" with completion timestamp
-   - Cleans up associated locks to prevent resource leaks
+   - Flushes buffered results and cancels the run's in-flight test tasks
 
 6. TIMING TRACKING (Feature: timing-metrics)
    - Tracks agent_call_duration, judge_call_duration, total_duration per test
@@ -43,18 +43,42 @@ FEATURES IMPLEMENTED IN THIS MODULE:
    - Parses structured JSON response with per-assertion results
    - Reduces LLM calls by 3-5x compared to evaluating each assertion individually
    - Falls back to single-assertion evaluation on parse failure
+   - Optionally coalesces batched prompts from concurrent tests into one
+     LLM call (Feature: judge-coalescing, JUDGE_COALESCE_WINDOW_MS)
+   - Runs with judge_cache_enabled reuse responses for byte-identical judge
+     prompts from an in-process LRU backed by the judge_cache table
+     (Feature: judge-cache)
+
+8. BATCHED RESULT WRITES (Feature: batched-result-writes)
+   - Completed test results are buffered per evaluation run in memory
+   - A debounced flush writes the whole batch with one DB update
+   - Orchestrator force-flushes after all tests finish and on cancellation
+
+9. POOLED HTTP CLIENTS (Feature: pooled-http)
+   - One long-lived httpx.AsyncClient each for agent calls, progress polls
+     and Ollama model unloads, so keep-alive connections are reused
+   - The LLM judge client is an AsyncOpenAI on a pooled httpx.AsyncClient
+     with raised connection limits (no thread hop per judge call)
+   - aclose() releases them on application shutdown
 
 ==============================================================================
 """
 
 import asyncio
+import functools
+import hashlib
 import json
 import os
 import random
 import time
+import uuid
+from collections import Counter, OrderedDict, defaultdict
 from datetime import datetime, timezone
+from types import SimpleNamespace
 from typing import Dict, List, Optional, Any
+from urllib.parse import urlparse
 import httpx
+import orjson
 
 from .models import (
     EvaluationRun, EvaluationRunStatus, Agent,
@@ -62,7 +86,7 @@ from .models import (
     ToolExpectationResult, ArgumentAssertionResult, AssertionResult,
     ResponseQualityResult, BehaviorAssertionResult, BehaviorAssertion,
     ResponseQualityAssertion, ArgumentAssertion,
-    PromptProposal, CostRecord
+    PromptProposal, CostRecord, RubricScoreResult, StatusHistoryEntry
 )
 from .sqlite_service import SQLiteService
 from . import config
@@ -94,62 +118,129 @@ _openai_client = None
 # Template rendering utilities for judge configs
 # ==============================================================================
 
+_PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+
+
+def _compile_template(template_str: str) -> tuple:
+    """Split a {{variable}} prompt template into literal text and placeholder names.
+
+    Even positions of the returned tuple are literal text, odd positions are
+    placeholder names. Compile once, render many times with _render_compiled.
+    """
+    return tuple(_PLACEHOLDER_RE.split(template_str))
+
+
+def _render_compiled(compiled: tuple, context: Dict[str, Any]) -> str:
+    """Render a template compiled by _compile_template in a single pass."""
+    out = list(compiled)
+    for i in range(1, len(out), 2):
+        name = out[i]
+        try:
+            value = context[name]  # may compute a lazy field (see _LazyTemplateContext)
+        except KeyError:
+            out[i] = "{{" + name + "}}"
+            continue
+        out[i] = str(value) if value is not None else ""
+    return "".join(out)
+
+
 def _render_template(template_str: str, context: Dict[str, Any]) -> str:
     """Render a judge prompt template by replacing {{variable}} placeholders.
 
-    Uses simple string replacement (no Jinja2 dependency). Unrecognised
+    Uses simple placeholder substitution (no Jinja2 dependency). Unrecognised
     placeholders are left as-is so the template still makes sense if a
     variable is not provided for a given assertion type.
     """
-    result = template_str
-    for key, value in context.items():
-        result = result.replace("{{" + key + "}}", str(value) if value is not None else "")
-    return result
+    return _render_compiled(_compile_template(template_str), context)
 
 
-def _try_deterministic_assertion(assertion_text: str, argument_name: str, tool_name: str, tool_calls: list) -> Optional[dict]:
-    """Try to evaluate a tool-argument assertion deterministically (no LLM).
+# Built-in proposal user prompt, used when the proposal_generation_user system
+# prompt is missing. Same {{variable}} syntax as the DB template. Sections
+# shared by every pattern of a run come first and the pattern itself last, so
+# the pattern calls share the longest possible cacheable prefix.
+_PROPOSAL_USER_TEMPLATE = _compile_template("""You are a prompt engineering expert. Analyze this agent failure pattern and suggest ONE specific system prompt improvement.
 
-    Handles common patterns like:
-      - "X should contain Y"
-      - "X should contain Y and Z"
-      - "URL should contain example.com and /path"
+CURRENT SYSTEM PROMPT:
+{{current_prompt}}
 
-    Returns {"passed": bool, "reasoning": str} if it could evaluate deterministically,
-    or None if the assertion needs LLM evaluation.
-    """
-    text = assertion_text.strip().lower()
+{{tool_failure_summary}}
 
-    # Pattern: "[arg] should contain X [and Y [and Z]]"
-    # Match: "should contain", "must contain", "contains"
-    contain_match = re.match(
-        r'^(?:(?:the\s+)?(?:\w+)\s+)?(?:should|must|needs to)\s+contain\s+(.+)$',
-        text,
-    )
+- Sample corrections suggested: {{correction_samples}}
+
+{{correction_examples}}
+
+{{concrete_examples}}
+{{rubric_section}}
+FAILURE PATTERN FROM HUMAN ANNOTATIONS:
+- Issue "{{tag}}" occurred {{count}} times across {{total_runs}} test runs
+- Sample annotator notes: {{sample_notes}}
+- Number of incorrect action annotations: {{action_issues_count}}
+{{dedup_section}}
+Based on these specific failures and tool-level patterns, provide a targeted improvement that addresses the root cause.
+Respond as JSON with these exact fields:
+{{json_fields}}""")
+
+# Stands in for {{json_fields}} in the user message: the field spec itself is
+# appended to the proposal system message, which is identical for every call
+_PROPOSAL_FIELDS_POINTER = "(the fields are listed in the system message)"
+
+
+# Pattern: "[arg] should contain X [and Y [and Z]]"
+# Match: "should contain", "must contain", "contains"
+_CONTAIN_RE = re.compile(r'^(?:(?:the\s+)?(?:\w+)\s+)?(?:should|must|needs to)\s+contain\s+(.+)$')
+_AND_SPLIT_RE = re.compile(r'\s+and\s+')
+
+# Detect qualitative / semantic assertions that need LLM evaluation.
+# If a required item looks like a description rather than a concrete value,
+# fall through to LLM.  Heuristics:
+#   - Starts with an article ("a ", "an ", "some ", "any ")
+#   - Contains parenthetical qualifiers like "(not empty ...)"
+#   - Contains negation words ("not", "non-empty", "at least")
+_QUALITATIVE_PREFIXES = ("a ", "an ", "some ", "any ", "at least ")
+_QUALITATIVE_MARKERS = ("(", "not ", "non-", "at least", "should", "must")
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_contain_assertion(assertion_text: str) -> Optional[tuple]:
+    """Parse a "should contain X and Y" assertion into its required substrings.
+
+    Returns the tuple of required items, or None if the assertion is not of a
+    form that can be checked deterministically. Cached — the same assertion
+    texts recur across every test case and run.
+    """
+    contain_match = _CONTAIN_RE.match(assertion_text.strip().lower())
     if not contain_match:
-        return None  # can't handle this assertion deterministically
+        return None
 
     # Extract the required substrings (split on " and ")
     required_part = contain_match.group(1).strip()
-    required_items = [item.strip().strip("'\"") for item in re.split(r'\s+and\s+', required_part)]
+    required_items = tuple(item.strip().strip("'\"") for item in _AND_SPLIT_RE.split(required_part))
 
     if not required_items:
         return None
 
-    # Detect qualitative / semantic assertions that need LLM evaluation.
-    # If a required item looks like a description rather than a concrete value,
-    # fall through to LLM.  Heuristics:
-    #   - Starts with an article ("a ", "an ", "some ", "any ")
-    #   - Contains parenthetical qualifiers like "(not empty ...)"
-    #   - Contains negation words ("not", "non-empty", "at least")
-    _QUALITATIVE_PREFIXES = ("a ", "an ", "some ", "any ", "at least ")
-    _QUALITATIVE_MARKERS = ("(", "not ", "non-", "at least", "should", "must")
     for item in required_items:
-        item_lower = item.lower()
-        if any(item_lower.startswith(p) for p in _QUALITATIVE_PREFIXES):
+        if item.startswith(_QUALITATIVE_PREFIXES):
             return None  # qualitative — needs LLM
-        if any(m in item_lower for m in _QUALITATIVE_MARKERS):
+        if any(m in item for m in _QUALITATIVE_MARKERS):
             return None  # qualitative — needs LLM
+    return required_items
+
+
+def _try_deterministic_assertion(assertion_text: str, argument_name: str, tool_name: str, tool_calls: list) -> Optional[dict]:
+    """Try to evaluate a tool-argument assertion deterministically (no LLM).
+
+    Handles common patterns like:
+      - "X should contain Y"
+      - "X should contain Y and Z"
+      - "URL should contain example.com and /path"
+
+    Returns {"passed": bool, "reasoning": str} if it could evaluate deterministically,
+    or None if the assertion needs LLM evaluation.
+    """
+    required_items = _parse_contain_assertion(assertion_text)
+    if required_items is None:
+        return None  # can't handle this assertion deterministically
 
     # Find the actual argument value from tool calls
     actual_value = None
@@ -167,12 +258,12 @@ def _try_deterministic_assertion(assertion_text: str, argument_name: str, tool_n
 
     # Check each required substring (case-insensitive)
     actual_lower = actual_value.lower()
-    missing = [item for item in required_items if item.lower() not in actual_lower]
+    missing = [item for item in required_items if item not in actual_lower]  # items are lowercase
 
     if not missing:
         return {
             "passed": True,
-            "reasoning": f"Deterministic check: '{actual_value}' contains all required substrings: {required_items}."
+            "reasoning": f"Deterministic check: '{actual_value}' contains all required substrings: {list(required_items)}."
         }
     else:
         return {
@@ -181,6 +272,49 @@ def _try_deterministic_assertion(assertion_text: str, argument_name: str, tool_n
         }
 
 
+def _deterministic_rubric_checks(test_case, test_exec) -> Optional[List[dict]]:
+    """Resolve all of a test case's assertions without the LLM, if possible.
+
+    Only tool-argument assertions can be checked deterministically, so a test
+    with behavior or response-quality assertions (or with none at all) returns
+    None, as does one where any assertion needs the LLM.
+    """
+    if getattr(test_case, 'behavior_assertions', None) or getattr(test_case, 'response_quality_expectation', None):
+        return None
+    results = []
+    for tool_exp in getattr(test_case, 'tool_expectations', None) or []:
+        for arg in tool_exp.arguments:
+            for assertion_text in arg.assertion:
+                result = _try_deterministic_assertion(assertion_text, arg.name, tool_exp.name, test_exec.tool_calls)
+                if result is None:
+                    return None
+                results.append(result)
+    return results or None
+
+
+# Which evaluation checks each assertion mode activates (read-only, shared)
+_EVALUATION_MODE_MAP: Dict[str, Dict[str, bool]] = {
+    "response_only": {
+        "eval_expected_tools": False,
+        "eval_tool_assertions": False,
+        "eval_behavior_assertions": False,
+        "eval_response_quality": True,
+    },
+    "tool_level": {
+        "eval_expected_tools": True,
+        "eval_tool_assertions": True,
+        "eval_behavior_assertions": False,
+        "eval_response_quality": True,
+    },
+    "hybrid": {
+        "eval_expected_tools": False,
+        "eval_tool_assertions": False,
+        "eval_behavior_assertions": True,
+        "eval_response_quality": True,
+    },
+}
+
+
 def _get_evaluation_mode_behavior(assertion_mode: str) -> Dict[str, bool]:
     """Return which evaluation checks to perform based on assertion mode.
 
@@ -188,28 +322,30 @@ def _get_evaluation_mode_behavior(assertion_mode: str) -> Dict[str, bool]:
     - response_only: Only evaluate response quality assertion
     - tool_level: Full evaluation (expected tools + tool assertions + response quality)
     - hybrid: Evaluate behavior assertions + response quality
+
+    The returned dict is shared module state — callers must not mutate it.
     """
-    _MODE_MAP = {
-        "response_only": {
-            "eval_expected_tools": False,
-            "eval_tool_assertions": False,
-            "eval_behavior_assertions": False,
-            "eval_response_quality": True,
-        },
-        "tool_level": {
-            "eval_expected_tools": True,
-            "eval_tool_assertions": True,
-            "eval_behavior_assertions": False,
-            "eval_response_quality": True,
-        },
-        "hybrid": {
-            "eval_expected_tools": False,
-            "eval_tool_assertions": False,
-            "eval_behavior_assertions": True,
-            "eval_response_quality": True,
-        },
-    }
-    return _MODE_MAP.get(assertion_mode, _MODE_MAP["response_only"])
+    return _EVALUATION_MODE_MAP.get(assertion_mode) or _EVALUATION_MODE_MAP["response_only"]
+
+
+class _LazyTemplateContext(dict):
+    """Template context whose expensive fields are computed on first lookup.
+
+    A template that never references {{tool_calls_json}} or {{actual_tools}}
+    never pays for serializing them.
+    """
+
+    def __init__(self, values: Dict[str, Any], lazy: Dict[str, Any]):
+        super().__init__(values)
+        self._lazy = lazy  # key → zero-arg callable
+
+    def __missing__(self, key):
+        factory = self._lazy.pop(key)  # KeyError for unknown keys, like a plain dict
+        value = self[key] = factory()
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._lazy
 
 
 def _build_template_context(
@@ -222,19 +358,23 @@ def _build_template_context(
     rubric_text: str = None,
 ) -> Dict[str, Any]:
     """Build the variable context dict for template rendering."""
-    return {
-        "test_input": getattr(test_case, 'input', ''),
-        "test_description": getattr(test_case, 'description', ''),
-        "tool_name": tool_exp.name if tool_exp else "",
-        "argument_name": argument_name or "",
-        "assertion_text": assertion_text or "",
-        "tool_calls_json": json.dumps(test_exec.tool_calls, indent=2) if hasattr(test_exec, 'tool_calls') else "[]",
-        "actual_tools": ", ".join(test_exec.actual_tools) if hasattr(test_exec, 'actual_tools') else "",
-        "agent_response": test_exec.agent_response if hasattr(test_exec, 'agent_response') else "",
-        "expected_response": getattr(test_case, 'expected_response', '') or "",
-        "assertions_block": assertions_block or "",
-        "rubric": rubric_text or "",
-    }
+    return _LazyTemplateContext(
+        {
+            "test_input": getattr(test_case, 'input', ''),
+            "test_description": getattr(test_case, 'description', ''),
+            "tool_name": tool_exp.name if tool_exp else "",
+            "argument_name": argument_name or "",
+            "assertion_text": assertion_text or "",
+            "agent_response": test_exec.agent_response if hasattr(test_exec, 'agent_response') else "",
+            "expected_response": getattr(test_case, 'expected_response', '') or "",
+            "assertions_block": assertions_block or "",
+            "rubric": rubric_text or "",
+        },
+        lazy={
+            "tool_calls_json": lambda: test_exec.tool_calls_json() if hasattr(test_exec, 'tool_calls') else "[]",
+            "actual_tools": lambda: ", ".join(test_exec.actual_tools) if hasattr(test_exec, 'actual_tools') else "",
+        },
+    )
 
 
 # Default judge config — matches the original hard-coded prompts exactly
@@ -291,12 +431,288 @@ _DEFAULT_JUDGE_CONFIG = {
         "    \"reasoning\": \"One sentence explaining why this assertion passed or failed.\"\n"
         "}"
     ),
+    "user_prompt_template_combined": (
+        "You are evaluating multiple assertions about an AI agent's performance in a single pass.\n"
+        "\n"
+        "**Test Context:**\n"
+        "- Input: {{test_input}}\n"
+        "- Description: {{test_description}}\n"
+        "\n"
+        "**Agent's Tool Calls:** {{tool_calls_json}}\n"
+        "**Agent Output:** {{agent_response}}\n"
+        "**Expected Response:** {{expected_response}}\n"
+        "\n"
+        "{{assertions_block}}\n"
+        "\n"
+        "**Task:** For EACH numbered assertion, determine if it is satisfied (true/false) "
+        "with a one-sentence explanation.\n"
+        "\n"
+        "Respond with ONLY a JSON object containing a \"results\" array, "
+        "one entry per assertion in the SAME ORDER:\n"
+        "{\n"
+        "    \"results\": [\n"
+        "        {\"index\": 0, \"passed\": true, \"reasoning\": \"One sentence explanation.\"}\n"
+        "    ]\n"
+        "}"
+    ),
     "rubric": [],
     "scoring_mode": "binary",
     "pass_threshold": None,
 }
 
 
+def _resolve_judge_settings(eval_run) -> Dict[str, Any]:
+    """Resolve the judge settings for an evaluation run once and cache them on it.
+
+    Falls back to the built-in default config when the run has no cached
+    judge config (e.g. runs started via start_evaluation_with_prompt).
+    """
+    resolved = getattr(eval_run, '_resolved_judge', None)
+    if resolved is None:
+        judge_cfg = getattr(eval_run, '_cached_judge_config', None) or _DEFAULT_JUDGE_CONFIG
+        resolved = {
+            "config": judge_cfg,
+            "scoring_mode": judge_cfg.get('scoring_mode', 'binary'),
+            "rubric": judge_cfg.get('rubric') or [],
+            "pass_threshold": judge_cfg.get('pass_threshold') or 3.0,
+            "templates": {},  # template key → compiled template (see _render_judge_template)
+        }
+        eval_run._resolved_judge = resolved
+    return resolved
+
+
+def _render_judge_template(eval_run, template_key: str, context: Dict[str, Any]) -> str:
+    """Render one of the run's judge prompt templates, compiling it once per run.
+
+    Templates the run's judge config does not define (stored configs carry no
+    user_prompt_template_combined) fall back to the built-in default's.
+    """
+    resolved = _resolve_judge_settings(eval_run)
+    compiled = resolved['templates'].get(template_key)
+    if compiled is None:
+        template = resolved['config'].get(template_key) or _DEFAULT_JUDGE_CONFIG[template_key]
+        compiled = _compile_template(template)
+        resolved['templates'][template_key] = compiled
+    return _render_compiled(compiled, context)
+
+
+def _json_mode_kwargs(system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+    """Extra chat.completions kwargs asking the judge for a bare JSON object.
+
+    OpenAI rejects JSON mode unless the prompt itself mentions JSON, so it is
+    only requested when one of the messages does (custom judge templates may
+    not). Disabled entirely with LLM_JSON_MODE=false for endpoints that do not
+    accept response_format.
+    """
+    if config.LLM_JSON_MODE and ("json" in system_prompt.lower() or "json" in user_prompt.lower()):
+        return {"response_format": {"type": "json_object"}}
+    return {}
+
+
+@functools.lru_cache(maxsize=64)
+def _prompt_cache_kwargs(name: str, static_prefix: str) -> Dict[str, Any]:
+    """Extra chat.completions kwargs that route requests sharing a prefix to the same prompt cache.
+
+    Every judge request starts with the same system message, which providers
+    with automatic prefix caching bill and prefill at a discount on reuse.
+    On OpenAI a prompt_cache_key improves the hit rate; it is derived from
+    the prefix itself, so editing the judge config starts a new cache.
+    Other endpoints get nothing extra (Ollama reuses the KV prefix on its own,
+    and not every OpenAI-compatible server accepts unknown fields).
+    """
+    if "api.openai.com" not in config.LLM_BASE_URL:
+        return {}
+    digest = hashlib.blake2b(static_prefix.encode(), digest_size=8).hexdigest()
+    return {"extra_body": {"prompt_cache_key": f"{name}-{digest}"}}
+
+
+# Static instructions for generate_assertions_from_trace. Sent as the system
+# message so every request shares the same cacheable prefix; only the trace
+# goes in the user message.
+_ASSERTION_GENERATION_INSTRUCTIONS = (
+    "You are an expert at writing concise, testable assertions for AI agent evaluations.\n"
+    "Analyse the test case execution trace provided by the user and propose assertions.\n\n"
+    "Generate assertions for THREE evaluation modes.\n\n"
+    "1. TOOL-LEVEL: ToolExpectation entries checking which tools should be "
+    "called and what argument values are expected.\n"
+    "2. HYBRID (behavior): Natural-language BehaviorAssertion entries that "
+    "describe expected agent behaviour including tool usage and response "
+    "characteristics in a single sentence each.\n"
+    "3. RESPONSE QUALITY: One ResponseQualityAssertion checking overall "
+    "response appropriateness.\n\n"
+    "Return ONLY a JSON object with this exact schema:\n"
+    "{\n"
+    '  "tool_expectations": [\n'
+    '    {"name": "tool_name", "arguments": [\n'
+    '      {"name": "arg_name", "assertion": ["assertion 1", "assertion 2"]}\n'
+    "    ]}\n"
+    "  ],\n"
+    '  "behavior_assertions": [\n'
+    '    {"assertion": "natural language description"}\n'
+    "  ],\n"
+    '  "response_quality_expectation": {\n'
+    '    "assertion": "quality expectation"\n'
+    "  }\n"
+    "}"
+)
+
+
+# Structured-output schema for single-assertion verdicts
+_VERDICT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "verdict",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "passed": {"type": "boolean"},
+                "reasoning": {"type": "string"},
+            },
+            "required": ["passed", "reasoning"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Structured-output schema for rubric judging (Feature: rubric-evaluation)
+_RUBRIC_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "rubric_scores",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "scores": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "criterion": {"type": "string"},
+                            "score": {"type": "integer"},
+                            "reasoning": {"type": "string"},
+                        },
+                        "required": ["criterion", "score", "reasoning"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["scores"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def _usage_tokens(response) -> tuple:
+    """(prompt_tokens, completion_tokens) of a chat completion; (0, 0) without usage.
+
+    Cache hits and shared in-flight calls carry usage=None (see _judge_completion).
+    """
+    usage = response.usage
+    if usage is None:
+        return 0, 0
+    return usage.prompt_tokens or 0, usage.completion_tokens or 0
+
+
+# Chunks still read after a streamed JSON verdict closes, waiting for the
+# usage record (normally a finish chunk, then the usage-only chunk)
+_JSON_TAIL_CHUNKS = 3
+
+
+def _stream_rejected(error: Exception) -> bool:
+    """Whether a streamed chat.completions request was refused outright (400/422).
+
+    Legacy OpenAI-compatible endpoints reject stream / stream_options this
+    way; callers retry without streaming.
+    """
+    from openai import BadRequestError, UnprocessableEntityError  # Lazy, like the client itself
+    return isinstance(error, (BadRequestError, UnprocessableEntityError))
+
+
+async def _collect_stream(stream, stop_after_json: bool = False, prompt_text: str = "") -> SimpleNamespace:
+    """Drain a streamed chat completion into the shape of a non-streamed one.
+
+    Only choices[0].message.content, message.thinking (reasoning models that
+    stream their output there) and usage are reproduced — that is all the
+    judge and proposal code reads from a response.
+
+    With stop_after_json, a reply that starts with "{" is read only until its
+    top-level object closes, plus up to _JSON_TAIL_CHUNKS chunks waiting for
+    the usage record. Reading then stops, and leaving the caller's ``async
+    with stream`` block closes the connection, cancelling the rest of the
+    response. If the usage record was not reached, usage is estimated from
+    prompt_text and the collected output so the call is still billed.
+    """
+    parts = []
+    thinking_parts = []
+    usage = None
+    tracking = stop_after_json
+    started = closed = in_string = escaped = False
+    depth = 0
+    tail = 0
+    async for chunk in stream:
+        if chunk.usage is not None:
+            usage = chunk.usage
+        if closed:
+            tail += 1
+            if usage is not None or tail >= _JSON_TAIL_CHUNKS:
+                break
+            continue
+        if not chunk.choices:
+            continue
+        thinking = getattr(chunk.choices[0].delta, "thinking", None)
+        if thinking:
+            thinking_parts.append(thinking)
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        parts.append(delta)
+        if not tracking:
+            continue
+        for ch in delta:
+            if not started:
+                if ch.isspace():
+                    continue
+                if ch != "{":
+                    tracking = False  # prose / <think> first — read it all
+                    break
+                started = True
+                depth = 1
+            elif in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    closed = True
+                    break
+    message = SimpleNamespace(content="".join(parts), thinking="".join(thinking_parts) or None)
+    if usage is None and closed:
+        # Stopped before the usage record arrived — estimate instead
+        usage = SimpleNamespace(
+            prompt_tokens=_estimate_tokens(prompt_text),
+            completion_tokens=_estimate_tokens(message.content + (message.thinking or "")),
+        )
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+# Cleanup patterns for judge output that is not bare JSON (see _extract_json)
+_THINK_BLOCK_RE = re.compile(r'<think>.*?</think>', re.DOTALL)
+_THINK_UNCLOSED_RE = re.compile(r'<think>.*', re.DOTALL)
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*\n?(.*?)\n?\s*```', re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
+
+
 def _extract_json(text: str) -> dict:
     """Extract JSON from LLM output that may contain extra text.
 
@@ -308,30 +724,50 @@ def _extract_json(text: str) -> dict:
     """
     text = text.strip()
 
+    # Clean JSON (the norm with JSON mode) — parse without any regex work.
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the except
+    # clauses below cover both parsers.
+    if text.startswith("{"):
+        try:
+            return orjson.loads(text)
+        except json.JSONDecodeError:
+            pass
+
+    # Slow path — logged so the clean-JSON hit rate can be checked
+    logger.debug("Judge output is not bare JSON; trying think-tag/fence/brace extraction")
+
     # Strip <think>...</think> blocks (deepseek-r1 / qwen3 style)
-    text = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL).strip()
+    text = _THINK_BLOCK_RE.sub('', text).strip()
     # Also strip unclosed <think> tags (model didn't emit closing tag)
-    text = re.sub(r'<think>.*', '', text, flags=re.DOTALL).strip()
+    text = _THINK_UNCLOSED_RE.sub('', text).strip()
 
     # Try direct parse first (fast path)
     try:
-        return json.loads(text)
+        return orjson.loads(text)
     except json.JSONDecodeError:
         pass
 
     # Try extracting from markdown code fence
-    fence_match = re.search(r'```(?:json)?\s*\n?(.*?)\n?\s*```', text, re.DOTALL)
+    fence_match = _JSON_FENCE_RE.search(text)
     if fence_match:
         try:
-            return json.loads(fence_match.group(1).strip())
+            return orjson.loads(fence_match.group(1).strip())
         except json.JSONDecodeError:
             pass
 
-    # Try finding the first { ... } block (greedy from first { to last })
-    brace_match = re.search(r'\{.*\}', text, re.DOTALL)
-    if brace_match:
+    # Try the span from the first { to the last } — plain index scans, so a
+    # long reasoning dump costs linear time rather than regex backtracking
+    start = text.find("{")
+    if start != -1:
+        end = text.rfind("}")
+        if end > start:
+            try:
+                return orjson.loads(text[start:end + 1])
+            except json.JSONDecodeError:
+                pass
+        # Object followed by prose that itself contains a '}'
         try:
-            return json.loads(brace_match.group(0))
+            return _JSON_DECODER.raw_decode(text, start)[0]
         except json.JSONDecodeError:
             pass
 
@@ -476,6 +912,176 @@ async def retry_with_backoff(func, *args, max_attempts=RETRY_MAX_ATTEMPTS, base_
     raise last_exception
 
 
+def _agent_request_defaults(eval_run):
+    """Per-run agent call timeout and base headers, built once and cached on the run.
+
+    Uses a generous timeout for browser automation agents — vision model
+    inference + multi-step browser tasks can easily exceed 5 minutes. The
+    timeout covers the entire agent execution (all steps), at least 10 minutes.
+    """
+    defaults = getattr(eval_run, '_agent_request_defaults', None)
+    if defaults is None:
+        defaults = (
+            httpx.Timeout(max(eval_run.timeout_seconds, 600), connect=30.0),
+            {"Content-Type": "application/json", "X-CorrelationId": eval_run.id},
+        )
+        eval_run._agent_request_defaults = defaults
+    return defaults
+
+
+def _done_status_formats(eval_run, total_tests: int):
+    """(pass, fail) "Test N/M done" status templates, built once per run.
+
+    The emoji and total are constant for the run, so only the per-test
+    fields are left to .format().
+    """
+    formats = getattr(eval_run, '_status_fmt_done', None)
+    if formats is None:
+        tail = f" Test {{n}}/{total_tests} done: {{name}} ({{a:.1f}}s + {{j:.1f}}s){{summary}}"
+        formats = ("✅" + tail, "❌" + tail)
+        eval_run._status_fmt_done = formats
+    return formats
+
+
+def _aggregate_run_results(test_cases: list, previous: Optional[tuple]) -> tuple:
+    """Sum a run's cost/tokens and diff its pass map against the previous run.
+
+    Pure Python over the run's results — _finalize_evaluation runs it in a
+    worker thread so large runs don't stall other evaluations' event loop work.
+
+    Args:
+        test_cases: the run's TestCaseResults
+        previous: (evaluation_id, {testcase_id: passed}) of the previous
+            completed run, or None
+
+    Returns:
+        (total_cost_usd, total_tokens_in, total_tokens_out, regressions or None)
+    """
+    total_cost = 0.0
+    total_in = 0
+    total_out = 0
+    current_results = {}
+    for tc in test_cases:
+        total_cost += tc.agent_cost_usd + tc.judge_cost_usd
+        total_in += tc.agent_tokens_in + tc.judge_tokens_in
+        total_out += tc.agent_tokens_out + tc.judge_tokens_out
+        current_results[tc.testcase_id] = tc.passed
+
+    regressions = None
+    if previous:
+        previous_eval_id, previous_results = previous
+        # Regression: was passed before, failed (or missing) now
+        regressions = [
+            {
+                "testcase_id": testcase_id,
+                "previous_result": "passed",
+                "current_result": "failed",
+                "previous_eval_id": previous_eval_id
+            }
+            for testcase_id, passed_in_previous in previous_results.items()
+            if passed_in_previous and not current_results.get(testcase_id)
+        ]
+    return round(total_cost, 6), total_in, total_out, regressions
+
+
+# Buffered cost records are written at once when this many are pending
+_COST_FLUSH_MAX_BATCH = 100
+
+# Failure patterns sent to the prompt-proposal LLM at once
+_PROPOSAL_CONCURRENCY = 3
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count for budget checks (~4 characters per token).
+
+    Judge models are served through OpenAI-compatible endpoints with
+    differing tokenizers, so a character heuristic is used rather than a
+    model-specific encoding.
+    """
+    return len(text) // 4
+
+
+# Pre-rendered countdown progress bars, indexed by number of filled cells
+_PROGRESS_BAR_LEN = 10
+_PROGRESS_BARS = tuple("█" * i + "░" * (_PROGRESS_BAR_LEN - i) for i in range(_PROGRESS_BAR_LEN + 1))
+
+
+# Argument summaries for browser tool steps in comparison traces, keyed by tool name
+_STEP_ARG_FORMATTERS = {
+    "navigate": lambda args: f" → {args.get('url', '?')[:80]}",
+    "click": lambda args: f" at ({args.get('x', '?')},{args.get('y', '?')})",
+    "type_text": lambda args: f" \"{args.get('text', '?')[:50]}\"",
+    "click_and_type": lambda args: f" \"{args.get('text', '?')[:50]}\"",
+    "done": lambda args: f" result=\"{args.get('result', '?')[:80]}\"",
+    "scroll": lambda args: f" {args.get('direction', '?')}",
+}
+
+# Traced tests per IMPROVED / REGRESSED section of a comparison prompt; the
+# rest are only counted, as with the 3 still-failing traces
+_COMPARISON_MAX_TRACES = 10
+
+# Answer sections requested from the comparison LLM; the default system prompt
+# lists only those with data (see _default_comparison_prompt)
+_COMPARISON_SECTION_IMPROVED = (
+    "## What Improved\n"
+    "For each improved test, explain specifically what the agent did differently in the latest run "
+    "(e.g., 'used navigate instead of click', 'correctly called done with result instead of looping'). "
+    "Reference step numbers."
+)
+_COMPARISON_SECTION_REGRESSED = (
+    "## What Regressed\n"
+    "For each regressed test, pinpoint the exact step where things went wrong "
+    "(e.g., 'got stuck repeating click at (53,604)', 'timed out at step 3'). Reference the error message."
+)
+_COMPARISON_SECTION_FAILING = (
+    "## Still Failing\n"
+    "For tests that failed in both runs, identify what's blocking them and whether there's progress."
+)
+_COMPARISON_SECTION_RECOMMENDATIONS = (
+    "## Recommendations\n"
+    "Give 2-3 SPECIFIC, ACTIONABLE fixes (e.g., 'add auto-rescue for click loops on form submit buttons', "
+    "'increase timeout for Wikipedia pages', 'add explicit form-filling guidance to system prompt'). "
+    "Do NOT give generic advice like 'add more tests' or 'monitor performance'."
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _default_comparison_prompt(improved: bool, regressed: bool, still_failing: bool) -> str:
+    """Built-in comparison system prompt for the sections that have data.
+
+    Only 8 shapes exist, so each is assembled once and reused.
+    """
+    structure_parts = []
+    if improved:
+        structure_parts.append(_COMPARISON_SECTION_IMPROVED)
+    if regressed:
+        structure_parts.append(_COMPARISON_SECTION_REGRESSED)
+    if still_failing:
+        structure_parts.append(_COMPARISON_SECTION_FAILING)
+    structure_parts.append(_COMPARISON_SECTION_RECOMMENDATIONS)
+    return (
+        "You are a senior QA engineer analyzing an AI agent's evaluation results. "
+        "You are given step-by-step execution traces for each test case across two runs (Baseline and Latest).\n\n"
+        "Your job is to identify SPECIFIC, CONCRETE root causes — not generic observations. "
+        "Compare the actual step sequences between runs to explain what the agent did differently.\n\n"
+        "IMPORTANT RULES:\n"
+        "- ONLY include sections that have relevant data. Do NOT include empty sections.\n"
+        "- If there are no regressions, do NOT include a 'What Regressed' section.\n"
+        "- If there are no still-failing tests, do NOT include a 'Still Failing' section.\n"
+        "- If there are no improvements, do NOT include a 'What Improved' section.\n"
+        "- Always include the Recommendations section.\n\n"
+        "Structure your analysis using ONLY these applicable sections:\n\n"
+        + "\n\n".join(structure_parts) + "\n\n"
+        "Keep it under 400 words. Be direct."
+    )
+
+
+def _agent_side_url(agent_endpoint: str, path: str) -> str:
+    """Derive a sibling URL on the agent server (e.g. /progress, /cancel)."""
+    parsed = urlparse(agent_endpoint)
+    return f"{parsed.scheme}://{parsed.netloc}{path}"
+
+
 # ==============================================================================
 # INTERNAL TEST EXECUTION TRACKER (NOT PERSISTED)
 # ==============================================================================
@@ -543,6 +1149,129 @@ class _TestExecution:
         self.agent_tokens_out: int = 0
         self.judge_tokens_in: int = 0
         self.judge_tokens_out: int = 0
+        # Memoized tool_calls serializations (see tool_calls_json)
+        self._tool_calls_json_src: Optional[list] = None
+        self._tool_calls_json_len: int = 0
+        self._tool_calls_json: Dict[bool, str] = {}
+
+    def tool_calls_json(self, compact: bool = False) -> str:
+        """Serialized tool_calls, computed once and shared by every judge prompt.
+
+        Recomputed if tool_calls is reassigned or grows.
+        """
+        if self._tool_calls_json_src is not self.tool_calls or self._tool_calls_json_len != len(self.tool_calls):
+            self._tool_calls_json_src = self.tool_calls
+            self._tool_calls_json_len = len(self.tool_calls)
+            self._tool_calls_json = {}
+        cached = self._tool_calls_json.get(compact)
+        if cached is None:
+            if compact:
+                cached = orjson.dumps(self.tool_calls).decode()
+            else:
+                cached = orjson.dumps(self.tool_calls, option=orjson.OPT_INDENT_2).decode()
+            self._tool_calls_json[compact] = cached
+        return cached
+
+
+class _JudgeCoalescer:
+    """Merges batched judge prompts from concurrently running tests into one LLM call.
+
+    Feature: judge-coalescing
+    Each tool's batched assertion prompt (see _evaluate_tool_assertions_batched)
+    is submitted here instead of being sent on its own. Prompts that share a
+    system prompt and arrive within the coalescing window (or until
+    max_batch is reached) are sent as one request with numbered sections; the
+    per-section "results" arrays are handed back to each caller.
+
+    submit() returns None whenever a prompt could not be coalesced (it was
+    alone in its window, or the merged response did not line up) — the caller
+    then makes its own per-tool call as before.
+    """
+
+    def __init__(self, service: "EvaluatorService", window_seconds: float, max_batch: int):
+        self._service = service
+        self._window = window_seconds
+        self._max_batch = max(2, max_batch)
+        self._groups: Dict[str, list] = {}  # system prompt → [(user_prompt, expected_count, future)]
+        self._tasks: set = set()  # in-flight merged calls (strong refs)
+
+    async def submit(self, system_prompt: str, user_prompt: str, expected_count: int) -> Optional[tuple]:
+        """Queue one batched prompt; returns (results, tokens_in, tokens_out) or None."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        group = self._groups.get(system_prompt)
+        if group is None:
+            group = self._groups[system_prompt] = []
+            loop.call_later(self._window, self._flush, system_prompt, group)
+        group.append((user_prompt, expected_count, future))
+        if len(group) >= self._max_batch:
+            self._flush(system_prompt, group)
+        return await future
+
+    def _flush(self, system_prompt: str, group: list):
+        if self._groups.get(system_prompt) is not group:
+            return  # already flushed when it hit max_batch
+        del self._groups[system_prompt]
+        task = asyncio.create_task(self._send(system_prompt, group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, system_prompt: str, group: list):
+        if len(group) == 1:
+            # Nothing to merge — let the caller make its usual call
+            _, _, future = group[0]
+            if not future.done():
+                future.set_result(None)
+            return
+
+        sections = "\n\n".join(
+            f"=== REQUEST [{i}] ===\n{user_prompt}"
+            for i, (user_prompt, _, _) in enumerate(group)
+        )
+        merged_prompt = (
+            f"Below are {len(group)} independent evaluation requests. Judge each one "
+            f"on its own, exactly as its instructions say.\n\n{sections}\n\n"
+            'Respond with ONLY a JSON object of the form {"requests": [{"request": 0, "results": [...]}, ...]} '
+            f"with one entry per request, in order, where each \"results\" array is exactly "
+            f"what that request asks for."
+        )
+
+        async def _call_llm_merged():
+            async with self._service._llm_semaphore:
+                return await self._service.openai_client.chat.completions.create(
+                    model=config.LLM_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": merged_prompt}
+                    ],
+                    **_json_mode_kwargs(system_prompt, merged_prompt),
+                    **_prompt_cache_kwargs("judge", system_prompt),
+                )
+
+        try:
+            response = (await retry_with_backoff(_call_llm_merged)).result
+            parsed = _extract_json(response.choices[0].message.content.strip())
+            entries = parsed.get("requests", [])
+            if len(entries) != len(group) or any(
+                not isinstance(entry, dict) or len(entry.get("results", [])) != expected_count
+                for entry, (_, expected_count, _) in zip(entries, group)
+            ):
+                raise ValueError(f"merged response did not match the {len(group)} submitted requests")
+
+            # Split token usage evenly across the coalesced requests for cost attribution
+            tokens_in, tokens_out = _usage_tokens(response)
+            tokens_in //= len(group)
+            tokens_out //= len(group)
+
+            logger.info(f"Coalesced {len(group)} batched judge requests into one LLM call")
+            for entry, (_, _, future) in zip(entries, group):
+                if not future.done():
+                    future.set_result((entry["results"], tokens_in, tokens_out))
+        except Exception as e:
+            logger.warning(f"Coalesced judge call failed: {e}. Falling back to per-tool calls.")
+            for _, _, future in group:
+                if not future.done():
+                    future.set_result(None)
 
 
 class EvaluatorService:
@@ -560,16 +1289,66 @@ class EvaluatorService:
             max_concurrent_tests = config.MAX_CONCURRENT_TESTS
         self.max_concurrent_tests = max_concurrent_tests
         self._semaphore = asyncio.Semaphore(max_concurrent_tests)
+        # Caps in-flight LLM calls (judge, assertion generation, proposals,
+        # comparisons) across all runs — judge assertions are fanned out
+        self._llm_semaphore = asyncio.Semaphore(config.LLM_MAX_CONCURRENCY)
+        # Judge response cache for runs with judge_cache_enabled (Feature: judge-cache)
+        self._judge_cache: "OrderedDict[str, Any]" = OrderedDict()  # prompt hash → response (LRU order)
+        # Identical judge prompts already on the wire — later callers await the first
+        self._judge_inflight: Dict[str, asyncio.Future] = {}  # prompt hash (run-scoped without the cache) → pending response
+        self._stream_verdicts = True  # False once the judge endpoint has refused a streamed call
+        # Cross-test judge coalescing (Feature: judge-coalescing) — off when the window is 0
+        self._judge_coalescer: Optional[_JudgeCoalescer] = None
+        if config.JUDGE_COALESCE_WINDOW_MS > 0:
+            self._judge_coalescer = _JudgeCoalescer(
+                self, config.JUDGE_COALESCE_WINDOW_MS / 1000.0, config.JUDGE_COALESCE_MAX_BATCH
+            )
         
-        # Lock for protecting concurrent updates to evaluation runs
-        self._eval_run_locks: Dict[str, asyncio.Lock] = {}
-        self._locks_lock = asyncio.Lock()  # Lock to protect the locks dictionary
         self._cancelled_evals: set = set()  # eval IDs that have been cancelled
         self._running_tasks: Dict[str, list] = {}  # eval_id → list of asyncio.Task objects
         self._status_cache: Dict[str, str] = {}  # eval_run_id → live status_message (in-memory)
+        # Buffered test-result writes (Feature: batched-result-writes)
+        self._pending_results: Dict[str, List[TestCaseResult]] = {}  # eval_run_id → results not yet in DB
+        self._flush_tasks: Dict[str, asyncio.Task] = {}  # eval_run_id → scheduled debounced flush
+        self._pending_costs: List[CostRecord] = []  # cost records not yet in DB
+        self._cost_flush_task: Optional[asyncio.Task] = None  # scheduled debounced cost flush
+        self._cost_tasks: set = set()  # in-flight cost flushes (strong refs)
+
+        # Pooled HTTP clients (Feature: pooled-http) — reused across tests so
+        # agent calls and progress polls keep their keep-alive connections.
+        # Per-request timeouts are passed where they differ from the default.
+        self._agent_http = httpx.AsyncClient(
+            timeout=httpx.Timeout(max(config.EVALUATION_TIMEOUT_SECONDS, 600), connect=30.0),
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+        )
+        self._progress_http = httpx.AsyncClient(timeout=3.0)
+        self._ollama_http = httpx.AsyncClient(timeout=10.0)
+        self._agent_ollama_model = os.getenv("OLLAMA_MODEL", "")  # agent model to unload before judging
+        self._ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 
         logger.info("EvaluatorService initialized successfully")
 
+    async def aclose(self):
+        """Write buffered cost records and close the pooled HTTP clients.
+
+        Called on application shutdown.
+        """
+        global _openai_client
+        await asyncio.gather(*self._cost_tasks, return_exceptions=True)
+        await self._flush_costs()
+        for client in (self._agent_http, self._progress_http, self._ollama_http):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client: {e}")
+        if _openai_client is not None:
+            try:
+                await _openai_client.close()
+            except Exception as e:
+                logger.warning(f"Error closing LLM judge client: {e}")
+            _openai_client = None
+            self.openai_client = None
+
     # ==== SYSTEM PROMPT HELPERS (Feature: configurable-prompts) ====
 
     async def _get_system_prompt(self, key: str, default: str) -> str:
@@ -591,25 +1370,21 @@ class EvaluatorService:
             default += " /no_think"
         return default
 
-    async def _render_proposal_prompt(self, variables: dict, hardcoded_fallback: str) -> str:
-        """Render the proposal user prompt from the DB template.
+    async def _get_proposal_user_template(self) -> tuple:
+        """Load and compile the proposal user prompt template.
 
-        Loads the user template from DB (key=proposal_generation_user),
-        substitutes {{variable}} placeholders with the supplied dict,
-        and falls back to the hardcoded prompt if the template is missing
-        or rendering fails.
+        Loads the user template from DB (key=proposal_generation_user) and
+        compiles its {{variable}} placeholders for _render_compiled, falling
+        back to the built-in template if it is missing or cannot be loaded.
+        Called once per proposal run; each pattern only renders.
         """
         try:
             prompt_record = await self.db.get_system_prompt("proposal_generation_user")
             if prompt_record and prompt_record.get("content"):
-                template = prompt_record["content"]
-                # Replace {{var}} placeholders with values from the dict
-                for key, value in variables.items():
-                    template = template.replace("{{" + key + "}}", str(value))
-                return template
+                return _compile_template(prompt_record["content"])
         except Exception as e:
-            logger.warning(f"Failed to render proposal user template from DB: {e}")
-        return hardcoded_fallback
+            logger.warning(f"Failed to load proposal user template from DB: {e}")
+        return _PROPOSAL_USER_TEMPLATE
 
     # ==== COST ATTRIBUTION HELPERS (Feature: cost-attribution) ====
 
@@ -618,15 +1393,18 @@ class EvaluatorService:
         pricing = config.PRICING_TABLE.get(model, config.PRICING_TABLE.get("_default", {"input_per_1k": 0, "output_per_1k": 0}))
         return (tokens_in / 1000 * pricing["input_per_1k"]) + (tokens_out / 1000 * pricing["output_per_1k"])
 
-    async def _record_cost(
+    def _record_cost(
         self, call_type: str, model: str, tokens_in: int, tokens_out: int,
         evaluation_id: str = None, test_case_id: str = None, agent_id: str = None
     ) -> float:
-        """Record a cost entry and return the computed cost USD."""
-        import uuid as _uuid
+        """Queue a cost entry for writing and return the computed cost USD.
+
+        The record is buffered and written in a batch by _flush_costs, so the
+        DB insert stays off the judge call path.
+        """
         cost_usd = self._compute_cost(model, tokens_in, tokens_out)
-        record = CostRecord(
-            id=f"cost_{_uuid.uuid4().hex[:12]}",
+        self._pending_costs.append(CostRecord(
+            id=f"cost_{uuid.uuid4().hex[:12]}",
             evaluation_id=evaluation_id,
             test_case_id=test_case_id,
             agent_id=agent_id,
@@ -635,12 +1413,56 @@ class EvaluatorService:
             tokens_in=tokens_in,
             tokens_out=tokens_out,
             cost_usd=cost_usd,
+        ))
+        if len(self._pending_costs) >= _COST_FLUSH_MAX_BATCH:
+            self._spawn_cost_flush(0)  # full batch — write now
+        elif self._cost_flush_task is None:
+            self._cost_flush_task = self._spawn_cost_flush(config.RESULT_FLUSH_DELAY_SECONDS)
+        return cost_usd
+
+    def _charge_judge_tokens(self, test_exec: "_TestExecution", tokens_in: int, tokens_out: int) -> None:
+        """Attribute one judge call's tokens and cost to a test execution."""
+        if not (tokens_in or tokens_out):
+            return
+        test_exec.judge_tokens_in += tokens_in
+        test_exec.judge_tokens_out += tokens_out
+        test_exec.judge_cost_usd += self._record_cost(
+            "judge_llm", config.LLM_MODEL, tokens_in, tokens_out,
+            evaluation_id=test_exec.eval_run_id,
+            test_case_id=test_exec.test_case_id,
+            agent_id=test_exec.agent_id,
         )
+
+    def _spawn_cost_flush(self, delay: float) -> asyncio.Task:
+        task = asyncio.create_task(self._flush_costs(delay), name="cost-flush")
+        self._cost_tasks.add(task)
+        task.add_done_callback(self._cost_tasks.discard)
+        return task
+
+    async def _flush_costs(self, delay: float = 0):
+        """Write buffered cost records with one executemany (after an optional delay)."""
+        if delay:
+            await asyncio.sleep(delay)
+        if self._cost_flush_task is asyncio.current_task():
+            self._cost_flush_task = None
+        records, self._pending_costs = self._pending_costs, []
+        if not records:
+            return
         try:
-            await self.db.create_cost_record(record)
+            await self.db.create_cost_records(records)
         except Exception as e:
-            logger.warning(f"Failed to persist cost record: {e}")
-        return cost_usd
+            logger.warning(f"Failed to persist {len(records)} cost record(s): {e}")
+
+    async def _drain_costs(self):
+        """Write every buffered cost record now and wait for in-flight cost writes.
+
+        The pending delayed flush is not awaited; it will find an empty buffer.
+        """
+        await self._flush_costs()
+        await asyncio.gather(
+            *(t for t in self._cost_tasks if t is not self._cost_flush_task),
+            return_exceptions=True,
+        )
 
     # ==== FAILURE MODE CLASSIFICATION (Feature: hitl-intelligence) ====
 
@@ -687,6 +1509,66 @@ class EvaluatorService:
 
         return "partial_match"  # generic failure
 
+    @staticmethod
+    def _summarize_test_result(tc_result: TestCaseResult) -> str:
+        """Build the " | 85% | Failed: a, b, c +N more" suffix for a completion message.
+
+        Single pass over expected tools, argument assertions and response
+        quality. Only the first 3 failed item names are kept since that is
+        all the status message shows; the rest are just counted.
+        """
+        passed_count = 0
+        total_count = 0
+        failed_items = []
+        extra_failed = 0
+
+        # Check tools called
+        for tool in (tc_result.expected_tools or []):
+            total_count += 1
+            if tool.was_called:
+                passed_count += 1
+            elif len(failed_items) < 3:
+                failed_items.append(f"{tool.name_of_tool} (not called)")
+            else:
+                extra_failed += 1
+
+        # Check argument assertions (stop at the first failing assertion)
+        for tool_exp in (tc_result.tool_expectations or []):
+            for arg in tool_exp.arguments:
+                total_count += 1
+                arg_passed = True
+                for a in arg.assertions:
+                    if not a.passed:
+                        arg_passed = False
+                        break
+                if arg_passed:
+                    passed_count += 1
+                elif len(failed_items) < 3:
+                    failed_items.append(f"{tool_exp.name_of_tool}.{arg.name_of_argument}")
+                else:
+                    extra_failed += 1
+
+        # Check response quality
+        rq = tc_result.response_quality_assertion
+        if rq:
+            total_count += 1
+            if rq.passed:
+                passed_count += 1
+            elif len(failed_items) < 3:
+                failed_items.append("Response Quality")
+            else:
+                extra_failed += 1
+
+        pct = int((passed_count / total_count * 100)) if total_count > 0 else 0
+        if not failed_items:
+            return f" | {pct}%"
+
+        # Assemble in one join instead of successive concatenations
+        parts = [" | ", str(pct), "% | Failed: ", ", ".join(failed_items)]
+        if extra_failed:
+            parts.append(f" +{extra_failed} more")
+        return "".join(parts)
+
     async def _update_status_message(
         self,
         eval_run_id: str,
@@ -705,7 +1587,6 @@ class EvaluatorService:
 
         The countdown ticker calls this every ~3 seconds with persist=False.
         """
-        from .models import StatusHistoryEntry
 
         # Always update in-memory cache (used by the GET endpoint)
         self._status_cache[eval_run_id] = message
@@ -716,36 +1597,25 @@ class EvaluatorService:
             return
 
         try:
-            lock = await self._get_eval_run_lock(eval_run_id)
-            async with lock:
-                latest = await self.db.get_evaluation_run(eval_run_id)
-                if latest and latest.status == EvaluationRunStatus.running:
-                    latest.status_message = message
-                    # Append to status history — cap at 100 entries to prevent unbounded growth
-                    latest.status_history.append(StatusHistoryEntry(
-                        message=message,
-                        is_rate_limit=is_rate_limit,
-                        retry_attempt=retry_attempt,
-                        max_attempts=max_attempts,
-                        wait_seconds=wait_seconds
-                    ))
-                    if len(latest.status_history) > 100:
-                        latest.status_history = latest.status_history[-100:]
-
-                    # Update aggregate rate limit stats
-                    if is_rate_limit and wait_seconds:
-                        latest.total_rate_limit_hits += 1
-                        latest.total_retry_wait_seconds += wait_seconds
-
-                    await self.db.update_evaluation_run(latest)
-                    logger.debug(f"Status message persisted: {message}")
+            # Single atomic UPDATE: append history (capped at 100 entries), set
+            # status_message and bump rate limit stats — only while running
+            entry = StatusHistoryEntry(
+                message=message,
+                is_rate_limit=is_rate_limit,
+                retry_attempt=retry_attempt,
+                max_attempts=max_attempts,
+                wait_seconds=wait_seconds
+            )
+            rate_limit_wait = wait_seconds if is_rate_limit and wait_seconds else None
+            if await self.db.append_status_history(eval_run_id, entry, rate_limit_wait=rate_limit_wait):
+                logger.debug(f"Status message persisted: {message}")
         except Exception as e:
             logger.warning(f"Failed to persist status message: {e}")
     
     def OpenAIClientInitialization(self):
         """Initialize the OpenAI client globally if not already initialized.
 
-        Uses the standard OpenAI client pointing to a local LLM endpoint
+        Uses the async OpenAI client pointing to a local LLM endpoint
         (Ollama or any OpenAI-compatible server).
         Validates connectivity on first init so failures are loud, not silent.
         """
@@ -763,7 +1633,6 @@ class EvaluatorService:
         # Cloud APIs (Anthropic, OpenAI) don't expose Ollama's /api/tags —
         # skip the Ollama-specific probe for those and trust the network is up.
         # Auth failures will surface on the first actual call with a clear error.
-        import httpx as _hx
         base = config.LLM_BASE_URL.rstrip("/")
         is_cloud_api = any(h in base for h in ("anthropic.com", "openai.com"))
         if is_cloud_api:
@@ -778,7 +1647,7 @@ class EvaluatorService:
             try:
                 # Ollama exposes /api/tags; use that for local connectivity check
                 ollama_base = base.replace("/v1", "")
-                r = _hx.get(f"{ollama_base}/api/tags", timeout=5.0)
+                r = httpx.get(f"{ollama_base}/api/tags", timeout=5.0)
                 r.raise_for_status()
                 logger.info(f"  LLM endpoint reachable: {ollama_base}")
             except Exception as e:
@@ -793,14 +1662,37 @@ class EvaluatorService:
                     f"Start Ollama with 'ollama serve' or set LLM_BASE_URL to the correct endpoint."
                 ) from e
 
-        from openai import OpenAI  # Lazy import to speed up server startup
-        _openai_client = OpenAI(
+        from openai import AsyncOpenAI  # Lazy import to speed up server startup
+        _openai_client = AsyncOpenAI(
             base_url=config.LLM_BASE_URL,
             api_key=config.LLM_API_KEY,
+            # Native async client on pooled keep-alive connections shared by
+            # every judge call (Feature: pooled-http) — no worker thread per
+            # in-flight call, no TCP/TLS handshake per call, and no default
+            # 100-connection ceiling.
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=64, max_connections=512, keepalive_expiry=60.0),
+                timeout=httpx.Timeout(600.0, connect=5.0),
+            ),
         )
 
         self.openai_client = _openai_client
         logger.info("OpenAI-compatible client initialized successfully")
+
+    async def _prewarm_judge_connection(self):
+        """Open a pooled connection to the judge endpoint ahead of the first judge call.
+
+        Feature: pooled-http
+        A cheap models-list request pays the TCP/TLS handshake up front so the
+        first test's judge fan-out finds warm keep-alive sockets. Best effort:
+        any failure here resurfaces (and is handled) on the real judge call.
+        """
+        try:
+            if not self.openai_client:
+                self.OpenAIClientInitialization()
+            await asyncio.wait_for(self.openai_client.models.list(), timeout=5.0)
+        except Exception as e:
+            logger.debug(f"Judge connection prewarm skipped: {e}")
         
     async def create_evaluation_run(self, run_request) -> EvaluationRun:
         """Create a new evaluation run and initialize test results."""
@@ -853,6 +1745,8 @@ class EvaluatorService:
             total_tests=total,
             test_cases=[],  # Will be populated as tests complete
             verbose_logging=run_request.verbose_logging,  # Pass through verbose logging flag
+            judge_cache_enabled=getattr(run_request, 'judge_cache_enabled', False),
+            fast_fail_enabled=getattr(run_request, 'fast_fail_enabled', False),
             demo_mode=getattr(run_request, 'demo_mode', False),
             prompt_version=prompt_version,
             prompt_id=prompt_id,
@@ -904,6 +1798,9 @@ class EvaluatorService:
             except Exception as e:
                 logger.warning(f"Failed to cache prompt text for eval {evaluation_id}: {e}")
 
+        # Agent /progress URL is constant for the run — derive it once, not per test
+        eval_run._progress_url = _agent_side_url(eval_run.agent_endpoint, "/progress")
+
         # Load judge config for this evaluation (with backward-compat fallback)
         judge_config = None
         if eval_run.judge_config_id and eval_run.judge_config_version:
@@ -920,6 +1817,8 @@ class EvaluatorService:
         eval_run.judge_config_id = judge_config.get('id')
         eval_run.judge_config_version = judge_config.get('version')
         eval_run._cached_judge_config = judge_config
+        eval_run._resolved_judge = None
+        _resolve_judge_settings(eval_run)
         logger.info(f"Using judge config '{judge_config.get('name')}' v{judge_config.get('version')} for eval {evaluation_id}")
 
         # Update status to running
@@ -930,8 +1829,12 @@ class EvaluatorService:
         try:
             # Warmup: Give the agent a moment to be fully ready before first test
             # This prevents race conditions where the first test hits an agent that's still initializing
+            # Meanwhile, pre-establish the judge connection (Feature: pooled-http)
             logger.info(f"Waiting 500ms for agent warmup...")
-            await asyncio.sleep(0.5)
+            if getattr(eval_run, 'demo_mode', False):
+                await asyncio.sleep(0.5)
+            else:
+                await asyncio.gather(asyncio.sleep(0.5), self._prewarm_judge_connection())
 
             # Create test execution trackers for each test case
             test_executions = [
@@ -969,6 +1872,9 @@ class EvaluatorService:
 
             logger.info(f"All parallel test execution completed.")
 
+            # Write any buffered test results before reading the run back
+            await self.force_flush(evaluation_id)
+
             # If evaluation was cancelled while tests were running, don't finalize
             if evaluation_id in self._cancelled_evals:
                 logger.info(f"Evaluation {evaluation_id} was cancelled — skipping finalization")
@@ -1058,6 +1964,15 @@ class EvaluatorService:
                 await self._decrement_in_progress(eval_run.id)
                 return
 
+            # Unload agent model from GPU before judge runs (Feature: rubric-evaluation)
+            # Prevents OOM when large vision model (e.g. qwen3-vl:8b ~8GB) is still
+            # resident and judge model needs to load on the same GPU. The unload
+            # runs concurrently with the status write below and is awaited before
+            # judging. Demo mode never loads the agent model, so skip it there.
+            unload_task = None
+            if self._agent_ollama_model and not getattr(eval_run, 'demo_mode', False):
+                unload_task = asyncio.create_task(self._unload_ollama_model(self._agent_ollama_model))
+
             # Update status for judging phase with agent call timing (persist — phase transition)
             await self._update_status_message(
                 eval_run.id,
@@ -1065,12 +1980,8 @@ class EvaluatorService:
                 persist=True,
             )
 
-            # Unload agent model from GPU before judge runs (Feature: rubric-evaluation)
-            # Prevents OOM when large vision model (e.g. qwen3-vl:8b ~8GB) is still
-            # resident and judge model needs to load on the same GPU.
-            agent_ollama_model = os.getenv("OLLAMA_MODEL", "")
-            if agent_ollama_model:
-                await self._unload_ollama_model(agent_ollama_model)
+            if unload_task is not None:
+                await unload_task
 
             # Run LLM judge and build result (only if execution was successful)
             if test_exec.status == "completed":
@@ -1098,59 +2009,21 @@ class EvaluatorService:
             logger.info(f"Completed test {test_num}/{total_tests}: {test_case.id} - Status: {test_exec.status}, Passed: {test_exec.test_case_result.passed if test_exec.test_case_result else 'N/A'}")
             
             # Update status with completion, timing, and summary
-            result_emoji = "✅" if test_exec.test_case_result and test_exec.test_case_result.passed else "❌"
+            fmt_pass, fmt_fail = _done_status_formats(eval_run, total_tests)
+            status_fmt = fmt_pass if test_exec.test_case_result and test_exec.test_case_result.passed else fmt_fail
             
             # Build summary with percentage and failed items
-            summary = ""
-            if test_exec.test_case_result:
-                tc_result = test_exec.test_case_result
-                
-                # Track what passed and what failed
-                passed_count = 0
-                total_count = 0
-                failed_items = []
-                
-                # Check tools called
-                for tool in (tc_result.expected_tools or []):
-                    total_count += 1
-                    if tool.was_called:
-                        passed_count += 1
-                    else:
-                        failed_items.append(f"{tool.name_of_tool} (not called)")
-                
-                # Check argument assertions
-                for tool_exp in (tc_result.tool_expectations or []):
-                    for arg in tool_exp.arguments:
-                        total_count += 1
-                        if all(a.passed for a in arg.assertions):
-                            passed_count += 1
-                        else:
-                            failed_items.append(f"{tool_exp.name_of_tool}.{arg.name_of_argument}")
-                
-                # Check response quality
-                if tc_result.response_quality_assertion:
-                    total_count += 1
-                    if tc_result.response_quality_assertion.passed:
-                        passed_count += 1
-                    else:
-                        failed_items.append("Response Quality")
-                
-                # Calculate percentage
-                pct = int((passed_count / total_count * 100)) if total_count > 0 else 0
-                
-                # Build summary string
-                if failed_items:
-                    # Limit to first 3 failed items to avoid very long messages
-                    failed_str = ", ".join(failed_items[:3])
-                    if len(failed_items) > 3:
-                        failed_str += f" +{len(failed_items) - 3} more"
-                    summary = f" | {pct}% | Failed: {failed_str}"
-                else:
-                    summary = f" | {pct}%"
-            
+            summary = self._summarize_test_result(test_exec.test_case_result) if test_exec.test_case_result else ""
+
             await self._update_status_message(
                 eval_run.id,
-                f"{result_emoji} Test {test_num}/{total_tests} done: {test_case.name or test_case.id} ({test_exec.agent_call_duration:.1f}s + {test_exec.judge_call_duration:.1f}s){summary}",
+                status_fmt.format(
+                    n=test_num,
+                    name=test_case.name or test_case.id,
+                    a=test_exec.agent_call_duration,
+                    j=test_exec.judge_call_duration,
+                    summary=summary,
+                ),
                 persist=True,
             )
             
@@ -1177,101 +2050,137 @@ class EvaluatorService:
             await self._decrement_in_progress(eval_run.id)
 
     async def _decrement_in_progress(self, eval_run_id: str):
-        """Safely decrement in_progress_tests counter."""
-        lock = await self._get_eval_run_lock(eval_run_id)
-        async with lock:
-            try:
-                latest = await self.db.get_evaluation_run(eval_run_id)
-                if latest:
-                    latest.in_progress_tests = max(0, (latest.in_progress_tests or 0) - 1)
-                    await self.db.update_evaluation_run(latest)
-            except Exception:
-                pass
+        """Safely decrement in_progress_tests counter (atomic in the DB)."""
+        try:
+            await self.db.bump_in_progress(eval_run_id, -1)
+        except Exception:
+            pass
 
-    async def _get_eval_run_lock(self, eval_run_id: str) -> asyncio.Lock:
-        """Get or create a lock for a specific evaluation run."""
-        async with self._locks_lock:
-            if eval_run_id not in self._eval_run_locks:
-                self._eval_run_locks[eval_run_id] = asyncio.Lock()
-            return self._eval_run_locks[eval_run_id]
-    
     async def _mark_test_in_progress(self, eval_run_id: str):
         """Increment in_progress_tests counter when a test starts executing."""
-        lock = await self._get_eval_run_lock(eval_run_id)
-        async with lock:
-            try:
-                latest = await self.db.get_evaluation_run(eval_run_id)
-                if latest:
-                    latest.in_progress_tests = (latest.in_progress_tests or 0) + 1
-                    await self.db.update_evaluation_run(latest)
-            except Exception as e:
-                logger.error(f"Error marking test in progress: {str(e)}")
+        try:
+            await self.db.bump_in_progress(eval_run_id, 1)
+        except Exception as e:
+            logger.error(f"Error marking test in progress: {str(e)}")
 
     async def _update_eval_run_with_test_result(self, eval_run: EvaluationRun, test_result: TestCaseResult):
-        """Update the evaluation run in the database with a single test result.
+        """Queue a single test result for writing to the evaluation run.
 
-        Uses a per-evaluation-run lock to prevent race conditions when multiple
-        test threads try to update the same evaluation run simultaneously.
+        Results are buffered per evaluation run and written in one batch by a
+        debounced flush (Feature: batched-result-writes), so N parallel tests
+        cost ~N/batch_size DB writes instead of N. The orchestrator calls
+        force_flush() once all tests are done so nothing is lost.
+
+        A result for a test case already recorded in this run (a retried or
+        duplicated completion) is dropped instead of being appended twice.
         """
-        # Get the lock for this specific evaluation run
-        lock = await self._get_eval_run_lock(eval_run.id)
+        recorded = getattr(eval_run, '_recorded_testcase_ids', None)
+        if recorded is None:
+            recorded = {tc.testcase_id for tc in eval_run.test_cases}
+            eval_run._recorded_testcase_ids = recorded
+        if test_result.testcase_id in recorded:
+            logger.info(f"Test {test_result.testcase_id} already recorded for eval {eval_run.id} — skipping duplicate write")
+            await self._decrement_in_progress(eval_run.id)
+            return
+        recorded.add(test_result.testcase_id)
 
-        async with lock:
-            try:
-                # Fetch the latest eval run from DB
-                latest_eval_run = await self.db.get_evaluation_run(eval_run.id)
-                if not latest_eval_run:
-                    logger.error(f"Could not find evaluation run {eval_run.id} to update")
-                    return
+        # ==== FAILURE MODE CLASSIFICATION (Feature: hitl-intelligence) ====
+        if test_result.failure_mode is None and not test_result.passed:
+            test_result.failure_mode = self._classify_failure_mode(test_result)
 
-                # Add the new test result
-                latest_eval_run.test_cases.append(test_result)
+        pending = self._pending_results.get(eval_run.id)
+        if pending is not None:
+            # A scheduled flush hasn't taken the batch yet — it will pick this up
+            pending.append(test_result)
+            return
+
+        self._pending_results[eval_run.id] = [test_result]
+        previous = self._flush_tasks.get(eval_run.id)
+        self._flush_tasks[eval_run.id] = asyncio.create_task(
+            self._flush_after(eval_run.id, config.RESULT_FLUSH_DELAY_SECONDS, previous),
+            name=f"eval-{eval_run.id}-flush"
+        )
+
+    async def _flush_after(self, eval_run_id: str, delay: float, previous: Optional[asyncio.Task] = None):
+        """Debounced flush: wait for more results to accumulate, then write them.
+
+        Each flush waits for the previous one, so awaiting the most recent
+        flush task guarantees every earlier batch is in the DB as well.
+        """
+        await asyncio.sleep(delay)
+        batch = self._pending_results.pop(eval_run_id, None)
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        if batch:
+            await self._write_test_results(eval_run_id, batch)
+        if self._flush_tasks.get(eval_run_id) is asyncio.current_task():
+            self._flush_tasks.pop(eval_run_id, None)
+
+    async def _write_test_results(self, eval_run_id: str, batch: List[TestCaseResult]):
+        """Write a batch of test results to the evaluation run.
+
+        Results are appended and counters bumped server-side
+        (db.append_test_results), so no Python-side lock is needed and the
+        run document is never read back or rewritten here.
+        """
+        try:
+            await self.db.append_test_results(eval_run_id, batch)
+
+            # Add warnings if rate limit retries occurred — one set-style insert
+            # for the whole batch (duplicates are skipped by the DB)
+            warnings = [
+                f"Test {test_result.testcase_id} required {test_result.retry_count} retry(ies) due to rate limits"
+                for test_result in batch if test_result.retry_count > 0
+            ]
+            if warnings:
+                added = await self.db.add_evaluation_warnings(eval_run_id, warnings)
+                if added:
+                    logger.info(f"Added {added} rate limit warning(s) to eval run {eval_run_id}")
+
+            logger.debug(f"Flushed {len(batch)} test result(s) to eval run {eval_run_id}")
+
+        except Exception as e:
+            logger.error(f"Error updating eval run with test results: {str(e)}")
+
+    async def force_flush(self, eval_run_id: str):
+        """Wait until every buffered test result for the run has been written.
+
+        Waits at most RESULT_FLUSH_DELAY_SECONDS for the scheduled flush rather
+        than cancelling it, so a write is never interrupted half-way.
+        """
+        flush_task = self._flush_tasks.get(eval_run_id)
+        if flush_task is not None:
+            await asyncio.gather(flush_task, return_exceptions=True)
 
-                # Update counts
-                latest_eval_run.completed_tests = len(latest_eval_run.test_cases)
-                latest_eval_run.in_progress_tests = max(0, (latest_eval_run.in_progress_tests or 0) - 1)
-                latest_eval_run.passed_count = sum(1 for tc in latest_eval_run.test_cases if tc.passed)
-                latest_eval_run.failed_tests = latest_eval_run.completed_tests - latest_eval_run.passed_count
-                
-                # Add warning if rate limit retries occurred
-                if test_result.retry_count > 0:
-                    warning_msg = f"Test {test_result.testcase_id} required {test_result.retry_count} retry(ies) due to rate limits"
-                    if warning_msg not in latest_eval_run.warnings:
-                        latest_eval_run.warnings.append(warning_msg)
-                        logger.info(f"Added rate limit warning for test {test_result.testcase_id}")
-                
-                # Save back to database
-                await self.db.update_evaluation_run(latest_eval_run)
-                
-                logger.debug(f"Updated eval run {eval_run.id} with test result for {test_result.testcase_id} - Progress: {latest_eval_run.completed_tests}/{latest_eval_run.total_tests}")
-                
-            except Exception as e:
-                logger.error(f"Error updating eval run with test result: {str(e)}")
-    
     def _generate_mock_response(self, test_case, eval_run: EvaluationRun):
         """Generate a synthetic agent response for demo mode.
 
         Uses the test case's expected tools and response to produce a
         realistic-looking mock output so the LLM judge can evaluate it.
         """
+        # Per-test RNG seeded from (eval run, test case): reproducible demo runs
+        # and no contention on the module-level random state across tests.
+        rng = random.Random(f"{eval_run.id}:{test_case.id}")
+        rand = rng.random
+
         # Decide if this mock "passes" — weighted by tool count (harder tests fail more)
         tool_count = len(test_case.minimal_tool_set)
         pass_prob = max(0.35, 0.85 - tool_count * 0.08)
-        will_pass = random.random() < pass_prob
+        will_pass = rand() < pass_prob
 
         # Build synthetic tool calls from the test case's expected tool set
         tool_calls = []
         for tool_name in test_case.minimal_tool_set:
             # Sometimes skip a tool on failure
-            if not will_pass and random.random() > 0.7:
+            if not will_pass and rand() > 0.7:
                 continue
             tool_calls.append({
                 "name": tool_name,
                 "input_parameters": {"input": test_case.input[:80]},
-                "result": "success" if (will_pass or random.random() > 0.3) else "error",
+                "result": "success" if (will_pass or rand() > 0.3) else "error",
             })
         # On failure, occasionally call a wrong tool
-        if not will_pass and random.random() > 0.6:
+        if not will_pass and rand() > 0.6:
             tool_calls.append({
                 "name": "unknown_action",
                 "input_parameters": {"error": "wrong_tool_selected"},
@@ -1290,7 +2199,7 @@ class EvaluatorService:
                 f"Partial completion of '{test_case.name}'. ",
                 f"I processed the request for '{test_case.name}' but missed some steps. ",
             ]
-            response_text = random.choice(failure_reasons)
+            response_text = rng.choice(failure_reasons)
             if test_case.expected_response:
                 # Include a partial/garbled version of the expected response
                 words = test_case.expected_response.split()
@@ -1311,16 +2220,14 @@ class EvaluatorService:
         sends a keep_alive=0 request to force-unload the agent model before judging.
         """
         try:
-            ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.post(
-                    f"{ollama_host}/api/generate",
-                    json={"model": model_name, "keep_alive": 0},
-                )
-                if resp.status_code == 200:
-                    logger.info(f"Unloaded Ollama model '{model_name}' from GPU memory")
-                else:
-                    logger.warning(f"Failed to unload model '{model_name}': HTTP {resp.status_code}")
+            resp = await self._ollama_http.post(
+                f"{self._ollama_host}/api/generate",
+                json={"model": model_name, "keep_alive": 0},
+            )
+            if resp.status_code == 200:
+                logger.info(f"Unloaded Ollama model '{model_name}' from GPU memory")
+            else:
+                logger.warning(f"Failed to unload model '{model_name}': HTTP {resp.status_code}")
         except Exception as e:
             logger.warning(f"Could not unload Ollama model '{model_name}': {e}")
 
@@ -1329,6 +2236,7 @@ class EvaluatorService:
         test_exec.agent_call_start = time.time()
 
         # ── Demo mode: generate synthetic response instead of HTTP call ──
+        # Returns before the retry wrapper and countdown ticker are set up.
         if getattr(eval_run, 'demo_mode', False):
             await asyncio.sleep(random.uniform(0.3, 1.5))  # simulate latency
             mock = self._generate_mock_response(test_case, eval_run)
@@ -1343,51 +2251,45 @@ class EvaluatorService:
             logger.info(f"[demo-mode] Mock response generated for test {test_case.id}")
             return
 
-        async def _make_agent_call():
-            """Inner function to make the agent HTTP call (for retry wrapper)."""
-            # Use a generous timeout for browser automation agents — vision model
-            # inference + multi-step browser tasks can easily exceed 5 minutes.
-            # The timeout covers the entire agent execution (all steps).
-            agent_timeout = max(eval_run.timeout_seconds, 600)  # at least 10 minutes
-            async with httpx.AsyncClient(timeout=httpx.Timeout(agent_timeout, connect=30.0)) as client:
-                headers = {
-                    "Content-Type": "application/json",
-                    "X-CorrelationId": eval_run.id,
-                    "X-TestCaseId": test_case.id
-                }
-
-                # Prepare request payload
-                payload = {
-                    "dataset_id": eval_run.dataset_id,
-                    "test_case_id": test_case.id,
-                    "agent_id": eval_run.agent_id,
-                    "evaluation_run_id": eval_run.id,
-                    "input": test_case.input
-                }
+        # Request pieces are identical across retries — build them once per test
+        agent_timeout, base_headers = _agent_request_defaults(eval_run)
+        headers = {**base_headers, "X-TestCaseId": test_case.id}
+
+        # Prepare request payload
+        payload = {
+            "dataset_id": eval_run.dataset_id,
+            "test_case_id": test_case.id,
+            "agent_id": eval_run.agent_id,
+            "evaluation_run_id": eval_run.id,
+            "input": test_case.input
+        }
 
-                # Include system prompt if this eval is bound to a prompt version
-                cached_prompt = getattr(eval_run, '_cached_prompt_text', None)
-                if cached_prompt:
-                    payload["system_prompt"] = cached_prompt
+        # Include system prompt if this eval is bound to a prompt version
+        cached_prompt = getattr(eval_run, '_cached_prompt_text', None)
+        if cached_prompt:
+            payload["system_prompt"] = cached_prompt
 
-                # Call agent endpoint
-                response = await client.post(
-                    eval_run.agent_endpoint,
-                    json=payload,
-                    headers=headers
-                )
-                
-                # Check for rate limit in response
-                if response.status_code == 429:
-                    raise Exception(f"HTTP 429: Rate limit reached - {response.text}")
-                
-                # Check for 500 errors that contain rate limit info
-                if response.status_code == 500:
-                    response_text = response.text
-                    if '429' in response_text or 'RateLimitReached' in response_text:
-                        raise Exception(f"HTTP 500 (rate limit): {response_text}")
-                
-                return response
+        async def _make_agent_call():
+            """Inner function to make the agent HTTP call (for retry wrapper)."""
+            # Call agent endpoint
+            response = await self._agent_http.post(
+                eval_run.agent_endpoint,
+                json=payload,
+                headers=headers,
+                timeout=agent_timeout,
+            )
+            
+            # Check for rate limit in response
+            if response.status_code == 429:
+                raise Exception(f"HTTP 429: Rate limit reached - {response.text}")
+            
+            # Check for 500 errors that contain rate limit info
+            if response.status_code == 500:
+                response_text = response.text
+                if '429' in response_text or 'RateLimitReached' in response_text:
+                    raise Exception(f"HTTP 500 (rate limit): {response_text}")
+            
+            return response
         
         async def _on_agent_retry(attempt: int, max_attempts: int, wait_time: float, error: str):
             """Callback to log retry attempts to status history."""
@@ -1401,51 +2303,49 @@ class EvaluatorService:
             )
         
         # ── Countdown ticker — polls agent /progress and updates UI ────
-        _countdown_done = asyncio.Event()
-
         async def _countdown_ticker():
-            """Background task: poll agent's /progress endpoint and update status."""
-            from urllib.parse import urlparse
-            parsed = urlparse(eval_run.agent_endpoint)
-            progress_url = f"{parsed.scheme}://{parsed.netloc}/progress"
+            """Background task: poll agent's /progress endpoint and update status.
+
+            Runs until cancelled by the caller once the agent call returns.
+            """
+            progress_url = getattr(eval_run, '_progress_url', None) or _agent_side_url(eval_run.agent_endpoint, "/progress")
             test_name = test_case.name or test_case.id
+            # max_steps / action_timeout are fixed for the duration of a test —
+            # read them from the first successful poll only
+            max_steps = None
+            timeout_val = None
 
             await asyncio.sleep(2)  # let the agent spin up before first poll
-            while not _countdown_done.is_set():
+            while True:
                 # Stop polling if evaluation was cancelled
                 if eval_run.id in self._cancelled_evals:
                     break
                 try:
-                    async with httpx.AsyncClient(timeout=3.0) as pc:
-                        pr = await pc.get(progress_url)
-                        if pr.status_code == 200:
-                            d = pr.json()
-                            step = d.get("current_step", 0)
+                    pr = await self._progress_http.get(progress_url)
+                    if pr.status_code == 200:
+                        d = orjson.loads(pr.content)
+                        if max_steps is None:
                             max_steps = d.get("max_steps", 15)
-                            phase = d.get("phase", "?")
-                            remaining = d.get("step_remaining_seconds", 0)
                             timeout_val = d.get("action_timeout", 30)
-                            elapsed_total = time.time() - test_exec.agent_call_start
-
-                            # Build a progress bar: ████░░░░ 15s / 30s
-                            bar_len = 10
-                            filled = int(bar_len * (1 - remaining / timeout_val)) if timeout_val else 0
-                            bar = "█" * filled + "░" * (bar_len - filled)
-
-                            msg = (
-                                f"🤖 {test_name}  •  "
-                                f"Step {step}/{max_steps} ({phase})  "
-                                f"{bar} {remaining:.0f}s left  •  "
-                                f"Total: {elapsed_total:.0f}s"
-                            )
-                            await self._update_status_message(eval_run.id, msg)
+                        step = d.get("current_step", 0)
+                        phase = d.get("phase", "?")
+                        remaining = d.get("step_remaining_seconds", 0)
+                        elapsed_total = time.time() - test_exec.agent_call_start
+
+                        # Build a progress bar: ████░░░░ 15s / 30s
+                        filled = int(_PROGRESS_BAR_LEN * (1 - remaining / timeout_val)) if timeout_val else 0
+                        bar = _PROGRESS_BARS[max(0, min(_PROGRESS_BAR_LEN, filled))]
+
+                        msg = (
+                            f"🤖 {test_name}  •  "
+                            f"Step {step}/{max_steps} ({phase})  "
+                            f"{bar} {remaining:.0f}s left  •  "
+                            f"Total: {elapsed_total:.0f}s"
+                        )
+                        await self._update_status_message(eval_run.id, msg)
                 except Exception:
                     pass  # progress endpoint unavailable — skip silently
-                try:
-                    await asyncio.wait_for(_countdown_done.wait(), timeout=3.0)
-                    break
-                except asyncio.TimeoutError:
-                    pass  # loop again
+                await asyncio.sleep(3.0)
 
         countdown_task = asyncio.create_task(_countdown_ticker())
 
@@ -1532,12 +2432,8 @@ class EvaluatorService:
             logger.error(f"Exception during test execution {test_case.id}: POST {eval_run.agent_endpoint}: {error_detail}")
         finally:
             # Stop the countdown ticker
-            _countdown_done.set()
             countdown_task.cancel()
-            try:
-                await countdown_task
-            except (Exception, asyncio.CancelledError):
-                pass
+            await asyncio.gather(countdown_task, return_exceptions=True)
             # Record agent call duration
             test_exec.agent_call_duration = time.time() - test_exec.agent_call_start
     
@@ -1551,8 +2447,9 @@ class EvaluatorService:
         # Start timing the judge phase
         test_exec.judge_call_start = time.time()
         
-        # Initialize OpenAI client if needed
-        self.OpenAIClientInitialization()
+        # Initialize OpenAI client if needed (once per process, not per test)
+        if not self.openai_client:
+            self.OpenAIClientInitialization()
         
         try:
             # Get agent output as string
@@ -1573,14 +2470,13 @@ class EvaluatorService:
             # ----------------------------------------------------------
             # RUBRIC MODE SHORT-CIRCUIT (Feature: rubric-evaluation)
             # ----------------------------------------------------------
-            judge_cfg = getattr(eval_run, '_cached_judge_config', None) or _DEFAULT_JUDGE_CONFIG
-            scoring_mode = judge_cfg.get('scoring_mode', 'binary')
+            judge_settings = _resolve_judge_settings(eval_run)
 
-            if scoring_mode == 'rubric' and judge_cfg.get('rubric'):
+            if judge_settings['scoring_mode'] == 'rubric' and judge_settings['rubric']:
                 if eval_run.verbose_logging:
                     await self._update_status_message(
                         eval_run.id,
-                        f"  📋 Using rubric scoring mode ({len(judge_cfg['rubric'])} criteria)"
+                        f"  📋 Using rubric scoring mode ({len(judge_settings['rubric'])} criteria)"
                     )
 
                 rubric_result = await self._evaluate_test_case_with_rubric(
@@ -1627,113 +2523,54 @@ class EvaluatorService:
             # ----------------------------------------------------------
             expected_tools = []
             all_tools_called = True
+            # Set of tool names the agent actually called — O(1) membership checks below
+            actual_tool_set = set(test_exec.actual_tools)
 
             if mode_behavior["eval_expected_tools"]:
                 for tool_name in test_case.minimal_tool_set:
-                    was_called = tool_name in test_exec.actual_tools
+                    was_called = tool_name in actual_tool_set
                     expected_tools.append(ExpectedToolResult(
                         name_of_tool=tool_name,
                         was_called=was_called
                     ))
-                all_tools_called = all(tool.was_called for tool in expected_tools) if expected_tools else True
+                    if not was_called:
+                        all_tools_called = False
 
             # ----------------------------------------------------------
-            # 2. Evaluate tool-level assertions (tool_level mode only)
+            # 2-4. Tool, behavior and response quality assertions are judged
+            # independently, so their LLM calls run concurrently (bounded by
+            # the LLM semaphore) instead of one round-trip after another.
             # ----------------------------------------------------------
-            tool_expectations = []
-            all_tool_assertions_passed = True
+            async def _judge_tools():
+                """2. Evaluate tool-level assertions (tool_level mode only)."""
+                if not mode_behavior["eval_tool_assertions"]:
+                    return [], True
 
-            if mode_behavior["eval_tool_assertions"]:
                 # Pre-compute tool summary for verbose logging
                 if eval_run.verbose_logging:
-                    from collections import defaultdict
-                    tool_summary = defaultdict(lambda: {'calls': 0, 'assertions': 0})
+                    tool_summary: Dict[str, List[int]] = {}  # tool name → [calls, assertions]
                     for tool_exp in test_case.tool_expectations:
-                        total_assertions = sum(len(arg.assertion) for arg in tool_exp.arguments)
-                        tool_summary[tool_exp.name]['calls'] += 1
-                        tool_summary[tool_exp.name]['assertions'] += total_assertions
+                        stats = tool_summary.setdefault(tool_exp.name, [0, 0])
+                        stats[0] += 1
+                        for arg in tool_exp.arguments:
+                            stats[1] += len(arg.assertion)
 
-                    for tool_name, stats in tool_summary.items():
-                        calls_text = f"{stats['calls']} call" + ("s" if stats['calls'] > 1 else "")
+                    for tool_name, (calls, assertion_count) in tool_summary.items():
+                        calls_text = f"{calls} call" + ("s" if calls > 1 else "")
                         await self._update_status_message(
                             eval_run.id,
-                            f"  📋 Evaluating {tool_name} ({calls_text}, {stats['assertions']} assertions)"
+                            f"  📋 Evaluating {tool_name} ({calls_text}, {assertion_count} assertions)"
                         )
 
-                for tool_idx, tool_exp in enumerate(test_case.tool_expectations):
-                    tool_was_called = tool_exp.name in test_exec.actual_tools
-
-                    if not tool_was_called:
-                        arg_results = []
-                        for arg_assertion in tool_exp.arguments:
-                            assertions = [
-                                AssertionResult(
-                                    passed=False,
-                                    llm_judge_output=f"Tool '{tool_exp.name}' was not called; cannot evaluate argument assertions."
-                                )
-                                for _ in arg_assertion.assertion
-                            ]
-                            arg_results.append(ArgumentAssertionResult(
-                                name_of_argument=arg_assertion.name,
-                                assertions=assertions
-                            ))
-                        all_tool_assertions_passed = False
-                    else:
-                        batched_result = await self._evaluate_tool_assertions_batched(
-                            eval_run=eval_run,
-                            tool_exp=tool_exp,
-                            test_case=test_case,
-                            test_exec=test_exec
-                        )
-
-                        if batched_result is not None:
-                            arg_results = batched_result
-                            for arg_result in arg_results:
-                                for assertion in arg_result.assertions:
-                                    if not assertion.passed:
-                                        all_tool_assertions_passed = False
-                        else:
-                            arg_results = []
-                            for arg_assertion in tool_exp.arguments:
-                                assertions = []
-                                for assertion_text in arg_assertion.assertion:
-                                    result = _try_deterministic_assertion(
-                                        assertion_text, arg_assertion.name,
-                                        tool_exp.name, test_exec.tool_calls
-                                    )
-                                    if result is None:
-                                        result = await self._evaluate_single_assertion(
-                                            eval_run=eval_run,
-                                            assertion_text=assertion_text,
-                                            tool_name=tool_exp.name,
-                                            argument_name=arg_assertion.name,
-                                            test_case=test_case,
-                                            test_exec=test_exec,
-                                            assertion_type="tool_argument"
-                                        )
-                                    else:
-                                        logger.info(f"Deterministic assertion: '{assertion_text}' → {result['passed']}")
-                                    assertions.append(AssertionResult(
-                                        passed=result['passed'],
-                                        llm_judge_output=result['reasoning']
-                                    ))
-                                    if not result['passed']:
-                                        all_tool_assertions_passed = False
-                                arg_results.append(ArgumentAssertionResult(
-                                    name_of_argument=arg_assertion.name,
-                                    assertions=assertions
-                                ))
-
-                    tool_expectations.append(ToolExpectationResult(
-                        name_of_tool=tool_exp.name,
-                        arguments=arg_results
-                    ))
+                tool_results = await asyncio.gather(*(
+                    self._evaluate_tool_expectation(eval_run, tool_exp, test_case, test_exec, actual_tool_set)
+                    for tool_exp in test_case.tool_expectations
+                ))
+                tool_expectations = [tool_result for tool_result, _, _ in tool_results]
 
                 # Log aggregated tool results in verbose mode
                 if eval_run.verbose_logging and tool_expectations:
-                    for tool_result in tool_expectations:
-                        passed_args = sum(1 for arg in tool_result.arguments
-                                         if all(a.passed for a in arg.assertions))
+                    for tool_result, _, passed_args in tool_results:
                         total_args = len(tool_result.arguments)
                         icon = "✓" if passed_args == total_args else "✗"
                         await self._update_status_message(
@@ -1741,56 +2578,96 @@ class EvaluatorService:
                             f"  {icon} {tool_result.name_of_tool}: {passed_args}/{total_args} arguments passed"
                         )
 
-            # ----------------------------------------------------------
-            # 3. Evaluate behavior assertions (hybrid mode only)
-            # ----------------------------------------------------------
-            behavior_assertions_result = []
-            behavior_assertions_passed = True
+                return tool_expectations, all(passed for _, passed, _ in tool_results)
 
-            if mode_behavior["eval_behavior_assertions"]:
-                behavior_assertions_result, behavior_assertions_passed = \
-                    await self._evaluate_behavior_assertions(
-                        eval_run, test_case.behavior_assertions, test_case, test_exec
-                    )
+            has_quality_assertion = bool(
+                mode_behavior["eval_response_quality"] and
+                test_case.response_quality_expectation and
+                hasattr(test_case.response_quality_expectation, 'assertion')
+            )
 
-            # ----------------------------------------------------------
-            # 4. Evaluate response quality assertion (all modes)
-            # ----------------------------------------------------------
-            response_quality = None
-            response_quality_passed = True
+            # Behavior and response quality assertions judge the same trace —
+            # when both apply, ask for all of them in one call (hybrid mode)
+            behavior_judged = quality_judged = None
+            if has_quality_assertion and mode_behavior["eval_behavior_assertions"] and test_case.behavior_assertions:
+                combined = await self._evaluate_behavior_and_quality_combined(eval_run, test_case, test_exec)
+                if combined is not None:
+                    behavior_judged, quality_judged = combined
+
+            async def _judge_behavior():
+                """3. Evaluate behavior assertions (hybrid mode only)."""
+                if not mode_behavior["eval_behavior_assertions"]:
+                    return [], True
+                return await self._evaluate_behavior_assertions(
+                    eval_run, test_case.behavior_assertions, test_case, test_exec,
+                    judged=behavior_judged,
+                )
 
-            if mode_behavior["eval_response_quality"] and \
-               test_case.response_quality_expectation and \
-               hasattr(test_case.response_quality_expectation, 'assertion'):
-                if eval_run.verbose_logging:
-                    await self._update_status_message(
-                        eval_run.id,
-                        f"  📋 Evaluating response quality assertion"
-                    )
+            async def _judge_response_quality():
+                """4. Evaluate response quality assertion (all modes)."""
+                if not has_quality_assertion:
+                    return None, True
 
-                result = await self._evaluate_single_assertion(
-                    eval_run=eval_run,
-                    assertion_text=test_case.response_quality_expectation.assertion,
-                    tool_name=None,
-                    argument_name=None,
-                    test_case=test_case,
-                    test_exec=test_exec,
-                    assertion_type="response_quality"
-                )
+                if quality_judged is not None:
+                    result = quality_judged
+                else:
+                    if eval_run.verbose_logging:
+                        await self._update_status_message(
+                            eval_run.id,
+                            f"  📋 Evaluating response quality assertion"
+                        )
 
-                response_quality = ResponseQualityResult(
-                    passed=result['passed'],
-                    llm_judge_output=result['reasoning']
-                )
-                response_quality_passed = result['passed']
+                    result = await self._evaluate_single_assertion(
+                        eval_run=eval_run,
+                        assertion_text=test_case.response_quality_expectation.assertion,
+                        tool_name=None,
+                        argument_name=None,
+                        test_case=test_case,
+                        test_exec=test_exec,
+                        assertion_type="response_quality"
+                    )
 
                 if eval_run.verbose_logging:
-                    icon = "✓" if response_quality_passed else "✗"
+                    icon = "✓" if result['passed'] else "✗"
                     await self._update_status_message(
                         eval_run.id,
-                        f"  {icon} Response quality: {'passed' if response_quality_passed else 'failed'}"
+                        f"  {icon} Response quality: {'passed' if result['passed'] else 'failed'}"
                     )
 
+                return ResponseQualityResult(
+                    passed=result['passed'],
+                    llm_judge_output=result['reasoning']
+                ), result['passed']
+
+            def _skip_response_quality():
+                """Fast-fail stand-in for section 4 — no judge call."""
+                if not has_quality_assertion:
+                    return None, True
+                logger.info(f"Fast-fail: skipping response quality judge for {test_case.id} (tool checks failed)")
+                return ResponseQualityResult(
+                    passed=False,
+                    llm_judge_output="Skipped (fast-fail): tool checks already failed this test."
+                ), False
+
+            if eval_run.fast_fail_enabled and assertion_mode == "tool_level":
+                # Fast-fail (Feature: fast-fail): a missed tool or failed tool
+                # assertion already fails the test, so the response quality
+                # judge only runs when the tool checks pass.
+                (
+                    (tool_expectations, all_tool_assertions_passed),
+                    (behavior_assertions_result, behavior_assertions_passed),
+                ) = await asyncio.gather(_judge_tools(), _judge_behavior())
+                if all_tools_called and all_tool_assertions_passed:
+                    response_quality, response_quality_passed = await _judge_response_quality()
+                else:
+                    response_quality, response_quality_passed = _skip_response_quality()
+            else:
+                (
+                    (tool_expectations, all_tool_assertions_passed),
+                    (behavior_assertions_result, behavior_assertions_passed),
+                    (response_quality, response_quality_passed),
+                ) = await asyncio.gather(_judge_tools(), _judge_behavior(), _judge_response_quality())
+
             # ----------------------------------------------------------
             # 5. Calculate overall passed status (mode-dependent)
             # ----------------------------------------------------------
@@ -1877,6 +2754,178 @@ class EvaluatorService:
                 total_duration_seconds=test_exec.total_duration
             )
     
+    async def _judge_completion(self, eval_run: EvaluationRun, system_prompt: str, user_prompt: str, call_llm, on_retry=None) -> RetryResult:
+        """Run a judge LLM call with retries, reusing identical prompts when the run allows it.
+
+        Feature: judge-cache
+        For runs with judge_cache_enabled, responses are kept in an in-process
+        LRU keyed by a hash of (system prompt, user prompt, model), backed by
+        the judge_cache table so verdicts survive restarts and carry over to
+        reruns. The prompts embed the assertion, the trace and the judge
+        config, so changing any of them changes the key. A hit returns the
+        stored response without its usage, so it is not billed again in cost
+        attribution. Responses that do not parse as JSON are not cached.
+
+        For every run, a prompt identical to one still in flight (e.g. the same
+        auto-generated assertion twice) waits for that call instead of sending
+        its own; it too gets the response without usage. Without the cache this
+        sharing stays within the run, so a run that opted out never reuses
+        another run's verdict.
+        """
+        key = hashlib.blake2b(
+            system_prompt.encode() + b"\x00" + user_prompt.encode() + b"\x00" + config.LLM_MODEL.encode(),
+            digest_size=16,
+        ).hexdigest()
+        if eval_run.judge_cache_enabled:
+            cached = self._judge_cache.get(key)
+            if cached is not None:
+                self._judge_cache.move_to_end(key)
+                logger.debug(f"Judge cache hit for eval {eval_run.id}")
+                return RetryResult(result=cached, retry_count=0, had_rate_limit=False)
+            try:
+                content = await self.db.get_judge_cache_entry(key)
+            except Exception as e:
+                logger.debug(f"Judge cache lookup failed: {e}")
+                content = None
+            if content is not None:
+                cached = SimpleNamespace(
+                    choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None
+                )
+                self._remember_judge_response(key, cached)
+                logger.debug(f"Judge cache hit (persisted) for eval {eval_run.id}")
+                return RetryResult(result=cached, retry_count=0, had_rate_limit=False)
+
+        inflight_key = key if eval_run.judge_cache_enabled else f"{eval_run.id}:{key}"
+        inflight = self._judge_inflight.get(inflight_key)
+        if inflight is not None:
+            try:
+                # shield: a cancelled follower must not cancel the shared call
+                response = await asyncio.shield(inflight)
+                logger.debug(f"Joined in-flight judge call for eval {eval_run.id}")
+                return RetryResult(
+                    result=SimpleNamespace(choices=response.choices, usage=None),
+                    retry_count=0, had_rate_limit=False,
+                )
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # this caller was cancelled
+                # The first caller was cancelled — send our own request below
+
+        future = asyncio.get_running_loop().create_future()
+        self._judge_inflight[inflight_key] = future
+        try:
+            retry_result = await retry_with_backoff(call_llm, on_retry=on_retry)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved — no warning when nobody was waiting
+            raise
+        else:
+            future.set_result(retry_result.result)
+        finally:
+            if self._judge_inflight.get(inflight_key) is future:
+                del self._judge_inflight[inflight_key]
+
+        if eval_run.judge_cache_enabled:
+            content = retry_result.result.choices[0].message.content or ""
+            try:
+                _extract_json(content)
+            except json.JSONDecodeError:
+                return retry_result
+            self._remember_judge_response(key, SimpleNamespace(choices=retry_result.result.choices, usage=None))
+            try:
+                await self.db.set_judge_cache_entry(key, content, config.LLM_MODEL)
+            except Exception as e:
+                logger.debug(f"Judge cache store failed: {e}")
+        return retry_result
+
+    def _remember_judge_response(self, key: str, response) -> None:
+        """Insert into the in-process judge LRU, evicting the oldest entry when full."""
+        self._judge_cache[key] = response
+        if len(self._judge_cache) > config.JUDGE_CACHE_MAX_ENTRIES:
+            self._judge_cache.popitem(last=False)
+
+    async def _evaluate_tool_expectation(self, eval_run: EvaluationRun, tool_exp, test_case, test_exec, actual_tool_set: set):
+        """Judge every argument assertion of one expected tool call.
+
+        Returns:
+            (ToolExpectationResult, all_passed: bool, passed_args: int) where
+            passed_args counts arguments whose assertions all passed
+        """
+        all_passed = True
+        passed_args = 0
+
+        tool_was_called = tool_exp.name in actual_tool_set
+
+        if not tool_was_called:
+            arg_results = []
+            for arg_assertion in tool_exp.arguments:
+                passed_args += not arg_assertion.assertion  # nothing to fail
+                assertions = [
+                    AssertionResult(
+                        passed=False,
+                        llm_judge_output=f"Tool '{tool_exp.name}' was not called; cannot evaluate argument assertions."
+                    )
+                    for _ in arg_assertion.assertion
+                ]
+                arg_results.append(ArgumentAssertionResult(
+                    name_of_argument=arg_assertion.name,
+                    assertions=assertions
+                ))
+            all_passed = False
+        else:
+            batched_result = await self._evaluate_tool_assertions_batched(
+                eval_run=eval_run,
+                tool_exp=tool_exp,
+                test_case=test_case,
+                test_exec=test_exec
+            )
+
+            if batched_result is not None:
+                arg_results, batch_passed, passed_args = batched_result
+                if not batch_passed:
+                    all_passed = False
+            else:
+                arg_results = []
+                for arg_assertion in tool_exp.arguments:
+                    assertions = []
+                    arg_passed = True
+                    for assertion_text in arg_assertion.assertion:
+                        result = _try_deterministic_assertion(
+                            assertion_text, arg_assertion.name,
+                            tool_exp.name, test_exec.tool_calls
+                        )
+                        if result is None:
+                            result = await self._evaluate_single_assertion(
+                                eval_run=eval_run,
+                                assertion_text=assertion_text,
+                                tool_name=tool_exp.name,
+                                argument_name=arg_assertion.name,
+                                test_case=test_case,
+                                test_exec=test_exec,
+                                assertion_type="tool_argument"
+                            )
+                        else:
+                            logger.info(f"Deterministic assertion: '{assertion_text}' → {result['passed']}")
+                        assertions.append(AssertionResult(
+                            passed=result['passed'],
+                            llm_judge_output=result['reasoning']
+                        ))
+                        if not result['passed']:
+                            all_passed = arg_passed = False
+                    passed_args += arg_passed
+                    arg_results.append(ArgumentAssertionResult(
+                        name_of_argument=arg_assertion.name,
+                        assertions=assertions
+                    ))
+
+        return ToolExpectationResult(
+            name_of_tool=tool_exp.name,
+            arguments=arg_results
+        ), all_passed, passed_args
+
     async def _evaluate_test_case_with_rubric(
         self, eval_run: EvaluationRun, test_exec, test_case
     ) -> dict:
@@ -1889,78 +2938,108 @@ class EvaluatorService:
 
         Returns dict with keys: rubric_scores, rubric_average_score, passed
         """
-        judge_cfg = getattr(eval_run, '_cached_judge_config', None) or _DEFAULT_JUDGE_CONFIG
-        rubric_criteria = judge_cfg.get('rubric', [])
-        pass_threshold = judge_cfg.get('pass_threshold') or 3.0
+        judge_settings = _resolve_judge_settings(eval_run)
+        judge_cfg = judge_settings['config']
+        rubric_criteria = judge_settings['rubric']
+        pass_threshold = judge_settings['pass_threshold']
 
         if not rubric_criteria:
             logger.warning(f"Rubric mode but no criteria defined — falling back to binary")
             return None  # caller should fall back to binary
 
-        # Build rubric description block for the prompt
-        rubric_lines = []
-        for criterion in rubric_criteria:
-            c_name = criterion.get('name', 'unnamed')
-            c_desc = criterion.get('description', '')
-            rubric_lines.append(f"\n### {c_name}")
-            if c_desc:
-                rubric_lines.append(f"{c_desc}")
-            for level in criterion.get('levels', []):
-                rubric_lines.append(f"  - Score {level['score']}: {level['description']}")
-        rubric_text = "\n".join(rubric_lines)
+        # Deterministic shortcut: if the test only has tool-argument assertions
+        # and every one resolves without the LLM, score the rubric directly
+        deterministic = _deterministic_rubric_checks(test_case, test_exec)
+        if deterministic:
+            passed_checks = sum(1 for r in deterministic if r["passed"])
+            all_passed = passed_checks == len(deterministic)
+            score = 5 if all_passed else 2
+            reasoning = f"Deterministic {'pass' if all_passed else 'fail'}: {passed_checks}/{len(deterministic)} assertion checks passed."
+            logger.info(f"Rubric for {test_case.id} resolved deterministically — skipping LLM ({reasoning})")
+            return {
+                "rubric_scores": [
+                    RubricScoreResult(criterion=c.get('name', 'unnamed'), score=score, reasoning=reasoning)
+                    for c in rubric_criteria
+                ],
+                "rubric_average_score": float(score),
+                "passed": score >= pass_threshold,
+            }
+
+        # Rubric description block and criteria names are fixed for the run —
+        # build them once and keep them with the resolved judge settings
+        rubric_text = judge_settings.get('rubric_text')
+        if rubric_text is None:
+            rubric_lines = []
+            for criterion in rubric_criteria:
+                c_name = criterion.get('name', 'unnamed')
+                c_desc = criterion.get('description', '')
+                rubric_lines.append(f"\n### {c_name}")
+                if c_desc:
+                    rubric_lines.append(f"{c_desc}")
+                for level in criterion.get('levels', []):
+                    rubric_lines.append(f"  - Score {level['score']}: {level['description']}")
+            rubric_text = judge_settings['rubric_text'] = "\n".join(rubric_lines)
+            judge_settings['criteria_names'] = [c.get('name', 'unnamed') for c in rubric_criteria]
+        criteria_names = judge_settings['criteria_names']
+
+        # Read the test case fields once (test_exec is always a _TestExecution)
+        response_quality_expectation = getattr(test_case, 'response_quality_expectation', None)
 
         # Build the assertions summary for context
-        assertions_summary = []
-        if hasattr(test_case, 'tool_expectations'):
-            for tool_exp in test_case.tool_expectations:
-                for arg in tool_exp.arguments:
-                    for a in arg.assertion:
-                        assertions_summary.append(f"- [{tool_exp.name}.{arg.name}] {a}")
-        if hasattr(test_case, 'behavior_assertions'):
-            for ba in (test_case.behavior_assertions or []):
-                assertions_summary.append(f"- [behavior] {ba.assertion}")
-        if hasattr(test_case, 'response_quality_expectation') and test_case.response_quality_expectation:
-            assertions_summary.append(f"- [response_quality] {test_case.response_quality_expectation.assertion}")
+        assertions_summary = [
+            f"- [{tool_exp.name}.{arg.name}] {a}"
+            for tool_exp in getattr(test_case, 'tool_expectations', None) or []
+            for arg in tool_exp.arguments
+            for a in arg.assertion
+        ]
+        assertions_summary.extend(
+            f"- [behavior] {ba.assertion}" for ba in getattr(test_case, 'behavior_assertions', None) or []
+        )
+        if response_quality_expectation:
+            assertions_summary.append(f"- [response_quality] {response_quality_expectation.assertion}")
 
         assertions_block = "\n".join(assertions_summary) if assertions_summary else "No specific assertions defined."
 
         # Build the rubric evaluation prompt
         system_prompt = judge_cfg['system_prompt']
-        criteria_names = [c.get('name', 'unnamed') for c in rubric_criteria]
-
-        user_prompt = (
-            f"You are evaluating an AI agent's performance on a test case using a rubric scoring system.\n"
-            f"\n"
-            f"**Test Context:**\n"
-            f"- Input: {getattr(test_case, 'input', '')}\n"
-            f"- Description: {getattr(test_case, 'description', '')}\n"
-            f"- Expected Response: {getattr(test_case, 'expected_response', '') or 'N/A'}\n"
-            f"\n"
-            f"**Agent's Actual Performance:**\n"
-            f"- Tool Calls: {json.dumps(test_exec.tool_calls, indent=2) if hasattr(test_exec, 'tool_calls') else '[]'}\n"
-            f"- Tools Used: {', '.join(test_exec.actual_tools) if hasattr(test_exec, 'actual_tools') else 'none'}\n"
-            f"- Agent Response: {test_exec.agent_response if hasattr(test_exec, 'agent_response') else 'No output'}\n"
-            f"\n"
-            f"**Assertions (for reference):**\n"
-            f"{assertions_block}\n"
-            f"\n"
-            f"**Rubric Criteria (score each 1-5):**\n"
-            f"{rubric_text}\n"
-            f"\n"
-            f"**Task:** Score the agent's performance on EACH criterion above using the provided scale.\n"
-            f"For each criterion, assign a score (1-5) and provide a one-sentence reasoning.\n"
-            f"\n"
-            f"Respond with ONLY a JSON object:\n"
-            f"{{\n"
-            f"    \"scores\": [\n"
-            f"        {{\"criterion\": \"{criteria_names[0] if criteria_names else 'example'}\", \"score\": 4, \"reasoning\": \"One sentence explanation.\"}}"
-        )
+
+        # Tool calls go in compact (no indent) — same content, ~15% fewer prompt tokens
+        tool_calls_json = test_exec.tool_calls_json(compact=True)
+        example_criterion = criteria_names[0] if criteria_names else 'example'
+
+        parts = [
+            "You are evaluating an AI agent's performance on a test case using a rubric scoring system.\n"
+            "\n"
+            "**Test Context:**\n",
+            f"- Input: {test_case.input}\n",
+            f"- Description: {getattr(test_case, 'description', '')}\n",
+            f"- Expected Response: {getattr(test_case, 'expected_response', '') or 'N/A'}\n",
+            "\n"
+            "**Agent's Actual Performance:**\n",
+            f"- Tool Calls: {tool_calls_json}\n",
+            f"- Tools Used: {', '.join(test_exec.actual_tools)}\n",
+            f"- Agent Response: {test_exec.agent_response}\n",
+            "\n"
+            "**Assertions (for reference):**\n",
+            assertions_block,
+            "\n"
+            "\n"
+            "**Rubric Criteria (score each 1-5):**\n",
+            rubric_text,
+            "\n"
+            "\n"
+            "**Task:** Score the agent's performance on EACH criterion above using the provided scale.\n"
+            "For each criterion, assign a score (1-5) and provide a one-sentence reasoning.\n"
+            "\n"
+            "Respond with ONLY a JSON object:\n"
+            "{\n"
+            "    \"scores\": [\n",
+            f"        {{\"criterion\": \"{example_criterion}\", \"score\": 4, \"reasoning\": \"One sentence explanation.\"}}",
+        ]
         if len(criteria_names) > 1:
-            user_prompt += f",\n        {{\"criterion\": \"{criteria_names[1]}\", \"score\": 3, \"reasoning\": \"One sentence explanation.\"}}"
-        user_prompt += (
-            f"\n    ]\n"
-            f"}}"
-        )
+            parts.append(f",\n        {{\"criterion\": \"{criteria_names[1]}\", \"score\": 3, \"reasoning\": \"One sentence explanation.\"}}")
+        parts.append("\n    ]\n}")
+        user_prompt = "".join(parts)
 
         async def _on_judge_retry(attempt: int, max_attempts: int, wait_time: float, error: str):
             await self._update_status_message(
@@ -1973,12 +3052,20 @@ class EvaluatorService:
             )
 
         async def _call_llm_judge():
-            response = await asyncio.to_thread(
-                self.openai_client.chat.completions.create,
-                model=config.LLM_MODEL,
-                messages=messages,
-            )
-            return response
+            # Streamed: rubric replies are long, so tokens are consumed as they
+            # arrive and a cancelled test closes the connection mid-generation
+            async with self._llm_semaphore:
+                stream = await self.openai_client.chat.completions.create(
+                    model=config.LLM_MODEL,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},  # keeps cost attribution
+                    # Structured output: the reply must match the rubric scores schema
+                    **({"response_format": _RUBRIC_RESPONSE_FORMAT} if config.LLM_JSON_MODE else {}),
+                    **_prompt_cache_kwargs("rubric", system_prompt),
+                )
+                async with stream:
+                    return await _collect_stream(stream)
 
         try:
             messages = [
@@ -1986,7 +3073,7 @@ class EvaluatorService:
                 {"role": "user", "content": user_prompt}
             ]
 
-            retry_result = await retry_with_backoff(_call_llm_judge, on_retry=_on_judge_retry)
+            retry_result = await self._judge_completion(eval_run, system_prompt, user_prompt, _call_llm_judge, _on_judge_retry)
             response = retry_result.result
 
             test_exec.retry_count += retry_result.retry_count
@@ -1995,19 +3082,7 @@ class EvaluatorService:
 
             # Token tracking
             try:
-                usage = getattr(response, 'usage', None)
-                if usage:
-                    _j_in = getattr(usage, 'prompt_tokens', 0) or 0
-                    _j_out = getattr(usage, 'completion_tokens', 0) or 0
-                    test_exec.judge_tokens_in += _j_in
-                    test_exec.judge_tokens_out += _j_out
-                    _j_cost = await self._record_cost(
-                        "judge_llm", config.LLM_MODEL, _j_in, _j_out,
-                        evaluation_id=test_exec.eval_run_id,
-                        test_case_id=test_exec.test_case_id,
-                        agent_id=test_exec.agent_id,
-                    )
-                    test_exec.judge_cost_usd += _j_cost
+                self._charge_judge_tokens(test_exec, *_usage_tokens(response))
             except Exception as _e:
                 logger.debug(f"Token capture (rubric) failed: {_e}")
 
@@ -2025,7 +3100,6 @@ class EvaluatorService:
                 logger.error(f"Rubric response missing 'scores' array")
                 return None
 
-            from .models import RubricScoreResult
             rubric_scores = []
             for s in scores_raw:
                 try:
@@ -2069,8 +3143,9 @@ class EvaluatorService:
         a structured JSON array with per-assertion results.
 
         Returns:
-            List[ArgumentAssertionResult] ready to use, or None if batching
-            failed and caller should fall back to single-assertion evaluation.
+            Tuple of (List[ArgumentAssertionResult], all_passed, passed_args)
+            ready to use, or None if batching failed and caller should fall
+            back to single-assertion evaluation.
         """
         # Build the assertion list for the prompt
         assertion_items = []
@@ -2103,21 +3178,27 @@ class EvaluatorService:
         if len(deterministic_results) == len(assertion_items):
             logger.info(f"All {len(assertion_items)} assertions for '{tool_exp.name}' resolved deterministically — skipping LLM")
             arg_results = []
+            all_passed = True
+            passed_args = 0
             result_idx = 0
             for arg_assertion in tool_exp.arguments:
                 assertions = []
+                arg_passed = True
                 for _ in arg_assertion.assertion:
                     r = deterministic_results[result_idx]
+                    if not r["passed"]:
+                        all_passed = arg_passed = False
                     assertions.append(AssertionResult(
                         passed=r["passed"],
                         llm_judge_output=r["reasoning"]
                     ))
                     result_idx += 1
+                passed_args += arg_passed
                 arg_results.append(ArgumentAssertionResult(
                     name_of_argument=arg_assertion.name,
                     assertions=assertions
                 ))
-            return arg_results
+            return arg_results, all_passed, passed_args
 
         logger.info(f"Batching {len(assertion_items)} assertions for tool '{tool_exp.name}' into single LLM call")
 
@@ -2128,12 +3209,12 @@ class EvaluatorService:
         )
 
         # Render prompt from judge config template
-        judge_cfg = getattr(eval_run, '_cached_judge_config', None) or _DEFAULT_JUDGE_CONFIG
+        judge_cfg = _resolve_judge_settings(eval_run)['config']
         ctx = _build_template_context(
             test_case, test_exec, tool_exp=tool_exp,
             assertions_block=assertions_block,
         )
-        batch_prompt = _render_template(judge_cfg['user_prompt_template_batched'], ctx)
+        batch_prompt = _render_judge_template(eval_run, 'user_prompt_template_batched', ctx)
         system_prompt = judge_cfg['system_prompt']
 
         async def _on_judge_retry(attempt: int, max_attempts: int, wait_time: float, error: str):
@@ -2147,48 +3228,49 @@ class EvaluatorService:
             )
 
         async def _call_llm_batch():
-            response = await asyncio.to_thread(
-                self.openai_client.chat.completions.create,
-                model=config.LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": batch_prompt}
-                ],
-            )
+            async with self._llm_semaphore:
+                response = await self.openai_client.chat.completions.create(
+                    model=config.LLM_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": batch_prompt}
+                    ],
+                    **_json_mode_kwargs(system_prompt, batch_prompt),
+                    **_prompt_cache_kwargs("judge", system_prompt),
+                )
             return response
 
         try:
-            retry_result = await retry_with_backoff(_call_llm_batch, on_retry=_on_judge_retry)
-            response = retry_result.result
+            # Try to share one LLM call with other tests first (Feature: judge-coalescing)
+            coalesced = None
+            # (cache-enabled runs skip coalescing so their responses can be cached)
+            if self._judge_coalescer is not None and not eval_run.judge_cache_enabled:
+                coalesced = await self._judge_coalescer.submit(system_prompt, batch_prompt, len(assertion_items))
+
+            if coalesced is not None:
+                results_list, _j_in, _j_out = coalesced
+            else:
+                retry_result = await self._judge_completion(eval_run, system_prompt, batch_prompt, _call_llm_batch, _on_judge_retry)
+                response = retry_result.result
 
-            test_exec.retry_count += retry_result.retry_count
-            if retry_result.had_rate_limit:
-                test_exec.had_rate_limit = True
+                test_exec.retry_count += retry_result.retry_count
+                if retry_result.had_rate_limit:
+                    test_exec.had_rate_limit = True
+
+                _j_in, _j_out = _usage_tokens(response)
+
+                content = response.choices[0].message.content.strip()
+                logger.debug(f"Batched LLM response: {content[:500]}...")
+
+                parsed = _extract_json(content)
+                results_list = parsed.get("results", [])
 
             # ==== TOKEN CAPTURE (Feature: cost-attribution) ====
             try:
-                usage = getattr(response, 'usage', None)
-                if usage:
-                    _j_in = getattr(usage, 'prompt_tokens', 0) or 0
-                    _j_out = getattr(usage, 'completion_tokens', 0) or 0
-                    test_exec.judge_tokens_in += _j_in
-                    test_exec.judge_tokens_out += _j_out
-                    _j_cost = await self._record_cost(
-                        "judge_llm", config.LLM_MODEL, _j_in, _j_out,
-                        evaluation_id=test_exec.eval_run_id,
-                        test_case_id=test_exec.test_case_id,
-                        agent_id=test_exec.agent_id,
-                    )
-                    test_exec.judge_cost_usd += _j_cost
+                self._charge_judge_tokens(test_exec, _j_in, _j_out)
             except Exception as _e:
                 logger.debug(f"Token capture (batch) failed: {_e}")
 
-            content = response.choices[0].message.content.strip()
-            logger.debug(f"Batched LLM response: {content[:500]}...")
-
-            parsed = _extract_json(content)
-            results_list = parsed.get("results", [])
-
             # Validate we got the right number of results
             if len(results_list) != len(assertion_items):
                 logger.warning(
@@ -2199,25 +3281,33 @@ class EvaluatorService:
 
             # Build ArgumentAssertionResult list from the batched response
             arg_results = []
+            passed_total = 0
+            passed_args = 0
             result_idx = 0
             for arg_assertion in tool_exp.arguments:
                 assertions = []
+                arg_passed = True
                 for _ in arg_assertion.assertion:
                     r = results_list[result_idx]
+                    passed = _to_bool(r.get("passed", False))
+                    if passed:
+                        passed_total += 1
+                    else:
+                        arg_passed = False
                     assertions.append(AssertionResult(
-                        passed=_to_bool(r.get("passed", False)),
+                        passed=passed,
                         llm_judge_output=r.get("reasoning", "No reasoning provided")
                     ))
                     result_idx += 1
+                passed_args += arg_passed
                 arg_results.append(ArgumentAssertionResult(
                     name_of_argument=arg_assertion.name,
                     assertions=assertions
                 ))
 
             logger.info(f"Batched evaluation for '{tool_exp.name}' complete: "
-                       f"{sum(1 for r in results_list if r.get('passed'))} passed, "
-                       f"{sum(1 for r in results_list if not r.get('passed'))} failed")
-            return arg_results
+                       f"{passed_total} passed, {len(results_list) - passed_total} failed")
+            return arg_results, passed_total == len(results_list), passed_args
 
         except json.JSONDecodeError as je:
             logger.warning(f"Failed to parse batched LLM response as JSON: {je}. Falling back to single evaluation.")
@@ -2226,6 +3316,101 @@ class EvaluatorService:
             logger.warning(f"Batched assertion evaluation failed: {e}. Falling back to single evaluation.")
             return None
 
+    async def _evaluate_behavior_and_quality_combined(self, eval_run: EvaluationRun, test_case, test_exec) -> Optional[tuple]:
+        """Judge all behavior assertions and the response quality assertion in one LLM call.
+
+        Feature: assertion-batching
+        Both kinds see the same trace (tool calls, agent output, expected
+        response), so they share one prompt with a numbered "results" array
+        instead of one round-trip per assertion. The prompt is rendered from
+        the run's user_prompt_template_combined judge template, or the
+        built-in one when the judge config has none.
+
+        Returns:
+            (behavior_results: List[dict], response_quality_result: dict) with
+            {"passed", "reasoning"} entries, or None if the combined call failed
+            and the caller should evaluate them separately.
+        """
+        behavior_assertions = test_case.behavior_assertions
+        quality_assertion = test_case.response_quality_expectation.assertion
+        n_behavior = len(behavior_assertions)
+
+        behavior_block = "\n".join(
+            f"  [{i}] {ba.assertion}" for i, ba in enumerate(behavior_assertions)
+        )
+        assertions_block = (
+            "### Behavior Assertions\n"
+            "Evaluate if the agent's overall behavior (tool calls AND response) satisfies each assertion.\n"
+            f"{behavior_block}\n"
+            "\n"
+            "### Response Quality\n"
+            "Evaluate if the agent's response satisfies this quality assertion.\n"
+            f"  [{n_behavior}] {quality_assertion}"
+        )
+        ctx = _build_template_context(test_case, test_exec, assertions_block=assertions_block)
+        ctx["agent_response"] = test_exec.agent_response or "No output"
+        user_prompt = _render_judge_template(eval_run, 'user_prompt_template_combined', ctx)
+        system_prompt = _resolve_judge_settings(eval_run)['config']['system_prompt']
+
+        async def _on_judge_retry(attempt: int, max_attempts: int, wait_time: float, error: str):
+            await self._update_status_message(
+                eval_run.id,
+                f"⚠️ LLM judge rate limit (attempt {attempt}/{max_attempts}). Waiting {wait_time:.1f}s...",
+                is_rate_limit=True,
+                retry_attempt=attempt,
+                max_attempts=max_attempts,
+                wait_seconds=wait_time
+            )
+
+        async def _call_llm_combined():
+            async with self._llm_semaphore:
+                response = await self.openai_client.chat.completions.create(
+                    model=config.LLM_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    **_json_mode_kwargs(system_prompt, user_prompt),
+                    **_prompt_cache_kwargs("judge", system_prompt),
+                )
+            return response
+
+        try:
+            retry_result = await self._judge_completion(eval_run, system_prompt, user_prompt, _call_llm_combined, _on_judge_retry)
+            response = retry_result.result
+
+            test_exec.retry_count += retry_result.retry_count
+            if retry_result.had_rate_limit:
+                test_exec.had_rate_limit = True
+
+            # ==== TOKEN CAPTURE (Feature: cost-attribution) ====
+            try:
+                self._charge_judge_tokens(test_exec, *_usage_tokens(response))
+            except Exception as _e:
+                logger.debug(f"Token capture (combined) failed: {_e}")
+
+            results_list = _extract_json(response.choices[0].message.content.strip()).get("results", [])
+            if len(results_list) != n_behavior + 1:
+                logger.warning(
+                    f"Combined response returned {len(results_list)} results, "
+                    f"expected {n_behavior + 1}. Falling back to separate evaluation."
+                )
+                return None
+
+            results = [
+                {
+                    "passed": _to_bool(r.get("passed", False)),
+                    "reasoning": r.get("reasoning", "No reasoning provided"),
+                }
+                for r in results_list
+            ]
+            logger.info(f"Combined evaluation for {test_case.id}: {n_behavior} behavior + 1 response quality assertion(s)")
+            return results[:n_behavior], results[n_behavior]
+
+        except Exception as e:
+            logger.warning(f"Combined behavior/quality evaluation failed: {e}. Falling back to separate evaluation.")
+            return None
+
     async def _evaluate_single_assertion(self, eval_run: EvaluationRun, assertion_text, tool_name, argument_name, test_case, test_exec, assertion_type):
         """Evaluate a single assertion and return pass/fail result.
 
@@ -2253,7 +3438,7 @@ class EvaluatorService:
                 f"**Argument:** {argument_name}\n"
                 f"**Assertion:** {assertion_text}\n"
                 f"\n"
-                f"**Agent's Tool Calls:** {json.dumps(test_exec.tool_calls, indent=2)}\n"
+                f"**Agent's Tool Calls:** {test_exec.tool_calls_json()}\n"
                 f"**Actual Tools Used:** {', '.join(test_exec.actual_tools)}\n"
                 f"\n"
                 f"Evaluate if the agent's tool usage satisfies this specific assertion."
@@ -2263,7 +3448,7 @@ class EvaluatorService:
             assertion_context = (
                 f"**Behavior Assertion:** {assertion_text}\n"
                 f"\n"
-                f"**Agent's Tool Calls:** {json.dumps(test_exec.tool_calls, indent=2)}\n"
+                f"**Agent's Tool Calls:** {test_exec.tool_calls_json()}\n"
                 f"**Agent Output:** {test_exec.agent_response if test_exec.agent_response else 'No output'}\n"
                 f"**Expected Response:** {test_case.expected_response}\n"
                 f"\n"
@@ -2280,7 +3465,7 @@ class EvaluatorService:
             )
 
         # Render from judge config template
-        judge_cfg = getattr(eval_run, '_cached_judge_config', None) or _DEFAULT_JUDGE_CONFIG
+        judge_cfg = _resolve_judge_settings(eval_run)['config']
         ctx = _build_template_context(
             test_case, test_exec,
             argument_name=argument_name,
@@ -2288,17 +3473,40 @@ class EvaluatorService:
         )
         # Add assertion_context as a special variable for the single template
         ctx["assertion_context"] = assertion_context
-        judge_prompt = _render_template(judge_cfg['user_prompt_template_single'], ctx)
+        judge_prompt = _render_judge_template(eval_run, 'user_prompt_template_single', ctx)
         system_prompt = judge_cfg['system_prompt']
 
         async def _call_llm_judge():
             """Inner function to call the LLM judge (for retry wrapper)."""
-            response = await asyncio.to_thread(
-                self.openai_client.chat.completions.create,
+            create_kwargs = dict(
                 model=config.LLM_MODEL,
                 messages=messages,
+                # Structured output: the reply must be a {passed, reasoning} verdict
+                **({"response_format": _VERDICT_RESPONSE_FORMAT} if config.LLM_JSON_MODE else {}),
+                **_prompt_cache_kwargs("judge", system_prompt),
             )
-            return response
+            async with self._llm_semaphore:
+                if self._stream_verdicts:
+                    # Streamed so the verdict is taken as soon as its JSON object
+                    # closes and the rest of the response is cancelled
+                    try:
+                        stream = await self.openai_client.chat.completions.create(
+                            **create_kwargs,
+                            stream=True,
+                            stream_options={"include_usage": True},  # keeps cost attribution
+                        )
+                    except Exception as e:
+                        if not _stream_rejected(e):
+                            raise
+                        logger.warning(f"Streamed judge call rejected ({e}) — retrying without streaming")
+                    else:
+                        async with stream:
+                            return await _collect_stream(stream, stop_after_json=True, prompt_text=system_prompt + judge_prompt)
+                    response = await self.openai_client.chat.completions.create(**create_kwargs)
+                    # The plain call worked, so it was streaming the endpoint refused
+                    self._stream_verdicts = False
+                    return response
+                return await self.openai_client.chat.completions.create(**create_kwargs)
 
         try:
             messages = [
@@ -2307,7 +3515,7 @@ class EvaluatorService:
             ]
 
             # Use retry wrapper for the LLM call with status updates
-            retry_result = await retry_with_backoff(_call_llm_judge, on_retry=_on_judge_retry)
+            retry_result = await self._judge_completion(eval_run, system_prompt, judge_prompt, _call_llm_judge, _on_judge_retry)
             response = retry_result.result
 
             # Track retries for visibility
@@ -2317,19 +3525,7 @@ class EvaluatorService:
 
             # ==== TOKEN CAPTURE (Feature: cost-attribution) ====
             try:
-                usage = getattr(response, 'usage', None)
-                if usage:
-                    _j_in = getattr(usage, 'prompt_tokens', 0) or 0
-                    _j_out = getattr(usage, 'completion_tokens', 0) or 0
-                    test_exec.judge_tokens_in += _j_in
-                    test_exec.judge_tokens_out += _j_out
-                    _j_cost = await self._record_cost(
-                        "judge_llm", config.LLM_MODEL, _j_in, _j_out,
-                        evaluation_id=test_exec.eval_run_id,
-                        test_case_id=test_exec.test_case_id,
-                        agent_id=test_exec.agent_id,
-                    )
-                    test_exec.judge_cost_usd += _j_cost
+                self._charge_judge_tokens(test_exec, *_usage_tokens(response))
             except Exception as _e:
                 logger.debug(f"Token capture (single) failed: {_e}")
 
@@ -2380,51 +3576,26 @@ class EvaluatorService:
         """
         self.OpenAIClientInitialization()
 
-        trace_context = json.dumps({
+        trace_context = orjson.dumps({
             "input": test_case.input,
             "expected_response": test_case.expected_response,
             "actual_response": test_case_result.response_from_agent,
             "tool_calls": test_case_result.actual_tool_calls,
-        }, indent=2)
-
-        generation_prompt = (
-            "You are an expert at writing test assertions for AI agent evaluations.\n"
-            "Analyse this test case execution trace and propose assertions.\n\n"
-            f"TRACE:\n{trace_context}\n\n"
-            "Generate assertions for THREE evaluation modes.\n\n"
-            "1. TOOL-LEVEL: ToolExpectation entries checking which tools should be "
-            "called and what argument values are expected.\n"
-            "2. HYBRID (behavior): Natural-language BehaviorAssertion entries that "
-            "describe expected agent behaviour including tool usage and response "
-            "characteristics in a single sentence each.\n"
-            "3. RESPONSE QUALITY: One ResponseQualityAssertion checking overall "
-            "response appropriateness.\n\n"
-            "Return ONLY a JSON object with this exact schema:\n"
-            "{\n"
-            '  "tool_expectations": [\n'
-            '    {"name": "tool_name", "arguments": [\n'
-            '      {"name": "arg_name", "assertion": ["assertion 1", "assertion 2"]}\n'
-            "    ]}\n"
-            "  ],\n"
-            '  "behavior_assertions": [\n'
-            '    {"assertion": "natural language description"}\n'
-            "  ],\n"
-            '  "response_quality_expectation": {\n'
-            '    "assertion": "quality expectation"\n'
-            "  }\n"
-            "}"
-        )
+        }, default=str).decode()  # compact, non-ASCII kept — indentation only costs tokens
+
+        generation_prompt = f"TRACE:\n{trace_context}"
 
         try:
-            response = await asyncio.to_thread(
-                self.openai_client.chat.completions.create,
-                model=config.LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": "You write concise, testable assertions for AI agent evaluation."},
-                    {"role": "user", "content": generation_prompt},
-                ],
-                temperature=0.3,
-            )
+            async with self._llm_semaphore:
+                response = await self.openai_client.chat.completions.create(
+                    model=config.LLM_MODEL,
+                    messages=[
+                        {"role": "system", "content": _ASSERTION_GENERATION_INSTRUCTIONS},
+                        {"role": "user", "content": generation_prompt},
+                    ],
+                    temperature=0.3,
+                    **_prompt_cache_kwargs("assertion-gen", _ASSERTION_GENERATION_INSTRUCTIONS),
+                )
 
             content = response.choices[0].message.content.strip()
             parsed = _extract_json(content)
@@ -2486,6 +3657,7 @@ class EvaluatorService:
         behavior_assertions: list,
         test_case,
         test_exec,
+        judged: Optional[List[dict]] = None,
     ) -> tuple:
         """Evaluate all behavior assertions using the LLM judge.
 
@@ -2493,6 +3665,9 @@ class EvaluatorService:
         agent response + expected response) so the judge can reason about both
         tool usage and output quality in a single natural-language assertion.
 
+        If ``judged`` is given (verdicts from a combined call, in order), no
+        further LLM calls are made.
+
         Returns:
             (results: List[BehaviorAssertionResult], all_passed: bool)
         """
@@ -2508,16 +3683,27 @@ class EvaluatorService:
                 f"  📋 Evaluating {len(behavior_assertions)} behavior assertion(s)"
             )
 
-        for ba in behavior_assertions:
-            result = await self._evaluate_single_assertion(
-                eval_run=eval_run,
-                assertion_text=ba.assertion,
-                tool_name=None,
-                argument_name=None,
-                test_case=test_case,
-                test_exec=test_exec,
-                assertion_type="behavior",
-            )
+        # Independent judge calls — run them concurrently (each one takes
+        # _llm_semaphore, which bounds in-flight judge requests process-wide).
+        # One assertion failing must not discard its siblings' verdicts.
+        if judged is None:
+            judged = await asyncio.gather(*(
+                self._evaluate_single_assertion(
+                    eval_run=eval_run,
+                    assertion_text=ba.assertion,
+                    tool_name=None,
+                    argument_name=None,
+                    test_case=test_case,
+                    test_exec=test_exec,
+                    assertion_type="behavior",
+                )
+                for ba in behavior_assertions
+            ), return_exceptions=True)
+
+        for ba, result in zip(behavior_assertions, judged):
+            if isinstance(result, BaseException):
+                logger.error(f"Error evaluating behavior assertion '{ba.assertion}': {result}")
+                result = {"passed": False, "reasoning": f"Evaluation failed: {result}"}
 
             behavior_result = BehaviorAssertionResult(
                 assertion=ba.assertion,
@@ -2557,75 +3743,84 @@ class EvaluatorService:
         eval_run.status = EvaluationRunStatus.completed
         eval_run.completed_at = datetime.now(timezone.utc)
 
-        # ==== COST AGGREGATION (Feature: cost-attribution) ====
-        total_cost = 0.0
-        total_in = 0
-        total_out = 0
-        for tc in eval_run.test_cases:
-            total_cost += tc.agent_cost_usd + tc.judge_cost_usd
-            total_in += tc.agent_tokens_in + tc.judge_tokens_in
-            total_out += tc.agent_tokens_out + tc.judge_tokens_out
-        eval_run.total_cost_usd = round(total_cost, 6)
-        eval_run.total_tokens_in = total_in
-        eval_run.total_tokens_out = total_out
-
-        # ==== FAILURE MODE CLASSIFICATION (Feature: hitl-intelligence) ====
-        for tc in eval_run.test_cases:
-            if tc.failure_mode is None and not tc.passed:
-                tc.failure_mode = self._classify_failure_mode(tc)
-
         # ==== REGRESSION DETECTION (Feature: regression-detection) ====
+        # Most recent COMPLETED evaluation for same agent/dataset (exclude current)
+        previous = None
         try:
-            # Get recent evaluations for same agent (limit=10)
-            recent_evals = await self.db.list_evaluation_runs(agent_id=eval_run.agent_id, limit=10)
-
-            # Find most recent COMPLETED evaluation for same dataset (exclude current)
-            previous_eval = None
-            for e in recent_evals:
-                if (e.id != eval_run.id and
-                    e.dataset_id == eval_run.dataset_id and
-                    e.status == EvaluationRunStatus.completed):
-                    previous_eval = e
-                    break
-
-            # If found, compare per-test-case results
-            if previous_eval:
-                # Build result maps: testcase_id -> passed (bool)
-                current_results = {tc.testcase_id: tc.passed for tc in eval_run.test_cases}
-                previous_results = {tc.testcase_id: tc.passed for tc in previous_eval.test_cases}
-
-                # Find regressions: tests that were passed in previous but failed now
-                regressions = []
-                for testcase_id, passed_in_previous in previous_results.items():
-                    passed_in_current = current_results.get(testcase_id)
-
-                    # Regression: was passed before, failed now
-                    if passed_in_previous and not passed_in_current:
-                        regressions.append({
-                            "testcase_id": testcase_id,
-                            "previous_result": "passed",
-                            "current_result": "failed",
-                            "previous_eval_id": previous_eval.id
-                        })
-
-                # Store regressions in eval_run
-                eval_run.regressions = regressions
-
-                # Log regression info (shown via dedicated regressions banner, not warnings)
-                if regressions:
-                    logger.warning(f"Evaluation {eval_run.id}: {len(regressions)} regression(s) detected")
+            previous = await self.db.get_previous_completed_results(
+                eval_run.agent_id, eval_run.dataset_id, eval_run.id
+            )
         except Exception as e:
             logger.warning(f"Regression detection failed for evaluation {eval_run.id}: {str(e)}")
 
+        # ==== COST AGGREGATION (Feature: cost-attribution) ====
+        # One pass off the event loop: totals plus the regression diff.
+        # Failure modes are classified as each result is recorded
+        # (see _update_eval_run_with_test_result)
+        (
+            eval_run.total_cost_usd,
+            eval_run.total_tokens_in,
+            eval_run.total_tokens_out,
+            regressions,
+        ) = await asyncio.to_thread(_aggregate_run_results, eval_run.test_cases, previous)
+
+        if regressions is not None:
+            eval_run.regressions = regressions
+            # Log regression info (shown via dedicated regressions banner, not warnings)
+            if regressions:
+                logger.warning(f"Evaluation {eval_run.id}: {len(regressions)} regression(s) detected")
+
+        # The run's cost records are readable by the time it reports completed
+        await self._drain_costs()
+
         await self.db.update_evaluation_run(eval_run)
 
         pass_percentage = (eval_run.passed_count / eval_run.total_tests * 100) if eval_run.total_tests > 0 else 0
         logger.info(f"Evaluation {eval_run.id} completed: {eval_run.passed_count}/{eval_run.total_tests} passed ({pass_percentage:.1f}%)")
 
-        # Clean up the lock and cancel flag for this evaluation run
+        # Clean up the cancel flag for this evaluation run
         self._cancelled_evals.discard(eval_run.id)
-        async with self._locks_lock:
-            self._eval_run_locks.pop(eval_run.id, None)
+
+    async def _fetch_annotation_inputs(self, evals_to_analyze: list) -> list:
+        """Load every eval's holdout test case ids and annotations concurrently.
+
+        Datasets shared by several evals are fetched, and their holdout sets
+        built, once. A dataset that fails to load yields an empty set
+        (holdout filtering is then skipped for that eval, as before).
+
+        Returns:
+            [(eval_run, holdout_testcase_ids, run_annotations, action_annotations)] in input order
+        """
+        dataset_ids = list(dict.fromkeys(e.dataset_id for e in evals_to_analyze))
+        dataset_results, run_anns, action_anns = await asyncio.gather(
+            asyncio.gather(*(self.db.list_testcases_by_dataset(d) for d in dataset_ids), return_exceptions=True),
+            asyncio.gather(*(self.db.list_run_annotations(e.id) for e in evals_to_analyze)),
+            asyncio.gather(*(self.db.list_action_annotations(e.id) for e in evals_to_analyze)),
+        )
+        holdout_by_dataset = {
+            dataset_id: (
+                test_cases if isinstance(test_cases, Exception)
+                else {tc.id for tc in test_cases if getattr(tc, 'is_holdout', False)}
+            )
+            for dataset_id, test_cases in zip(dataset_ids, dataset_results)
+        }
+
+        inputs = []
+        for eval_run, r_anns, a_anns in zip(evals_to_analyze, run_anns, action_anns):
+            holdout_testcase_ids = holdout_by_dataset[eval_run.dataset_id]
+            if isinstance(holdout_testcase_ids, Exception):
+                logger.warning(f"Failed to load test cases for holdout filtering in eval {eval_run.id}: {holdout_testcase_ids}")
+                holdout_testcase_ids = set()
+            inputs.append((eval_run, holdout_testcase_ids, r_anns, a_anns))
+        return inputs
+
+    async def _load_evals_for_proposals(self, agent_id: str, evaluation_ids: Optional[List[str]]) -> list:
+        """Evaluations feeding proposal generation: the given ones (if owned by the agent) or recent completed runs."""
+        if evaluation_ids:
+            fetched = await asyncio.gather(*(self.db.get_evaluation_run(eid) for eid in evaluation_ids))
+            return [e for e in fetched if e and e.agent_id == agent_id]
+        all_evals = await self.db.list_evaluation_runs(agent_id=agent_id, limit=20)
+        return [e for e in all_evals if e.status.value == "completed"]
 
     async def generate_prompt_proposals(self, agent_id: str, evaluation_ids: Optional[List[str]] = None) -> list:
         """Generate AI-powered prompt improvement proposals from annotation patterns.
@@ -2654,22 +3849,13 @@ class EvaluatorService:
         current_version = active_prompt.get("version", 0) if active_prompt else 0
 
         # Get evaluations to analyze
-        if evaluation_ids:
-            evals_to_analyze = []
-            for eid in evaluation_ids:
-                e = await self.db.get_evaluation_run(eid)
-                if e and e.agent_id == agent_id:
-                    evals_to_analyze.append(e)
-        else:
-            all_evals = await self.db.list_evaluation_runs(agent_id=agent_id, limit=20)
-            evals_to_analyze = [e for e in all_evals if e.status.value == "completed"]
+        evals_to_analyze = await self._load_evals_for_proposals(agent_id, evaluation_ids)
 
         if not evals_to_analyze:
             logger.info(f"No completed evaluations found for agent {agent_id}")
             return []
 
         # Collect annotation data with enhanced tool-level grouping
-        from collections import Counter
         issue_counter = Counter()
         issue_samples = {}
         action_issues = []
@@ -2677,36 +3863,28 @@ class EvaluatorService:
 
         # Tool-level failure grouping
         tool_failure_counts = Counter()  # tool_name -> count of failures
-        tool_failure_examples = {}  # tool_name -> list of failure examples
+        tool_failure_examples = defaultdict(list)  # tool_name -> list of failure examples
         correction_with_context = []  # (testcase_id, tool_name, agent_response, correction)
 
-        for eval_run in evals_to_analyze:
-            # Build set of holdout test case IDs for this evaluation
-            holdout_testcase_ids = set()
-            test_cases_by_id = {}
-            try:
-                test_cases = await self.db.list_testcases_by_dataset(eval_run.dataset_id)
-                for tc in test_cases:
-                    test_cases_by_id[tc.id] = tc
-                    if getattr(tc, 'is_holdout', False):
-                        holdout_testcase_ids.add(tc.id)
-            except Exception as e:
-                logger.warning(f"Failed to load test cases for holdout filtering in eval {eval_run.id}: {e}")
+        # All DB reads up front and concurrently; aggregation below is pure Python
+        annotation_inputs = await self._fetch_annotation_inputs(evals_to_analyze)
 
+        for eval_run, holdout_testcase_ids, run_anns, action_anns in annotation_inputs:
             # Process run-level annotations, skipping holdout test cases
-            run_anns = await self.db.list_run_annotations(eval_run.id)
             for ann in run_anns:
-                run_id = ann.get("run_id", "") if isinstance(ann, dict) else getattr(ann, 'run_id', "")
+                # One dict-vs-model check per annotation
+                ann_get = ann.get if isinstance(ann, dict) else (lambda name, default=None: getattr(ann, name, default))
+                run_id = ann_get("run_id", "")
                 if run_id in holdout_testcase_ids:
                     continue
 
-                issues = ann.get("issues", []) if isinstance(ann, dict) else getattr(ann, 'issues', [])
-                notes = ann.get("notes", "") if isinstance(ann, dict) else getattr(ann, 'notes', "")
-                outcome = ann.get("outcome") if isinstance(ann, dict) else getattr(ann, 'outcome', None)
-                efficiency = ann.get("efficiency") if isinstance(ann, dict) else getattr(ann, 'efficiency', None)
+                issues = ann_get("issues", [])
+                notes = ann_get("notes", "")
+                outcome = ann_get("outcome")
+                efficiency = ann_get("efficiency")
 
+                issue_counter.update(issues)
                 for issue in issues:
-                    issue_counter[issue] += 1
                     if issue not in issue_samples:
                         issue_samples[issue] = {"notes": notes or "", "run_id": run_id}
 
@@ -2722,40 +3900,48 @@ class EvaluatorService:
                         issue_samples["Wasteful execution"] = {"notes": notes or "Marked as wasteful", "run_id": run_id}
 
             # Process action-level annotations with enhanced data collection
-            action_anns = await self.db.list_action_annotations(eval_run.id)
+            # Annotation run_id → this eval's result, built once (first result wins)
+            results_by_testcase = {tc.testcase_id: tc for tc in reversed(eval_run.test_cases)}
+            # 300-char response previews, sliced once per test case on first use;
+            # the 200-char correction context is cut from the cached preview
+            response_previews = {}
+
+            def _preview(tc_result):
+                preview = response_previews.get(tc_result.testcase_id)
+                if preview is None:
+                    preview = response_previews[tc_result.testcase_id] = (tc_result.response_from_agent or "")[:300]
+                return preview
+
             for ann in action_anns:
-                run_id = ann.get("run_id") if isinstance(ann, dict) else getattr(ann, 'run_id', None)
+                # One dict-vs-model check per annotation
+                ann_get = ann.get if isinstance(ann, dict) else (lambda name, default=None: getattr(ann, name, default))
+                run_id = ann_get("run_id")
                 if run_id in holdout_testcase_ids:
                     continue
 
-                correctness = ann.get("correctness") if isinstance(ann, dict) else getattr(ann, 'correctness', None)
-                parameter_quality = ann.get("parameter_quality") if isinstance(ann, dict) else getattr(ann, 'parameter_quality', None)
-                correction = ann.get("correction") if isinstance(ann, dict) else getattr(ann, 'correction', None)
-                action_index = ann.get("action_index") if isinstance(ann, dict) else getattr(ann, 'action_index', None)
+                correctness = ann_get("correctness")
+                parameter_quality = ann_get("parameter_quality")
+                correction = ann_get("correction")
+                action_index = ann_get("action_index")
 
                 # Include suboptimal actions too (not just incorrect/wrong)
                 if correctness in ("incorrect", "acceptable") or parameter_quality in ("wrong", "suboptimal"):
                     action_issues.append(ann)
 
                     if action_index is not None and run_id:
-                        test_case_result = None
-                        for tc_result in eval_run.test_cases:
-                            if tc_result.testcase_id == run_id:
-                                test_case_result = tc_result
-                                break
+                        test_case_result = results_by_testcase.get(run_id)
 
                         if test_case_result and action_index < len(test_case_result.actual_tool_calls):
                             tool_call = test_case_result.actual_tool_calls[action_index]
                             tool_name = tool_call.get("name", "unknown")
                             tool_failure_counts[tool_name] += 1
 
-                            if tool_name not in tool_failure_examples:
-                                tool_failure_examples[tool_name] = []
-                            if len(tool_failure_examples[tool_name]) < 3:
-                                tool_failure_examples[tool_name].append({
+                            examples = tool_failure_examples[tool_name]
+                            if len(examples) < 3:
+                                examples.append({
                                     "testcase_id": run_id,
                                     "tool_call": tool_call,
-                                    "agent_response": test_case_result.response_from_agent[:300] if test_case_result.response_from_agent else "",
+                                    "agent_response": _preview(test_case_result),
                                     "correction": correction or "N/A"
                                 })
 
@@ -2763,17 +3949,15 @@ class EvaluatorService:
                 if correction:
                     correction_samples.append(correction)
                     if action_index is not None and run_id:
-                        for tc_result in eval_run.test_cases:
-                            if tc_result.testcase_id == run_id:
-                                if action_index < len(tc_result.actual_tool_calls):
-                                    tool_name = tc_result.actual_tool_calls[action_index].get("name", "unknown")
-                                    correction_with_context.append({
-                                        "testcase_id": run_id,
-                                        "tool_name": tool_name,
-                                        "agent_response": tc_result.response_from_agent[:200] if tc_result.response_from_agent else "",
-                                        "correction": correction
-                                    })
-                                break
+                        tc_result = results_by_testcase.get(run_id)
+                        if tc_result and action_index < len(tc_result.actual_tool_calls):
+                            tool_name = tc_result.actual_tool_calls[action_index].get("name", "unknown")
+                            correction_with_context.append({
+                                "testcase_id": run_id,
+                                "tool_name": tool_name,
+                                "agent_response": _preview(tc_result)[:200],
+                                "correction": correction
+                            })
 
         # Also consider failed test cases even without annotations
         if not issue_counter and not action_issues:
@@ -2804,8 +3988,8 @@ class EvaluatorService:
             judge_rubric=None,
             include_reasoning=False
         ):
-            # Skip error reports from failed LLM calls
-            if isinstance(proposal, dict) and proposal.get("_error"):
+            # Skip error reports from failed LLM calls and skipped-pattern notices
+            if isinstance(proposal, dict) and (proposal.get("_error") or proposal.get("_status")):
                 continue
             proposals.append(proposal)
 
@@ -2830,6 +4014,8 @@ class EvaluatorService:
         """Async generator that yields each proposal as it's generated by the LLM.
 
         This powers both the batch endpoint (collect all) and the SSE streaming endpoint.
+        Failed patterns are reported as {"_error": True, ...} dicts and patterns
+        skipped for unchanged evidence as {"_status": True, ...} dicts.
         """
         significant_patterns = [(tag, count) for tag, count in issue_counter.most_common(5) if count >= 1]
         total_runs = sum(e.total_tests for e in evals_to_analyze)
@@ -2839,57 +4025,55 @@ class EvaluatorService:
         # Track previously generated proposal titles for deduplication
         generated_titles: List[str] = []
 
-        for tag, count in significant_patterns:
-            logger.info(f"Processing pattern '{tag}' (count={count})...")
-            sample = issue_samples.get(tag, {})
-
-            # Build tool failure summary
-            tool_failure_summary = ""
-            if tool_failure_counts:
-                tool_lines = []
-                for tool_name, failure_count in tool_failure_counts.most_common(3):
-                    tool_lines.append(f"  - Tool '{tool_name}': {failure_count} failures")
-                if tool_lines:
-                    tool_failure_summary = "PER-TOOL FAILURE PATTERNS:\n" + "\n".join(tool_lines)
-
-            # Build correction examples with context
-            correction_examples_text = ""
-            if correction_with_context:
-                example_lines = ["SPECIFIC CORRECTION EXAMPLES:"]
-                for i, ctx in enumerate(correction_with_context[:3], 1):
-                    example_lines.append(f"\nExample {i} (Tool: {ctx['tool_name']}, Test: {ctx['testcase_id']}):")
-                    example_lines.append(f"  Agent response: {ctx['agent_response']}")
-                    example_lines.append(f"  Correction: {ctx['correction']}")
-                correction_examples_text = "\n".join(example_lines)
-
-            # Build concrete test case examples from tool failure examples
-            concrete_examples_text = ""
-            if tool_failure_examples:
-                example_lines = ["CONCRETE FAILED TEST CASES:"]
-                example_count = 0
-                for tool_name, examples in tool_failure_examples.items():
-                    for example in examples:
-                        if example_count >= 3:
-                            break
-                        example_lines.append(f"\nTest: {example['testcase_id']} | Tool: {tool_name}")
-                        example_lines.append(f"  Agent response: {example['agent_response']}")
-                        example_lines.append(f"  Annotation: {example['correction']}")
-                        example_count += 1
+        # Pattern-independent prompt sections — built once, shared by every pattern
+
+        # Build tool failure summary
+        tool_failure_summary = ""
+        if tool_failure_counts:
+            tool_lines = []
+            for tool_name, failure_count in tool_failure_counts.most_common(3):
+                tool_lines.append(f"  - Tool '{tool_name}': {failure_count} failures")
+            if tool_lines:
+                tool_failure_summary = "PER-TOOL FAILURE PATTERNS:\n" + "\n".join(tool_lines)
+
+        # Build correction examples with context
+        correction_examples_text = ""
+        if correction_with_context:
+            example_lines = ["SPECIFIC CORRECTION EXAMPLES:"]
+            for i, ctx in enumerate(correction_with_context[:3], 1):
+                example_lines.append(f"\nExample {i} (Tool: {ctx['tool_name']}, Test: {ctx['testcase_id']}):")
+                example_lines.append(f"  Agent response: {ctx['agent_response']}")
+                example_lines.append(f"  Correction: {ctx['correction']}")
+            correction_examples_text = "\n".join(example_lines)
+
+        # Build concrete test case examples from tool failure examples
+        concrete_examples_text = ""
+        if tool_failure_examples:
+            example_lines = ["CONCRETE FAILED TEST CASES:"]
+            example_count = 0
+            for tool_name, examples in tool_failure_examples.items():
+                for example in examples:
                     if example_count >= 3:
                         break
-                concrete_examples_text = "\n".join(example_lines)
+                    example_lines.append(f"\nTest: {example['testcase_id']} | Tool: {tool_name}")
+                    example_lines.append(f"  Agent response: {example['agent_response']}")
+                    example_lines.append(f"  Annotation: {example['correction']}")
+                    example_count += 1
+                if example_count >= 3:
+                    break
+            concrete_examples_text = "\n".join(example_lines)
 
-            rubric_section = ""
-            if judge_rubric:
-                rubric_section = f"""
+        rubric_section = ""
+        if judge_rubric:
+            rubric_section = f"""
 JUDGE RUBRIC / EVALUATION CRITERIA:
 {judge_rubric}
 
 Use the above rubric criteria to guide your analysis and proposal. Focus on changes that would improve performance against these criteria.
 """
 
-            # Build JSON response schema based on include_reasoning flag
-            json_fields = """{{
+        # Build JSON response schema based on include_reasoning flag
+        json_fields = """{{
   "title": "short descriptive title (under 60 chars)",
   "category": "which aspect this improves (e.g., Tool Selection, Error Handling, Data Validation)",
   "confidence": <number between 0.0 and 1.0 — calibrate based on evidence strength: 0.3-0.5 for speculative changes with weak evidence, 0.5-0.7 for probable improvements with moderate evidence, 0.7-0.9 for high-confidence changes with strong evidence, 0.9+ only for near-certain fixes>,
@@ -2899,16 +4083,44 @@ Use the above rubric criteria to guide your analysis and proposal. Focus on chan
   "lines_to_remove": ["exact line(s) from current prompt to replace, or empty if adding new"],
   "lines_to_add": ["replacement/new line(s) with improvements"]"""
 
-            if include_reasoning:
-                json_fields += """,
+        if include_reasoning:
+            json_fields += """,
   "detailed_reasoning": "Step-by-step analysis of the pattern, root cause, and why the proposed change should work (only if reasoning requested)\""""
 
-            json_fields += "\n}}"
+        json_fields += "\n}}"
+
+        # Build evidence from action annotations
+        evidence = []
+        for ctx in correction_with_context[:5]:  # Include up to 5 pieces of evidence
+            evidence.append({
+                "testcase_id": ctx["testcase_id"],
+                "tool_name": ctx["tool_name"],
+                "correction": ctx["correction"]
+            })
 
-            # Build deduplication context from previously generated proposals
-            dedup_section = ""
-            if generated_titles:
-                dedup_section = f"""
+        proposal_system_prompt = await self._get_system_prompt("proposal_generation_system", "You are a precise prompt engineering expert. Return ONLY valid JSON with no additional text.")
+        # The response schema is the same for every pattern — carry it in the
+        # system message so it is part of the cached prefix (keeping /no_think last)
+        proposal_system_prompt = (
+            proposal_system_prompt.removesuffix(" /no_think")
+            + f"\n\nRespond as JSON with these exact fields:\n{json_fields} /no_think"
+        )
+        proposal_user_template = await self._get_proposal_user_template()
+
+        # Patterns are proposed concurrently; a pattern that starts after others
+        # finished still sees their titles in its dedup section
+        proposal_slots = asyncio.Semaphore(_PROPOSAL_CONCURRENCY)
+
+        async def _propose(tag: str, count: int) -> tuple:
+            """Ask the LLM for one pattern's proposal. Returns (tag, count, result or None, error or None)."""
+            async with proposal_slots:
+                logger.info(f"Processing pattern '{tag}' (count={count})...")
+                sample = issue_samples.get(tag, {})
+
+                # Build deduplication context from previously generated proposals
+                dedup_section = ""
+                if generated_titles:
+                    dedup_section = f"""
 IMPORTANT — AVOID DUPLICATION:
 The following proposals have ALREADY been generated in this session. Do NOT propose something that overlaps with or is essentially the same as any of these:
 {chr(10).join(f'  - "{t}"' for t in generated_titles)}
@@ -2918,140 +4130,190 @@ If the failure pattern you are analyzing points to the same root cause as an exi
 2. Return {{"skip": true}} to indicate this pattern is already covered.
 """
 
-            llm_prompt = f"""You are a prompt engineering expert. Analyze this agent failure pattern and suggest ONE specific system prompt improvement.
-
-CURRENT SYSTEM PROMPT:
-{current_prompt_text}
-
-FAILURE PATTERN FROM HUMAN ANNOTATIONS:
-- Issue "{tag}" occurred {count} times across {total_runs} test runs
-- Sample annotator notes: {sample.get('notes', 'N/A')}
-- Number of incorrect action annotations: {len(action_issues)}
-
-{tool_failure_summary if tool_failure_summary else ""}
-
-- Sample corrections suggested: {'; '.join(correction_samples[:3]) if correction_samples else 'N/A'}
-
-{correction_examples_text if correction_examples_text else ""}
+                try:
+                    prompt_vars = {
+                        "current_prompt": current_prompt_text,
+                        "tag": tag,
+                        "count": str(count),
+                        "total_runs": str(total_runs),
+                        "sample_notes": sample.get('notes', 'N/A'),
+                        "action_issues_count": str(len(action_issues)),
+                        "tool_failure_summary": tool_failure_summary or "",
+                        "correction_samples": '; '.join(correction_samples[:3]) if correction_samples else 'N/A',
+                        "correction_examples": correction_examples_text or "",
+                        "concrete_examples": concrete_examples_text or "",
+                        "dedup_section": dedup_section,
+                        "rubric_section": rubric_section,
+                        "json_fields": _PROPOSAL_FIELDS_POINTER,
+                    }
+                    user_prompt = _render_compiled(proposal_user_template, prompt_vars)
+
+                    # Input budget: drop the bulkiest optional evidence first, and
+                    # skip the call entirely if the prompt is still too large
+                    budget = config.PROPOSAL_MAX_INPUT_TOKENS
+                    if budget and _estimate_tokens(proposal_system_prompt) + _estimate_tokens(user_prompt) > budget:
+                        for section in ("concrete_examples", "correction_examples"):
+                            if not prompt_vars[section]:
+                                continue
+                            prompt_vars[section] = ""
+                            user_prompt = _render_compiled(proposal_user_template, prompt_vars)
+                            logger.info(f"Proposal prompt for '{tag}' over budget — dropped {section}")
+                            if _estimate_tokens(proposal_system_prompt) + _estimate_tokens(user_prompt) <= budget:
+                                break
+                        else:
+                            estimate = _estimate_tokens(proposal_system_prompt) + _estimate_tokens(user_prompt)
+                            if estimate > budget:
+                                logger.warning(f"Proposal prompt for '{tag}' is ~{estimate} tokens, over PROPOSAL_MAX_INPUT_TOKENS={budget} — skipping")
+                                return tag, count, None, f"Prompt too large (~{estimate} tokens, budget {budget})"
+
+                    logger.info(f"Calling LLM ({config.LLM_MODEL}) for pattern '{tag}'...")
+                    # Streamed: the reply is consumed as it is generated and a
+                    # cancelled stream closes the connection mid-generation
+                    async with self._llm_semaphore:
+                        stream = await self.openai_client.chat.completions.create(
+                            model=config.LLM_MODEL,
+                            messages=[
+                                {"role": "system", "content": proposal_system_prompt},
+                                {"role": "user", "content": user_prompt}
+                            ],
+                            stream=True,
+                            stream_options={"include_usage": True},  # keeps cost attribution
+                            **_json_mode_kwargs(proposal_system_prompt, user_prompt),
+                            **_prompt_cache_kwargs("proposal", proposal_system_prompt),
+                        )
+                        async with stream:
+                            response = await _collect_stream(stream)
 
-{concrete_examples_text if concrete_examples_text else ""}
-{dedup_section}
-Based on these specific failures and tool-level patterns, provide a targeted improvement that addresses the root cause.
-{rubric_section}
-Respond as JSON with these exact fields:
-{json_fields}"""
+                    # ==== TOKEN CAPTURE (Feature: cost-attribution) ====
+                    try:
+                        usage = getattr(response, 'usage', None)
+                        if usage:
+                            _p_in = getattr(usage, 'prompt_tokens', 0) or 0
+                            _p_out = getattr(usage, 'completion_tokens', 0) or 0
+                            self._record_cost(
+                                "prompt_proposal", config.LLM_MODEL, _p_in, _p_out,
+                                agent_id=agent_id,
+                            )
+                    except Exception as _e:
+                        logger.debug(f"Token capture (proposal) failed: {_e}")
+
+                    raw_content = response.choices[0].message.content or ""
+                    # Qwen3 models may put response in 'thinking' field instead
+                    if not raw_content.strip():
+                        thinking = getattr(response.choices[0].message, 'thinking', None)
+                        if thinking:
+                            logger.warning(f"Proposal LLM returned empty content but has thinking field — using thinking content")
+                            raw_content = thinking
+                    content = raw_content.strip()
+                    if not content:
+                        logger.error(f"Proposal LLM returned completely empty content for pattern '{tag}'")
+                        return tag, count, None, "LLM returned empty content"
+                    logger.debug(f"Proposal LLM raw output for '{tag}': {content[:200]}...")
+                    return tag, count, _extract_json(content), None
 
-            try:
-                logger.info(f"Calling LLM ({config.LLM_MODEL}) for pattern '{tag}'...")
-                response = await asyncio.to_thread(
-                    self.openai_client.chat.completions.create,
-                    model=config.LLM_MODEL,
-                    messages=[
-                        {"role": "system", "content": await self._get_system_prompt("proposal_generation_system", "You are a precise prompt engineering expert. Return ONLY valid JSON with no additional text.")},
-                        {"role": "user", "content": await self._render_proposal_prompt(
-                            variables={
-                                "current_prompt": current_prompt_text,
-                                "tag": tag,
-                                "count": str(count),
-                                "total_runs": str(total_runs),
-                                "sample_notes": sample.get('notes', 'N/A'),
-                                "action_issues_count": str(len(action_issues)),
-                                "tool_failure_summary": tool_failure_summary or "",
-                                "correction_samples": '; '.join(correction_samples[:3]) if correction_samples else 'N/A',
-                                "correction_examples": correction_examples_text or "",
-                                "concrete_examples": concrete_examples_text or "",
-                                "dedup_section": dedup_section,
-                                "rubric_section": rubric_section,
-                                "json_fields": json_fields,
-                            },
-                            hardcoded_fallback=llm_prompt,
-                        )}
-                    ],
-                )
+                except Exception as e:
+                    logger.error(f"Failed to generate proposal for pattern '{tag}': {e}", exc_info=True)
+                    return tag, count, None, str(e)
+
+        # Evidence signature per pattern: everything that goes into its prompt.
+        # A pending proposal for the same prompt version with the same
+        # signature is what the LLM would produce again, so that pattern is
+        # skipped instead of re-billed and duplicated.
+        shared_evidence = orjson.dumps([
+            current_prompt_text, total_runs, tool_failure_summary,
+            correction_samples[:3], correction_examples_text, concrete_examples_text,
+            rubric_section, json_fields, config.LLM_MODEL,
+        ])
+        try:
+            pending = await self.db.list_proposals(agent_id, status="pending")
+        except Exception as e:
+            logger.warning(f"Could not load pending proposals for agent {agent_id}: {e}")
+            pending = []
+        known_hashes = {
+            p["evidence_hash"]: p.get("id") for p in pending
+            if p.get("evidence_hash") and p.get("prompt_version") == current_version
+        }
+        evidence_hashes = {}
+        patterns_to_propose = []
+        for tag, count in significant_patterns:
+            evidence_hash = hashlib.blake2b(
+                orjson.dumps([tag, count, issue_samples.get(tag, {}).get("notes", "")]) + b"\x00" + shared_evidence,
+                digest_size=16,
+            ).hexdigest()
+            if evidence_hash in known_hashes:
+                pending_id = known_hashes[evidence_hash]
+                logger.info(f"Pattern '{tag}' has pending proposal {pending_id} for unchanged evidence — skipping LLM call")
+                yield {"_status": True, "pattern": tag, "message": f"unchanged evidence; pending proposal {pending_id} kept"}
+                continue
+            evidence_hashes[tag] = evidence_hash
+            patterns_to_propose.append((tag, count))
 
-                # ==== TOKEN CAPTURE (Feature: cost-attribution) ====
-                try:
-                    usage = getattr(response, 'usage', None)
-                    if usage:
-                        _p_in = getattr(usage, 'prompt_tokens', 0) or 0
-                        _p_out = getattr(usage, 'completion_tokens', 0) or 0
-                        await self._record_cost(
-                            "prompt_proposal", config.LLM_MODEL, _p_in, _p_out,
-                            agent_id=agent_id,
-                        )
-                except Exception as _e:
-                    logger.debug(f"Token capture (proposal) failed: {_e}")
-
-                raw_content = response.choices[0].message.content or ""
-                # Qwen3 models may put response in 'thinking' field instead
-                if not raw_content.strip():
-                    thinking = getattr(response.choices[0].message, 'thinking', None)
-                    if thinking:
-                        logger.warning(f"Proposal LLM returned empty content but has thinking field — using thinking content")
-                        raw_content = thinking
-                content = raw_content.strip()
-                if not content:
-                    logger.error(f"Proposal LLM returned completely empty content for pattern '{tag}'")
-                    yield {"_error": True, "pattern": tag, "message": "LLM returned empty content"}
+        tasks = [asyncio.create_task(_propose(tag, count)) for tag, count in patterns_to_propose]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                tag, count, result, error = await next_done
+                if error is not None:
+                    # Yield error info so the SSE stream can report it to the frontend
+                    yield {"_error": True, "pattern": tag, "message": error}
                     continue
-                logger.debug(f"Proposal LLM raw output for '{tag}': {content[:200]}...")
-                result = _extract_json(content)
 
                 # Check if the LLM indicated this pattern is already covered
                 if result.get("skip"):
                     logger.info(f"LLM indicated pattern '{tag}' is already covered by previous proposals — skipping")
                     continue
 
-                # Build evidence from action annotations
-                evidence = []
-                for ctx in correction_with_context[:5]:  # Include up to 5 pieces of evidence
-                    evidence.append({
-                        "testcase_id": ctx["testcase_id"],
-                        "tool_name": ctx["tool_name"],
-                        "correction": ctx["correction"]
-                    })
-
-                # Clamp confidence to valid range
-                raw_confidence = result.get("confidence", 0.5)
+                title = result.get("title", f"Fix: {tag}")
+                # Proposals generated in parallel never saw each other — drop exact repeats
+                if title.strip().lower() in {t.strip().lower() for t in generated_titles}:
+                    logger.info(f"Proposal '{title}' for pattern '{tag}' duplicates an earlier one — skipping")
+                    continue
+
                 try:
-                    confidence_val = max(0.0, min(1.0, float(raw_confidence)))
-                except (TypeError, ValueError):
-                    confidence_val = 0.5
-
-                # Always include basic reasoning; prefer detailed_reasoning when available
-                basic_reasoning = result.get("reasoning")
-                detailed_reasoning = result.get("detailed_reasoning")
-                proposal_reasoning = detailed_reasoning or basic_reasoning
-
-                proposal = PromptProposal(
-                    agent_id=agent_id,
-                    prompt_version=current_version,
-                    title=result.get("title", f"Fix: {tag}"),
-                    category=result.get("category", "General"),
-                    confidence=confidence_val,
-                    priority=result.get("priority", "medium"),
-                    pattern_source=f'Issue "{tag}" occurred {count}/{total_runs} runs. {basic_reasoning or ""}',
-                    impact=result.get("expected_impact", ""),
-                    impact_detail=basic_reasoning or "",
-                    diff={
-                        "removed": result.get("lines_to_remove", []),
-                        "added": result.get("lines_to_add", [])
-                    },
-                    status="pending",
-                    evidence=evidence,
-                    reasoning=proposal_reasoning
-                )
+                    # Clamp confidence to valid range
+                    raw_confidence = result.get("confidence", 0.5)
+                    try:
+                        confidence_val = max(0.0, min(1.0, float(raw_confidence)))
+                    except (TypeError, ValueError):
+                        confidence_val = 0.5
+
+                    # Always include basic reasoning; prefer detailed_reasoning when available
+                    basic_reasoning = result.get("reasoning")
+                    detailed_reasoning = result.get("detailed_reasoning")
+                    proposal_reasoning = detailed_reasoning or basic_reasoning
+
+                    proposal = PromptProposal(
+                        agent_id=agent_id,
+                        prompt_version=current_version,
+                        title=title,
+                        category=result.get("category", "General"),
+                        confidence=confidence_val,
+                        priority=result.get("priority", "medium"),
+                        pattern_source=f'Issue "{tag}" occurred {count}/{total_runs} runs. {basic_reasoning or ""}',
+                        impact=result.get("expected_impact", ""),
+                        impact_detail=basic_reasoning or "",
+                        diff={
+                            "removed": result.get("lines_to_remove", []),
+                            "added": result.get("lines_to_add", [])
+                        },
+                        status="pending",
+                        evidence=evidence,
+                        reasoning=proposal_reasoning,
+                        evidence_hash=evidence_hashes[tag],
+                    )
+
+                    saved = await self.db.create_proposal(proposal)
+                except Exception as e:
+                    logger.error(f"Failed to generate proposal for pattern '{tag}': {e}", exc_info=True)
+                    yield {"_error": True, "pattern": tag, "message": str(e)}
+                    continue
 
-                saved = await self.db.create_proposal(proposal)
-                generated_titles.append(result.get("title", f"Fix: {tag}"))
+                generated_titles.append(title)
                 logger.info(f"Generated proposal: {proposal.title} with {len(evidence)} evidence items")
                 yield saved
-
-            except Exception as e:
-                logger.error(f"Failed to generate proposal for pattern '{tag}': {e}", exc_info=True)
-                # Yield error info so the SSE stream can report it to the frontend
-                yield {"_error": True, "pattern": tag, "message": str(e)}
-                continue
+        finally:
+            # Client went away mid-stream — stop the remaining LLM calls
+            for task in tasks:
+                task.cancel()
 
     async def generate_prompt_proposals_stream(self, agent_id: str, evaluation_ids: Optional[List[str]] = None, judge_rubric: Optional[str] = None, include_reasoning: bool = False):
         """Async generator version of generate_prompt_proposals for SSE streaming.
@@ -3073,15 +4335,7 @@ Respond as JSON with these exact fields:
         current_version = active_prompt.get("version", 0) if active_prompt else 0
 
         # Get evaluations to analyze
-        if evaluation_ids:
-            evals_to_analyze = []
-            for eid in evaluation_ids:
-                e = await self.db.get_evaluation_run(eid)
-                if e and e.agent_id == agent_id:
-                    evals_to_analyze.append(e)
-        else:
-            all_evals = await self.db.list_evaluation_runs(agent_id=agent_id, limit=20)
-            evals_to_analyze = [e for e in all_evals if e.status.value == "completed"]
+        evals_to_analyze = await self._load_evals_for_proposals(agent_id, evaluation_ids)
 
         if not evals_to_analyze:
             logger.info(f"No completed evaluations found for agent {agent_id}")
@@ -3090,43 +4344,34 @@ Respond as JSON with these exact fields:
         logger.info(f"Analyzing {len(evals_to_analyze)} completed evaluations for agent {agent_id}")
 
         # Collect annotation data
-        from collections import Counter
         issue_counter = Counter()
         issue_samples = {}
         action_issues = []
         correction_samples = []
         tool_failure_counts = Counter()
-        tool_failure_examples = {}
+        tool_failure_examples = defaultdict(list)
         correction_with_context = []
 
         # Also collect run-level quality signals (outcome, efficiency)
         low_outcome_runs = []  # runs with outcome <= 2 (failed/poor)
         inefficient_runs = []  # runs marked as "wasteful"
 
-        for eval_run in evals_to_analyze:
-            holdout_testcase_ids = set()
-            test_cases_by_id = {}
-            try:
-                test_cases = await self.db.list_testcases_by_dataset(eval_run.dataset_id)
-                for tc in test_cases:
-                    test_cases_by_id[tc.id] = tc
-                    if getattr(tc, 'is_holdout', False):
-                        holdout_testcase_ids.add(tc.id)
-            except Exception as e:
-                logger.warning(f"Failed to load test cases for holdout filtering in eval {eval_run.id}: {e}")
+        annotation_inputs = await self._fetch_annotation_inputs(evals_to_analyze)
 
-            run_anns = await self.db.list_run_annotations(eval_run.id)
+        for eval_run, holdout_testcase_ids, run_anns, action_anns in annotation_inputs:
             for ann in run_anns:
-                run_id = ann.get("run_id", "") if isinstance(ann, dict) else getattr(ann, 'run_id', "")
+                # One dict-vs-model check per annotation
+                ann_get = ann.get if isinstance(ann, dict) else (lambda name, default=None: getattr(ann, name, default))
+                run_id = ann_get("run_id", "")
                 if run_id in holdout_testcase_ids:
                     continue
-                issues = ann.get("issues", []) if isinstance(ann, dict) else getattr(ann, 'issues', [])
-                notes = ann.get("notes", "") if isinstance(ann, dict) else getattr(ann, 'notes', "")
-                outcome = ann.get("outcome") if isinstance(ann, dict) else getattr(ann, 'outcome', None)
-                efficiency = ann.get("efficiency") if isinstance(ann, dict) else getattr(ann, 'efficiency', None)
+                issues = ann_get("issues", [])
+                notes = ann_get("notes", "")
+                outcome = ann_get("outcome")
+                efficiency = ann_get("efficiency")
 
+                issue_counter.update(issues)
                 for issue in issues:
-                    issue_counter[issue] += 1
                     if issue not in issue_samples:
                         issue_samples[issue] = {"notes": notes or "", "run_id": run_id}
 
@@ -3146,53 +4391,59 @@ Respond as JSON with these exact fields:
                         if "Wasteful execution" not in issue_samples:
                             issue_samples["Wasteful execution"] = {"notes": notes or "Marked as wasteful", "run_id": run_id}
 
-            action_anns = await self.db.list_action_annotations(eval_run.id)
+            # Annotation run_id → this eval's result, built once (first result wins)
+            results_by_testcase = {tc.testcase_id: tc for tc in reversed(eval_run.test_cases)}
+            # 300-char response previews, sliced once per test case on first use;
+            # the 200-char correction context is cut from the cached preview
+            response_previews = {}
+
+            def _preview(tc_result):
+                preview = response_previews.get(tc_result.testcase_id)
+                if preview is None:
+                    preview = response_previews[tc_result.testcase_id] = (tc_result.response_from_agent or "")[:300]
+                return preview
+
             for ann in action_anns:
-                run_id = ann.get("run_id") if isinstance(ann, dict) else getattr(ann, 'run_id', None)
+                # One dict-vs-model check per annotation
+                ann_get = ann.get if isinstance(ann, dict) else (lambda name, default=None: getattr(ann, name, default))
+                run_id = ann_get("run_id")
                 if run_id in holdout_testcase_ids:
                     continue
-                correctness = ann.get("correctness") if isinstance(ann, dict) else getattr(ann, 'correctness', None)
-                parameter_quality = ann.get("parameter_quality") if isinstance(ann, dict) else getattr(ann, 'parameter_quality', None)
-                correction = ann.get("correction") if isinstance(ann, dict) else getattr(ann, 'correction', None)
-                action_index = ann.get("action_index") if isinstance(ann, dict) else getattr(ann, 'action_index', None)
+                correctness = ann_get("correctness")
+                parameter_quality = ann_get("parameter_quality")
+                correction = ann_get("correction")
+                action_index = ann_get("action_index")
 
                 # Include suboptimal actions too (not just incorrect/wrong)
                 if correctness in ("incorrect", "acceptable") or parameter_quality in ("wrong", "suboptimal"):
                     action_issues.append(ann)
                     if action_index is not None and run_id:
-                        test_case_result = None
-                        for tc_result in eval_run.test_cases:
-                            if tc_result.testcase_id == run_id:
-                                test_case_result = tc_result
-                                break
+                        test_case_result = results_by_testcase.get(run_id)
                         if test_case_result and action_index < len(test_case_result.actual_tool_calls):
                             tool_call = test_case_result.actual_tool_calls[action_index]
                             tool_name = tool_call.get("name", "unknown")
                             tool_failure_counts[tool_name] += 1
-                            if tool_name not in tool_failure_examples:
-                                tool_failure_examples[tool_name] = []
-                            if len(tool_failure_examples[tool_name]) < 3:
-                                tool_failure_examples[tool_name].append({
+                            examples = tool_failure_examples[tool_name]
+                            if len(examples) < 3:
+                                examples.append({
                                     "testcase_id": run_id,
                                     "tool_call": tool_call,
-                                    "agent_response": test_case_result.response_from_agent[:300] if test_case_result.response_from_agent else "",
+                                    "agent_response": _preview(test_case_result),
                                     "correction": correction or "N/A"
                                 })
 
                 if correction:
                     correction_samples.append(correction)
                     if action_index is not None and run_id:
-                        for tc_result in eval_run.test_cases:
-                            if tc_result.testcase_id == run_id:
-                                if action_index < len(tc_result.actual_tool_calls):
-                                    tool_name = tc_result.actual_tool_calls[action_index].get("name", "unknown")
-                                    correction_with_context.append({
-                                        "testcase_id": run_id,
-                                        "tool_name": tool_name,
-                                        "agent_response": tc_result.response_from_agent[:200] if tc_result.response_from_agent else "",
-                                        "correction": correction
-                                    })
-                                break
+                        tc_result = results_by_testcase.get(run_id)
+                        if tc_result and action_index < len(tc_result.actual_tool_calls):
+                            tool_name = tc_result.actual_tool_calls[action_index].get("name", "unknown")
+                            correction_with_context.append({
+                                "testcase_id": run_id,
+                                "tool_name": tool_name,
+                                "agent_response": _preview(tc_result)[:200],
+                                "correction": correction
+                            })
 
         # Also consider failed test cases (pass_fail == "fail") even without annotations
         if not issue_counter and not action_issues:
@@ -3268,6 +4519,9 @@ Respond as JSON with these exact fields:
             finally:
                 self._running_tasks.pop(evaluation_id, None)
 
+            # Write any buffered test results before reading the run back
+            await self.force_flush(evaluation_id)
+
             # If evaluation was cancelled, don't finalize
             if evaluation_id in self._cancelled_evals:
                 logger.info(f"Evaluation {evaluation_id} was cancelled — skipping finalization")
@@ -3350,36 +4604,36 @@ Respond as JSON with these exact fields:
         test_exec.agent_call_start = time.time()
 
         try:
-            agent_timeout = max(eval_run.timeout_seconds, 600)
-            async with httpx.AsyncClient(timeout=httpx.Timeout(agent_timeout, connect=30.0)) as client:
-                payload = {
-                    "dataset_id": eval_run.dataset_id,
-                    "test_case_id": test_case.id,
-                    "agent_id": eval_run.agent_id,
-                    "evaluation_run_id": eval_run.id,
-                    "input": test_case.input,
-                    "system_prompt": custom_system_prompt
-                }
+            agent_timeout, _ = _agent_request_defaults(eval_run)
+            payload = {
+                "dataset_id": eval_run.dataset_id,
+                "test_case_id": test_case.id,
+                "agent_id": eval_run.agent_id,
+                "evaluation_run_id": eval_run.id,
+                "input": test_case.input,
+                "system_prompt": custom_system_prompt
+            }
 
-                response = await client.post(
-                    eval_run.agent_endpoint,
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                )
+            response = await self._agent_http.post(
+                eval_run.agent_endpoint,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=agent_timeout,
+            )
 
-                if response.status_code == 200:
-                    result_data = response.json()
-                    test_exec.agent_response = result_data.get("response", "")
-                    tool_call_data = result_data.get("tool_calls", [])
-                    test_exec.tool_calls = tool_call_data
-                    test_exec.actual_tools = [
-                        tool.get("name") if isinstance(tool, dict) else str(tool)
-                        for tool in tool_call_data
-                    ]
-                    test_exec.status = "completed"
-                else:
-                    test_exec.status = "failed"
-                    test_exec.error_message = f"HTTP {response.status_code}: {response.text[:500]}"
+            if response.status_code == 200:
+                result_data = response.json()
+                test_exec.agent_response = result_data.get("response", "")
+                tool_call_data = result_data.get("tool_calls", [])
+                test_exec.tool_calls = tool_call_data
+                test_exec.actual_tools = [
+                    tool.get("name") if isinstance(tool, dict) else str(tool)
+                    for tool in tool_call_data
+                ]
+                test_exec.status = "completed"
+            else:
+                test_exec.status = "failed"
+                test_exec.error_message = f"HTTP {response.status_code}: {response.text[:500]}"
         except httpx.TimeoutException as e:
             test_exec.status = "failed"
             elapsed = time.time() - test_exec.agent_call_start
@@ -3423,6 +4677,10 @@ Respond as JSON with these exact fields:
         if eval_run.status in [EvaluationRunStatus.completed, EvaluationRunStatus.failed]:
             raise ValueError(f"Cannot cancel evaluation in '{eval_run.status}' state")
 
+        # Keep results of tests that already finished, then re-read the run
+        await self.force_flush(evaluation_id)
+        eval_run = await self.db.get_evaluation_run(evaluation_id) or eval_run
+
         # Mark as cancelled (in-memory flag + DB)
         self._cancelled_evals.add(evaluation_id)
         eval_run.status = EvaluationRunStatus.cancelled
@@ -3446,25 +4704,18 @@ Respond as JSON with these exact fields:
                     cancelled_count += 1
             logger.info(f"Cancelled {cancelled_count} running task(s) for evaluation {evaluation_id}")
 
-        # Clean up any locks for this evaluation
-        async with self._locks_lock:
-            self._eval_run_locks.pop(evaluation_id, None)
-
         return eval_run
 
     async def _send_agent_cancel(self, agent_endpoint: str):
         """Send a cancel signal to the agent server to close browsers."""
-        from urllib.parse import urlparse
         try:
-            parsed = urlparse(agent_endpoint)
-            cancel_url = f"{parsed.scheme}://{parsed.netloc}/cancel"
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                r = await client.post(cancel_url)
-                if r.status_code == 200:
-                    data = r.json()
-                    logger.info(f"Agent cancel OK: closed {data.get('browsers_closed', '?')} browser(s)")
-                else:
-                    logger.warning(f"Agent cancel returned {r.status_code}: {r.text[:200]}")
+            cancel_url = _agent_side_url(agent_endpoint, "/cancel")
+            r = await self._progress_http.post(cancel_url, timeout=5.0)
+            if r.status_code == 200:
+                data = r.json()
+                logger.info(f"Agent cancel OK: closed {data.get('browsers_closed', '?')} browser(s)")
+            else:
+                logger.warning(f"Agent cancel returned {r.status_code}: {r.text[:200]}")
         except Exception as e:
             # Agent might not support /cancel — that's fine, just log it
             logger.warning(f"Could not send cancel to agent: {e}")
@@ -3475,26 +4726,16 @@ Respond as JSON with these exact fields:
         This should be called at startup to clean up evaluations that were
         interrupted by a server restart.
         """
-        from .models import StatusHistoryEntry
         try:
-            # Get all evaluations
-            all_evals = await self.db.list_evaluation_runs(limit=1000)
-            
-            orphaned_count = 0
-            for eval_run in all_evals:
-                if eval_run.status in [EvaluationRunStatus.running, EvaluationRunStatus.pending]:
-                    eval_run.status = EvaluationRunStatus.cancelled
-                    eval_run.completed_at = datetime.now(timezone.utc)
-                    # Add status history entry explaining the cancellation
-                    eval_run.status_history.append(StatusHistoryEntry(
-                        message="⚠️ Cancelled: Server restarted while evaluation was running"
-                    ))
-                    await self.db.update_evaluation_run(eval_run)
-                    orphaned_count += 1
-                    print(f"[STARTUP] Marked orphaned evaluation {eval_run.id} ({eval_run.name}) as cancelled", flush=True)
-            
-            if orphaned_count > 0:
-                print(f"[STARTUP] Cleaned up {orphaned_count} orphaned evaluation(s)", flush=True)
+            # One UPDATE for all orphans, with a status history entry explaining the cancellation
+            orphans = await self.db.cancel_orphaned_evaluations(StatusHistoryEntry(
+                message="⚠️ Cancelled: Server restarted while evaluation was running"
+            ))
+            for orphan_id, orphan_name in orphans:
+                print(f"[STARTUP] Marked orphaned evaluation {orphan_id} ({orphan_name}) as cancelled", flush=True)
+
+            if orphans:
+                print(f"[STARTUP] Cleaned up {len(orphans)} orphaned evaluation(s)", flush=True)
             else:
                 print("[STARTUP] No orphaned evaluations found", flush=True)
                 
@@ -3517,29 +4758,20 @@ Respond as JSON with these exact fields:
         if eval_a.created_at > eval_b.created_at:
             eval_a, eval_b = eval_b, eval_a
 
-        # Build test result maps
-        results_a = {}
-        details_a = {}
-        for tc in eval_a.test_cases:
-            results_a[tc.testcase_id] = tc.passed
-            details_a[tc.testcase_id] = tc
-
-        results_b = {}
-        details_b = {}
-        for tc in eval_b.test_cases:
-            results_b[tc.testcase_id] = tc.passed
-            details_b[tc.testcase_id] = tc
+        # Test case id → result; pass/fail is read from the result itself
+        details_a = {tc.testcase_id: tc for tc in eval_a.test_cases}
+        details_b = {tc.testcase_id: tc for tc in eval_b.test_cases}
 
         # Classify test cases (considers both binary pass/fail AND rubric score changes)
         RUBRIC_CHANGE_THRESHOLD = 0.3
         improved, regressed, unchanged = [], [], []
-        all_ids = set(results_a.keys()) | set(results_b.keys())
+        all_ids = details_a.keys() | details_b.keys()
 
         for tc_id in all_ids:
-            r_a = results_a.get(tc_id)
-            r_b = results_b.get(tc_id)
             tc_detail_a = details_a.get(tc_id)
             tc_detail_b = details_b.get(tc_id)
+            r_a = tc_detail_a.passed if tc_detail_a else None
+            r_b = tc_detail_b.passed if tc_detail_b else None
             name = "Unknown"
             if tc_detail_b and hasattr(tc_detail_b, 'test_case_name'):
                 name = tc_detail_b.test_case_name or tc_id
@@ -3547,13 +4779,14 @@ Respond as JSON with these exact fields:
                 name = tc_detail_a.test_case_name or tc_id
 
             # Rubric scores
-            score_a = getattr(tc_detail_a, 'rubric_average_score', None) if tc_detail_a else None
-            score_b = getattr(tc_detail_b, 'rubric_average_score', None) if tc_detail_b else None
+            score_a = tc_detail_a.rubric_average_score if tc_detail_a else None
+            score_b = tc_detail_b.rubric_average_score if tc_detail_b else None
             score_delta = (score_b - score_a) if score_a is not None and score_b is not None else None
 
             entry = {
                 "name": name, "id": tc_id,
                 "detail_a": tc_detail_a, "detail_b": tc_detail_b,
+                "passed_a": r_a, "passed_b": r_b,
                 "score_a": score_a, "score_b": score_b, "score_delta": score_delta,
             }
 
@@ -3568,6 +4801,13 @@ Respond as JSON with these exact fields:
             else:
                 unchanged.append(entry)
 
+        # Split unchanged tests once; both the UNCHANGED section and the
+        # structure instructions use it (tests absent from the latest run are in neither)
+        passed_unchanged, failed_unchanged = [], []
+        for entry in unchanged:
+            if entry['passed_b'] is not None:
+                (passed_unchanged if entry['passed_b'] else failed_unchanged).append(entry)
+
         # ── Build rich per-test-case context ────────────────────────────
         def _tc_trace(tc_result) -> str:
             """Extract a detailed execution trace from a test case result."""
@@ -3576,65 +4816,54 @@ Respond as JSON with these exact fields:
             lines = []
 
             # Execution error (most important signal for failures)
-            err = getattr(tc_result, 'execution_error', None)
+            err = tc_result.execution_error
             if err:
                 lines.append(f"  ERROR: {err[:300]}")
 
             # Step-by-step trace from tool calls
-            tool_calls = getattr(tc_result, 'actual_tool_calls', []) or []
+            tool_calls = tc_result.actual_tool_calls
             if tool_calls:
                 steps = []
                 for i, tc in enumerate(tool_calls[:10], 1):
                     name = tc.get('name', '?')
                     args = tc.get('arguments', {})
-                    result = tc.get('result', '')
                     success = tc.get('success', None)
                     duration = tc.get('duration_seconds', 0)
                     # Format step concisely
-                    arg_str = ""
-                    if name == "navigate":
-                        arg_str = f" → {args.get('url', '?')[:80]}"
-                    elif name == "click":
-                        arg_str = f" at ({args.get('x', '?')},{args.get('y', '?')})"
-                    elif name in ("type_text", "click_and_type"):
-                        arg_str = f" \"{args.get('text', '?')[:50]}\""
-                    elif name == "done":
-                        arg_str = f" result=\"{args.get('result', '?')[:80]}\""
-                    elif name == "scroll":
-                        arg_str = f" {args.get('direction', '?')}"
+                    fmt = _STEP_ARG_FORMATTERS.get(name)
+                    arg_str = fmt(args) if fmt else ""
 
                     status = "✓" if success else "✗"
-                    result_preview = str(result)[:80] if result else ""
                     step_line = f"  {i}. [{status}] {name}{arg_str}"
                     if duration:
                         step_line += f" ({duration:.1f}s)"
-                    if not success and result_preview:
-                        step_line += f" — {result_preview}"
+                    if not success:
+                        # Only failed steps show their result, so only they stringify it
+                        result = tc.get('result', '')
+                        if result:
+                            step_line += f" — {str(result)[:80]}"
                     steps.append(step_line)
                 lines.append("  Steps:\n" + "\n".join(steps))
 
             # Agent's final response
-            resp = getattr(tc_result, 'response_from_agent', '') or ''
+            resp = tc_result.response_from_agent or ''
             if resp:
                 lines.append(f"  Final response: {resp[:250]}{'...' if len(resp) > 250 else ''}")
 
             # Assertion verdicts with reasons
-            tool_expectations = getattr(tc_result, 'tool_expectations', []) or []
+            tool_expectations = tc_result.tool_expectations
             assertion_lines = []
             for te in tool_expectations[:4]:
-                if hasattr(te, 'assertions'):
-                    for a in (te.assertions or [])[:4]:
-                        passed = getattr(a, 'passed', False)
-                        reasoning = getattr(a, 'reasoning', '') or ''
-                        assertion_text = getattr(a, 'assertion', '') or ''
-                        tag = "PASS" if passed else "FAIL"
-                        desc = assertion_text[:100] if assertion_text else reasoning[:100]
-                        assertion_lines.append(f"  [{tag}] {desc}")
+                for a in (getattr(te, 'assertions', None) or [])[:4]:
+                    tag = "PASS" if getattr(a, 'passed', False) else "FAIL"
+                    # The reasoning is only needed when the assertion text is empty
+                    desc = getattr(a, 'assertion', '') or getattr(a, 'reasoning', '') or ''
+                    assertion_lines.append(f"  [{tag}] {desc[:100]}")
             if assertion_lines:
                 lines.append("  Assertions:\n" + "\n".join(assertion_lines))
 
             # Timing
-            duration = getattr(tc_result, 'total_duration_seconds', None)
+            duration = tc_result.total_duration_seconds
             if duration:
                 lines.append(f"  Total duration: {duration:.1f}s")
 
@@ -3648,17 +4877,21 @@ Respond as JSON with these exact fields:
         pass_b = eval_b.passed_count / max(eval_b.total_tests, 1) * 100
 
         # Aggregate rubric stats
-        scored_a = [getattr(tc, 'rubric_average_score', None) for tc in eval_a.test_cases]
-        scored_b = [getattr(tc, 'rubric_average_score', None) for tc in eval_b.test_cases]
-        scored_a = [s for s in scored_a if s is not None]
-        scored_b = [s for s in scored_b if s is not None]
+        def _rubric_avg(test_cases) -> Optional[float]:
+            """Mean rubric score over the scored test cases, in one pass."""
+            total, scored = 0.0, 0
+            for tc in test_cases:
+                score = tc.rubric_average_score
+                if score is not None:
+                    total += score
+                    scored += 1
+            return total / scored if scored else None
+
+        avg_a = _rubric_avg(eval_a.test_cases)
+        avg_b = _rubric_avg(eval_b.test_cases)
         rubric_line = ""
-        if scored_a or scored_b:
-            avg_a = sum(scored_a) / len(scored_a) if scored_a else None
-            avg_b = sum(scored_b) / len(scored_b) if scored_b else None
-            rubric_line = f"\n- Rubric avg: baseline={avg_a:.2f}/5, latest={avg_b:.2f}/5" if avg_a and avg_b else ""
-            if avg_a and avg_b:
-                rubric_line += f" (delta: {avg_b - avg_a:+.2f})"
+        if avg_a and avg_b:
+            rubric_line = f"\n- Rubric avg: baseline={avg_a:.2f}/5, latest={avg_b:.2f}/5 (delta: {avg_b - avg_a:+.2f})"
 
         sections.append(f"""## Evaluation Comparison
 - Baseline: "{eval_a.name}" — {eval_a.passed_count}/{eval_a.total_tests} passed ({pass_a:.0f}%)
@@ -3667,38 +4900,29 @@ Respond as JSON with these exact fields:
 - {len(improved)} improved, {len(regressed)} regressed, {len(unchanged)} unchanged
 - NOTE: "improved" and "regressed" include rubric score changes ≥{RUBRIC_CHANGE_THRESHOLD} even when binary pass/fail is the same""")
 
-        if improved:
-            section = "## IMPROVED\n"
-            for entry in improved:
-                r_a = results_a.get(entry['id'])
-                r_b = results_b.get(entry['id'])
-                label_a = "failed" if not r_a else "passed"
-                label_b = "passed" if r_b else "failed"
+        def _render_changed(title: str, entries: list) -> str:
+            """Render the IMPROVED / REGRESSED section: both runs' traces per test."""
+            parts = [f"## {title}\n"]
+            for entry in entries[:_COMPARISON_MAX_TRACES]:
+                label_a = "passed" if entry['passed_a'] else "failed"
+                label_b = "passed" if entry['passed_b'] else "failed"
                 score_info = ""
-                if entry.get('score_a') is not None and entry.get('score_b') is not None:
+                if entry['score_a'] is not None and entry['score_b'] is not None:
                     score_info = f" | rubric: {entry['score_a']:.1f} → {entry['score_b']:.1f} ({entry['score_delta']:+.1f})"
-                section += f"\n### {entry['name']} ({label_a} → {label_b}{score_info})\n"
-                section += f"BASELINE ({label_a}):\n{_tc_trace(entry['detail_a'])}\n\n"
-                section += f"LATEST ({label_b}):\n{_tc_trace(entry['detail_b'])}\n"
-            sections.append(section)
+                parts.append(f"\n### {entry['name']} ({label_a} → {label_b}{score_info})\n")
+                parts.append(f"BASELINE ({label_a}):\n{_tc_trace(entry['detail_a'])}\n\n")
+                parts.append(f"LATEST ({label_b}):\n{_tc_trace(entry['detail_b'])}\n")
+            if len(entries) > _COMPARISON_MAX_TRACES:
+                parts.append(f"\n(+{len(entries) - _COMPARISON_MAX_TRACES} more {title.lower()} tests not shown)\n")
+            return "".join(parts)
+
+        if improved:
+            sections.append(_render_changed("IMPROVED", improved))
 
         if regressed:
-            section = "## REGRESSED\n"
-            for entry in regressed:
-                r_a = results_a.get(entry['id'])
-                r_b = results_b.get(entry['id'])
-                label_a = "passed" if r_a else "failed"
-                label_b = "failed" if not r_b else "passed"
-                score_info = ""
-                if entry.get('score_a') is not None and entry.get('score_b') is not None:
-                    score_info = f" | rubric: {entry['score_a']:.1f} → {entry['score_b']:.1f} ({entry['score_delta']:+.1f})"
-                section += f"\n### {entry['name']} ({label_a} → {label_b}{score_info})\n"
-                section += f"BASELINE ({label_a}):\n{_tc_trace(entry['detail_a'])}\n\n"
-                section += f"LATEST ({label_b}):\n{_tc_trace(entry['detail_b'])}\n"
-            sections.append(section)
+            sections.append(_render_changed("REGRESSED", regressed))
 
         if unchanged:
-            passed_unchanged = [e for e in unchanged if results_b.get(e['id']) == True]
             section = f"## UNCHANGED\n- {len(passed_unchanged)} still passing, {len(failed_unchanged)} still failing"
             if failed_unchanged:
                 section += "\n\nStill-failing tests (investigate these next):"
@@ -3708,62 +4932,19 @@ Respond as JSON with these exact fields:
 
         user_prompt = "\n\n".join(sections)
 
-        # Build dynamic structure instructions based on what sections exist
-        failed_unchanged = [e for e in unchanged if results_b.get(e['id']) == False]
-
-        structure_parts = []
-        if improved:
-            structure_parts.append(
-                "## What Improved\n"
-                "For each improved test, explain specifically what the agent did differently in the latest run "
-                "(e.g., 'used navigate instead of click', 'correctly called done with result instead of looping'). "
-                "Reference step numbers."
-            )
-        if regressed:
-            structure_parts.append(
-                "## What Regressed\n"
-                "For each regressed test, pinpoint the exact step where things went wrong "
-                "(e.g., 'got stuck repeating click at (53,604)', 'timed out at step 3'). Reference the error message."
-            )
-        if failed_unchanged:
-            structure_parts.append(
-                "## Still Failing\n"
-                "For tests that failed in both runs, identify what's blocking them and whether there's progress."
-            )
-        structure_parts.append(
-            "## Recommendations\n"
-            "Give 2-3 SPECIFIC, ACTIONABLE fixes (e.g., 'add auto-rescue for click loops on form submit buttons', "
-            "'increase timeout for Wikipedia pages', 'add explicit form-filling guidance to system prompt'). "
-            "Do NOT give generic advice like 'add more tests' or 'monitor performance'."
-        )
-
-        # Load comparison prompt from DB (falls back to default)
-        _default_comparison = (
-            "You are a senior QA engineer analyzing an AI agent's evaluation results. "
-            "You are given step-by-step execution traces for each test case across two runs (Baseline and Latest).\n\n"
-            "Your job is to identify SPECIFIC, CONCRETE root causes — not generic observations. "
-            "Compare the actual step sequences between runs to explain what the agent did differently.\n\n"
-            "IMPORTANT RULES:\n"
-            "- ONLY include sections that have relevant data. Do NOT include empty sections.\n"
-            "- If there are no regressions, do NOT include a 'What Regressed' section.\n"
-            "- If there are no still-failing tests, do NOT include a 'Still Failing' section.\n"
-            "- If there are no improvements, do NOT include a 'What Improved' section.\n"
-            "- Always include the Recommendations section.\n\n"
-            "Structure your analysis using ONLY these applicable sections:\n\n"
-            + "\n\n".join(structure_parts) + "\n\n"
-            "Keep it under 400 words. Be direct."
-        )
+        # Load comparison prompt from DB (falls back to a default that lists only the applicable sections)
+        _default_comparison = _default_comparison_prompt(bool(improved), bool(regressed), bool(failed_unchanged))
         system_prompt = await self._get_system_prompt("comparison_explanation", _default_comparison)
 
         # Call LLM
-        response = await asyncio.to_thread(
-            self.openai_client.chat.completions.create,
-            model=config.LLM_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-        )
+        async with self._llm_semaphore:
+            response = await self.openai_client.chat.completions.create(
+                model=config.LLM_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+            )
 
         return response.choices[0].message.content.strip()
 
@@ -79,7 +79,8 @@ async def lifespan(app: FastAPI):
     3. Hand off to MCP's lifespan manager
 
     Shutdown actions:
-    1. Log shutdown message
+    1. Close the evaluator's pooled HTTP clients
+    2. Log shutdown message
     """
     # Startup
     logger.info("Starting API server...")
@@ -129,6 +130,8 @@ async def lifespan(app: FastAPI):
                 await cleanup_task
             except asyncio.CancelledError:
                 pass
+        # Release pooled HTTP connections held by the evaluator
+        await get_evaluator_service(get_db_service()).aclose()
 
     # Shutdown
     logger.info("API server shutting down...")
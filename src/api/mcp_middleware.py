@@ -6,6 +6,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 import logging
 import json
 from typing import Any
+import orjson
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -25,8 +26,14 @@ class MCP400ErrorHandlerMiddleware(BaseHTTPMiddleware):
                     try:
                         body = await request.body()
                         if body:
-                            # Try to parse JSON to catch malformed requests early
-                            json.loads(body.decode('utf-8'))
+                            # Try to parse JSON to catch malformed requests early.
+                            # orjson parses the raw bytes (no decode step); it
+                            # rejects NaN/Infinity, which json accepts, so only
+                            # what json also rejects is treated as malformed.
+                            try:
+                                orjson.loads(body)
+                            except orjson.JSONDecodeError:
+                                json.loads(body.decode('utf-8'))
                             # Reset the body for the next middleware
                             request._body = body
                     except json.JSONDecodeError as je:
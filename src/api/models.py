@@ -451,6 +451,10 @@ class EvaluationRun(BaseModel):
     verbose_logging: bool = Field(default=False, description="Enable detailed assertion-level status updates")
     # Feature: demo-mode - When True, generates synthetic agent responses instead of making HTTP calls
     demo_mode: bool = Field(default=False, description="Use synthetic mock responses instead of calling the agent endpoint")
+    # Feature: judge-cache - When True, byte-identical judge prompts reuse a cached LLM response
+    judge_cache_enabled: bool = Field(default=False, description="Reuse judge responses for identical judge prompts")
+    # Feature: fast-fail - When True, tool_level tests that already failed tool checks skip the response quality judge
+    fast_fail_enabled: bool = Field(default=False, description="Skip the response quality judge once tool checks have failed")
 
     # ==== PROMPT TRACEABILITY ====
     # Links this evaluation to the exact prompt version that produced the results.
@@ -523,6 +527,8 @@ class EvaluationRunCreate(BaseModel):
     timeout_seconds: int = 300
     verbose_logging: bool = False
     demo_mode: bool = False
+    judge_cache_enabled: bool = False
+    fast_fail_enabled: bool = False
     prompt_version: Optional[int] = None
     prompt_id: Optional[str] = None
     judge_config_id: Optional[str] = None
@@ -726,6 +732,7 @@ class PromptProposal(BaseModel):
     status: str = "pending"  # pending, applied, dismissed
     evidence: List[Dict[str, Any]] = Field(default_factory=list, description="Evidence linking to specific test case failures")
     reasoning: Optional[str] = Field(default=None, description="LLM reasoning chain for this proposal")
+    evidence_hash: Optional[str] = Field(default=None, description="Signature of the evidence the proposal was generated from")
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 class GenerateProposalsRequest(BaseModel):
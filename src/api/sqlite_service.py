@@ -122,6 +122,16 @@ class SQLiteService:
             """)
             await db.execute("CREATE INDEX IF NOT EXISTS idx_cost_eval ON cost_records(json_extract(data, '$.evaluation_id'))")
 
+            # ==== Judge Verdict Cache (Feature: judge-cache) ====
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS judge_cache (
+                    key TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    model TEXT,
+                    created_at TEXT NOT NULL
+                )
+            """)
+
             # ==== System Prompts (Feature: configurable-prompts) ====
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS system_prompts (
@@ -563,6 +573,39 @@ class SQLiteService:
             rows = await cursor.fetchall()
             return [EvaluationRun(**json.loads(r[0])) for r in rows]
 
+    async def get_previous_completed_results(self, agent_id: str, dataset_id: str, exclude_id: str) -> Optional[tuple]:
+        """Find the latest completed evaluation of a dataset and its per-test pass map.
+
+        Feature: regression-detection
+        Filtering and the test_cases walk happen in SQLite, so only
+        (testcase_id, passed) pairs come back instead of whole run documents.
+
+        Returns:
+            (evaluation_id, {testcase_id: passed}) or None if there is no such run
+        """
+        await self._ensure_initialized()
+        async with self._conn() as db:
+            cursor = await db.execute(
+                """
+                SELECT e.id, json_extract(tc.value, '$.testcase_id'), json_extract(tc.value, '$.passed')
+                FROM (
+                    SELECT id, data FROM evaluations
+                    WHERE agent_id = ?
+                      AND json_extract(data, '$.dataset_id') = ?
+                      AND json_extract(data, '$.status') = 'completed'
+                      AND id != ?
+                    ORDER BY json_extract(data, '$.created_at') DESC
+                    LIMIT 1
+                ) e
+                LEFT JOIN json_each(e.data, '$.test_cases') tc
+                """,
+                (agent_id, dataset_id, exclude_id)
+            )
+            rows = await cursor.fetchall()
+        if not rows:
+            return None
+        return rows[0][0], {tid: bool(passed) for _, tid, passed in rows if tid is not None}
+
     async def update_evaluation_run(self, evaluation_run) -> "EvaluationRun":
         await self._ensure_initialized()
         from .models import EvaluationRun
@@ -577,6 +620,121 @@ class SQLiteService:
             await db.commit()
         return EvaluationRun(**data_dict)
 
+    async def append_test_results(self, evaluation_id: str, test_results: list) -> bool:
+        """Append test results and bump the run's counters without rewriting the document.
+
+        Each result is inserted at the end of $.test_cases and completed/passed/
+        failed/in-progress counters are adjusted server-side, all in one
+        transaction. Avoids the read-modify-write of update_evaluation_run().
+        """
+        await self._ensure_initialized()
+        rows = [
+            (tr.model_dump_json(), 1 if tr.passed else 0, 0 if tr.passed else 1, evaluation_id)
+            for tr in test_results
+        ]
+        async with self._conn() as db:
+            await db.executemany(
+                """UPDATE evaluations SET data = json_set(
+                       json_insert(data, '$.test_cases[#]', json(?)),
+                       '$.completed_tests', COALESCE(json_extract(data, '$.completed_tests'), 0) + 1,
+                       '$.passed_count', COALESCE(json_extract(data, '$.passed_count'), 0) + ?,
+                       '$.failed_tests', COALESCE(json_extract(data, '$.failed_tests'), 0) + ?,
+                       '$.in_progress_tests', MAX(COALESCE(json_extract(data, '$.in_progress_tests'), 0) - 1, 0)
+                   ) WHERE id = ?""",
+                rows
+            )
+            await db.commit()
+        return True
+
+    async def bump_in_progress(self, evaluation_id: str, delta: int) -> None:
+        """Atomically adjust in_progress_tests by delta (never below zero)."""
+        await self._ensure_initialized()
+        async with self._conn() as db:
+            await db.execute(
+                "UPDATE evaluations SET data = json_set(data, '$.in_progress_tests', "
+                "MAX(COALESCE(json_extract(data, '$.in_progress_tests'), 0) + ?, 0)) WHERE id = ?",
+                (delta, evaluation_id)
+            )
+            await db.commit()
+
+    async def append_status_history(self, evaluation_id: str, entry, rate_limit_wait: Optional[float] = None, max_entries: int = 100) -> bool:
+        """Set status_message and append a StatusHistoryEntry to a running evaluation.
+
+        History is capped at max_entries by dropping the oldest entry. When
+        rate_limit_wait is given, the aggregate rate-limit stats are bumped in
+        the same statement. Only applies while the run's status is 'running'.
+        """
+        await self._ensure_initialized()
+        hit = 1 if rate_limit_wait else 0
+        async with self._conn() as db:
+            cursor = await db.execute(
+                """UPDATE evaluations SET data = json_set(
+                       json_insert(
+                           CASE WHEN json_array_length(data, '$.status_history') >= ?
+                                THEN json_remove(data, '$.status_history[0]') ELSE data END,
+                           '$.status_history[#]', json(?)
+                       ),
+                       '$.status_message', ?,
+                       '$.total_rate_limit_hits', COALESCE(json_extract(data, '$.total_rate_limit_hits'), 0) + ?,
+                       '$.total_retry_wait_seconds', COALESCE(json_extract(data, '$.total_retry_wait_seconds'), 0) + ?
+                   ) WHERE id = ? AND json_extract(data, '$.status') = 'running'""",
+                (max_entries, entry.model_dump_json(), entry.message, hit, rate_limit_wait or 0.0, evaluation_id)
+            )
+            await db.commit()
+            return cursor.rowcount > 0
+
+    async def cancel_orphaned_evaluations(self, entry) -> List[tuple]:
+        """Mark every 'running' or 'pending' evaluation as cancelled in one statement.
+
+        Sets status and completed_at and appends the StatusHistoryEntry
+        server-side, so no run document is loaded or rewritten in Python.
+
+        Returns:
+            [(evaluation_id, name)] of the runs that were cancelled
+        """
+        await self._ensure_initialized()
+        from datetime import datetime, timezone
+        completed_at = datetime.now(timezone.utc).isoformat()
+        where = "json_extract(data, '$.status') IN ('running', 'pending')"
+        async with self._conn() as db:
+            cursor = await db.execute(f"SELECT id, json_extract(data, '$.name') FROM evaluations WHERE {where}")
+            orphans = await cursor.fetchall()
+            if orphans:
+                await db.execute(
+                    f"""UPDATE evaluations SET data = json_insert(
+                           json_set(data, '$.status', 'cancelled', '$.completed_at', ?),
+                           '$.status_history[#]', json(?)
+                       ) WHERE {where}""",
+                    (completed_at, entry.model_dump_json())
+                )
+                await db.commit()
+            return [(row[0], row[1]) for row in orphans]
+
+    async def add_evaluation_warning(self, evaluation_id: str, warning: str) -> bool:
+        """Append a warning to the run unless an identical one is already present."""
+        return await self.add_evaluation_warnings(evaluation_id, [warning]) > 0
+
+    async def add_evaluation_warnings(self, evaluation_id: str, warnings: List[str]) -> int:
+        """Append each warning not already on the run, in one transaction.
+
+        Behaves like a set insert: duplicates (in the batch or already stored)
+        are skipped. Returns the number of warnings actually added.
+        """
+        if not warnings:
+            return 0
+        await self._ensure_initialized()
+        async with self._conn() as db:
+            before = db.total_changes
+            await db.executemany(
+                """UPDATE evaluations SET data = json_insert(data, '$.warnings[#]', ?)
+                   WHERE id = ? AND NOT EXISTS (
+                       SELECT 1 FROM json_each(evaluations.data, '$.warnings') WHERE value = ?
+                   )""",
+                [(w, evaluation_id, w) for w in dict.fromkeys(warnings)]
+            )
+            await db.commit()
+            return db.total_changes - before
+
     async def delete_evaluation_run(self, evaluation_id: str) -> bool:
         await self._ensure_initialized()
         async with self._conn() as db:
@@ -1713,18 +1871,18 @@ class SQLiteService:
                     "You are a prompt engineering expert. Analyze this agent failure pattern "
                     "and suggest ONE specific system prompt improvement.\n\n"
                     "CURRENT SYSTEM PROMPT:\n{{current_prompt}}\n\n"
-                    "FAILURE PATTERN FROM HUMAN ANNOTATIONS:\n"
-                    "- Issue \"{{tag}}\" occurred {{count}} times across {{total_runs}} test runs\n"
-                    "- Sample annotator notes: {{sample_notes}}\n"
-                    "- Number of incorrect action annotations: {{action_issues_count}}\n"
                     "{{tool_failure_summary}}\n"
                     "- Sample corrections suggested: {{correction_samples}}\n"
                     "{{correction_examples}}\n"
                     "{{concrete_examples}}\n"
+                    "{{rubric_section}}\n"
+                    "FAILURE PATTERN FROM HUMAN ANNOTATIONS:\n"
+                    "- Issue \"{{tag}}\" occurred {{count}} times across {{total_runs}} test runs\n"
+                    "- Sample annotator notes: {{sample_notes}}\n"
+                    "- Number of incorrect action annotations: {{action_issues_count}}\n"
                     "{{dedup_section}}\n"
                     "Based on these specific failures and tool-level patterns, provide a "
                     "targeted improvement that addresses the root cause.\n"
-                    "{{rubric_section}}\n"
                     "Respond as JSON with these exact fields:\n{{json_fields}}"
                 ),
             },
@@ -1901,6 +2059,41 @@ class SQLiteService:
             await db.commit()
         return data_dict
 
+    async def create_cost_records(self, records: list) -> int:
+        """Store several cost records in one transaction."""
+        if not records:
+            return 0
+        await self._ensure_initialized()
+        rows = []
+        for record in records:
+            data_dict = record if isinstance(record, dict) else record.model_dump(mode='json')
+            rows.append((data_dict['id'], json.dumps(data_dict)))
+        async with self._conn() as db:
+            await db.executemany("INSERT INTO cost_records (id, data) VALUES (?, ?)", rows)
+            await db.commit()
+        return len(rows)
+
+    # ===== Judge Verdict Cache (Feature: judge-cache) =====
+
+    async def get_judge_cache_entry(self, key: str) -> Optional[str]:
+        """Return the stored judge response text for a prompt hash, if any."""
+        await self._ensure_initialized()
+        async with self._conn() as db:
+            cursor = await db.execute("SELECT content FROM judge_cache WHERE key = ?", (key,))
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def set_judge_cache_entry(self, key: str, content: str, model: str) -> None:
+        """Store (or replace) the judge response text for a prompt hash."""
+        from datetime import datetime, timezone
+        await self._ensure_initialized()
+        async with self._conn() as db:
+            await db.execute(
+                "INSERT OR REPLACE INTO judge_cache (key, content, model, created_at) VALUES (?, ?, ?, ?)",
+                (key, content, model, datetime.now(timezone.utc).isoformat())
+            )
+            await db.commit()
+
     async def list_cost_records(self, evaluation_id: str = None, agent_id: str = None, limit: int = 500) -> list:
         """List cost records, optionally filtered."""
         await self._ensure_initialized()
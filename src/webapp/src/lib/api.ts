@@ -656,6 +656,8 @@ class ApiClient {
 		timeout_seconds?: number;
 		verbose_logging?: boolean;
 		demo_mode?: boolean;
+		judge_cache_enabled?: boolean;
+		fast_fail_enabled?: boolean;
 	}): Promise<EvaluationRun> {
 		const response = await fetch(`${this.baseUrl}/evaluations`, {
 			method: "POST",
@@ -164,6 +164,20 @@ def mock_cosmos_service():
     return mock
 
 
+# ==============================================================================
+# SQLite Database Service
+# ==============================================================================
+
+@pytest.fixture
+def sqlite_service(tmp_path):
+    """Create a real SQLiteService backed by a throwaway database file."""
+    from src.api.sqlite_service import SQLiteService
+
+    service = SQLiteService()
+    service._db_path = str(tmp_path / "evals.db")
+    return service
+
+
 # ==============================================================================
 # FastAPI Test Client Fixtures
 # ==============================================================================
@@ -0,0 +1,195 @@
+"""
+Integration Tests for SQLiteService Evaluation Updates
+
+Tests the server-side JSON updates used while an evaluation is running
+(result appends, status history, warnings) against a real SQLite file.
+"""
+
+import pytest
+
+
+def _make_run(status="running", **kwargs):
+    from src.api.models import EvaluationRun, EvaluationRunStatus
+
+    return EvaluationRun(
+        name="Test Run",
+        dataset_id="ds_123",
+        agent_id="agent_123",
+        agent_endpoint="http://localhost:8002/agents/mock/invoke",
+        status=EvaluationRunStatus(status),
+        **kwargs,
+    )
+
+
+def _make_result(testcase_id, passed):
+    from src.api.models import TestCaseResult
+
+    return TestCaseResult(
+        testcase_id=testcase_id,
+        passed=passed,
+        response_from_agent="ok",
+        expected_tools=[],
+        tool_expectations=[],
+    )
+
+
+def _make_entry(message):
+    from src.api.models import StatusHistoryEntry
+
+    return StatusHistoryEntry(message=message)
+
+
+class TestAppendTestResults:
+    """Tests for appending results and bumping the run counters in SQL."""
+
+    @pytest.mark.asyncio
+    async def test_appends_results_in_order(self, sqlite_service):
+        """Results should be appended to test_cases in the order given."""
+        run = await sqlite_service.create_evaluation_run(_make_run(total_tests=3, in_progress_tests=3))
+
+        await sqlite_service.append_test_results(run.id, [_make_result("tc_1", True), _make_result("tc_2", False)])
+        await sqlite_service.append_test_results(run.id, [_make_result("tc_3", True)])
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert [tc.testcase_id for tc in stored.test_cases] == ["tc_1", "tc_2", "tc_3"]
+        assert [tc.passed for tc in stored.test_cases] == [True, False, True]
+
+    @pytest.mark.asyncio
+    async def test_updates_counters(self, sqlite_service):
+        """Completed, passed, failed and in-progress counters should track the appended results."""
+        run = await sqlite_service.create_evaluation_run(_make_run(total_tests=4, in_progress_tests=4))
+
+        await sqlite_service.append_test_results(run.id, [
+            _make_result("tc_1", True),
+            _make_result("tc_2", False),
+            _make_result("tc_3", True),
+        ])
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert stored.completed_tests == 3
+        assert stored.passed_count == 2
+        assert stored.failed_tests == 1
+        assert stored.in_progress_tests == 1
+
+    @pytest.mark.asyncio
+    async def test_in_progress_never_negative(self, sqlite_service):
+        """in_progress_tests should stop at zero when more results arrive than were started."""
+        run = await sqlite_service.create_evaluation_run(_make_run(in_progress_tests=1))
+
+        await sqlite_service.append_test_results(run.id, [_make_result("tc_1", True), _make_result("tc_2", True)])
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert stored.in_progress_tests == 0
+        assert stored.completed_tests == 2
+
+
+class TestAppendStatusHistory:
+    """Tests for the capped status history append."""
+
+    @pytest.mark.asyncio
+    async def test_appends_entry_and_sets_message(self, sqlite_service):
+        """A running evaluation should get the entry appended and status_message set."""
+        run = await sqlite_service.create_evaluation_run(_make_run())
+
+        applied = await sqlite_service.append_status_history(run.id, _make_entry("Running test 1"))
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert applied is True
+        assert stored.status_message == "Running test 1"
+        assert [e.message for e in stored.status_history] == ["Running test 1"]
+
+    @pytest.mark.asyncio
+    async def test_caps_history_at_max_entries(self, sqlite_service):
+        """The oldest entries should be dropped once max_entries is reached."""
+        run = await sqlite_service.create_evaluation_run(_make_run())
+
+        for i in range(5):
+            await sqlite_service.append_status_history(run.id, _make_entry(f"msg {i}"), max_entries=3)
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert [e.message for e in stored.status_history] == ["msg 2", "msg 3", "msg 4"]
+        assert stored.status_message == "msg 4"
+
+    @pytest.mark.asyncio
+    async def test_default_cap_is_100(self, sqlite_service):
+        """Without max_entries the history should be capped at 100 entries."""
+        run = await sqlite_service.create_evaluation_run(_make_run())
+
+        for i in range(105):
+            await sqlite_service.append_status_history(run.id, _make_entry(f"msg {i}"))
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert len(stored.status_history) == 100
+        assert stored.status_history[0].message == "msg 5"
+        assert stored.status_history[-1].message == "msg 104"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", ["pending", "completed", "failed", "cancelled"])
+    async def test_ignored_unless_running(self, sqlite_service, status):
+        """Runs that are not 'running' should be left untouched."""
+        run = await sqlite_service.create_evaluation_run(_make_run(status=status))
+
+        applied = await sqlite_service.append_status_history(run.id, _make_entry("late message"), rate_limit_wait=2.0)
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert applied is False
+        assert stored.status_history == []
+        assert stored.status_message is None
+        assert stored.total_rate_limit_hits == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_wait_bumps_stats(self, sqlite_service):
+        """rate_limit_wait should bump the aggregate rate-limit statistics."""
+        run = await sqlite_service.create_evaluation_run(_make_run())
+
+        await sqlite_service.append_status_history(run.id, _make_entry("rate limited"), rate_limit_wait=1.5)
+        await sqlite_service.append_status_history(run.id, _make_entry("rate limited"), rate_limit_wait=2.5)
+        await sqlite_service.append_status_history(run.id, _make_entry("progress"))
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert stored.total_rate_limit_hits == 2
+        assert stored.total_retry_wait_seconds == pytest.approx(4.0)
+
+
+class TestAddEvaluationWarnings:
+    """Tests for set-like warning inserts."""
+
+    @pytest.mark.asyncio
+    async def test_adds_new_warnings(self, sqlite_service):
+        """New warnings should be appended and counted."""
+        run = await sqlite_service.create_evaluation_run(_make_run())
+
+        added = await sqlite_service.add_evaluation_warnings(run.id, ["w1", "w2"])
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert added == 2
+        assert stored.warnings == ["w1", "w2"]
+
+    @pytest.mark.asyncio
+    async def test_skips_duplicates(self, sqlite_service):
+        """Duplicates within the batch or already stored should not be added again."""
+        run = await sqlite_service.create_evaluation_run(_make_run(warnings=["w1"]))
+
+        added = await sqlite_service.add_evaluation_warnings(run.id, ["w1", "w2", "w2", "w3"])
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert added == 2
+        assert stored.warnings == ["w1", "w2", "w3"]
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_returns_zero(self, sqlite_service):
+        """An empty batch should add nothing."""
+        run = await sqlite_service.create_evaluation_run(_make_run())
+
+        assert await sqlite_service.add_evaluation_warnings(run.id, []) == 0
+
+    @pytest.mark.asyncio
+    async def test_single_warning_helper(self, sqlite_service):
+        """add_evaluation_warning should report whether the warning was new."""
+        run = await sqlite_service.create_evaluation_run(_make_run())
+
+        assert await sqlite_service.add_evaluation_warning(run.id, "w1") is True
+        assert await sqlite_service.add_evaluation_warning(run.id, "w1") is False
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert stored.warnings == ["w1"]
@@ -832,3 +832,189 @@ class TestCancelDeleteEvaluationFunctional:
             response = client.delete("/api/evaluations/non_existent")
             
             assert response.status_code == 404
+
+
+# =============================================================================
+# Proposal Generation Stream - Job Queue Backpressure
+# =============================================================================
+
+def _sse_events(frames):
+    """Parse SSE frames (possibly several coalesced into one write) into dicts."""
+    import json
+
+    events = []
+    for frame in frames:
+        for line in frame.split("\n\n"):
+            if line.startswith("data: "):
+                events.append(json.loads(line[len("data: "):]))
+    return events
+
+
+class TestProposalGenerationJob:
+    """Tests for _GenerationJob.publish/drain and the proposal SSE event generator."""
+
+    @pytest.fixture
+    def generation_env(self, app_with_mocks):
+        """Patched controllers with a controllable proposal stream; yields (controllers, gate)."""
+        from src.api import controllers
+
+        _, mock_db, mock_evaluator = app_with_mocks
+        mock_db.get_agent = AsyncMock(return_value={"id": "agent-1"})
+        gate = {"count": 20, "release": None, "fail_after": None, "skipped": []}
+
+        async def proposal_stream(agent_id, evaluation_ids, judge_rubric=None, include_reasoning=False):
+            for tag in gate["skipped"]:
+                yield {"_status": True, "pattern": tag, "message": "unchanged evidence; pending proposal prop-old kept"}
+            for i in range(gate["count"]):
+                if gate["fail_after"] == i:
+                    raise RuntimeError("LLM exploded")
+                yield {"id": f"prop-{i}", "title": f"Proposal {i}", "status": "pending"}
+            if gate["release"] is not None:
+                await gate["release"].wait()
+
+        mock_evaluator.generate_prompt_proposals_stream = proposal_stream
+        yield controllers, gate
+        job = controllers._active_proposal_generations.pop("agent-1", None)
+        if job is not None and job.task is not None:
+            job.task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_publish_blocks_for_slow_consumer(self):
+        """With a consumer attached, publish should wait for queue space instead of dropping."""
+        import asyncio
+        from src.api.controllers import _GenerationJob, _JOB_QUEUE_MAXSIZE
+
+        job = _GenerationJob(agent_id="agent-1", cancel_event=asyncio.Event(), started_at="now", consumers=1)
+        for i in range(_JOB_QUEUE_MAXSIZE):
+            await job.publish({"_type": "proposal", "data": i})
+
+        blocked = asyncio.create_task(job.publish({"_type": "proposal", "data": "last"}))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+
+        assert job.queue.get_nowait()["data"] == 0
+        await asyncio.wait_for(blocked, timeout=1)
+        assert [job.queue.get_nowait()["data"] for _ in range(_JOB_QUEUE_MAXSIZE)] == [*range(1, _JOB_QUEUE_MAXSIZE), "last"]
+
+    @pytest.mark.asyncio
+    async def test_publish_drops_oldest_without_consumers(self):
+        """With nobody listening, publish should never block and keep the newest messages."""
+        import asyncio
+        from src.api.controllers import _GenerationJob, _JOB_QUEUE_MAXSIZE
+
+        job = _GenerationJob(agent_id="agent-1", cancel_event=asyncio.Event(), started_at="now")
+        for i in range(_JOB_QUEUE_MAXSIZE + 5):
+            await asyncio.wait_for(job.publish({"_type": "proposal", "data": i}), timeout=1)
+
+        assert job.queue.qsize() == _JOB_QUEUE_MAXSIZE
+        assert job.queue.get_nowait()["data"] == 5
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_blocks_producer(self, generation_env):
+        """A consumer that stops reading should hold the producer at the queue limit."""
+        import asyncio
+        controllers, _ = generation_env
+
+        response = await controllers.generate_proposals_stream("agent-1")
+        body = response.body_iterator
+        await body.__anext__()  # "analyzing" status — consumer is now attached
+        job = controllers._active_proposal_generations["agent-1"]
+        await asyncio.sleep(0.05)
+
+        assert job.consumers == 1
+        assert job.queue.full()
+        assert not job.task.done()
+        # Queue is full and one more proposal is waiting in put()
+        assert job.proposals_generated == controllers._JOB_QUEUE_MAXSIZE + 1
+
+        await body.aclose()
+
+    @pytest.mark.asyncio
+    async def test_disconnect_unblocks_producer(self, generation_env):
+        """A consumer going away should drain the queue and let a producer stuck in put() finish."""
+        import asyncio
+        controllers, gate = generation_env
+
+        response = await controllers.generate_proposals_stream("agent-1")
+        body = response.body_iterator
+        await body.__anext__()
+        job = controllers._active_proposal_generations["agent-1"]
+        await asyncio.sleep(0.05)
+        assert job.queue.full() and not job.task.done()
+
+        await body.aclose()  # client disconnect
+
+        await asyncio.wait_for(job.task, timeout=1)
+        assert job.consumers == 0
+        assert job.completed
+        assert job.proposals_generated == gate["count"]
+
+    @pytest.mark.asyncio
+    async def test_done_delivered_to_slow_consumer(self, generation_env):
+        """Every proposal and the final done event should reach a consumer that reads slowly."""
+        import asyncio
+        controllers, gate = generation_env
+
+        response = await controllers.generate_proposals_stream("agent-1")
+        frames = []
+        async for frame in response.body_iterator:
+            frames.append(frame)
+            await asyncio.sleep(0.005)
+
+        events = _sse_events(frames)
+        assert [e["id"] for e in events if "id" in e] == [f"prop-{i}" for i in range(gate["count"])]
+        assert events[-1] == {"done": True, "total": gate["count"], "errors": [], "cancelled": False}
+
+    @pytest.mark.asyncio
+    async def test_done_delivered_after_fatal_error(self, generation_env):
+        """A generation failure should be reported and still be followed by done."""
+        controllers, gate = generation_env
+        gate["fail_after"] = 3
+
+        response = await controllers.generate_proposals_stream("agent-1")
+        events = _sse_events([frame async for frame in response.body_iterator])
+
+        assert events[-2] == {"error": "LLM exploded"}
+        assert events[-1]["done"] is True
+        assert events[-1]["total"] == 3
+
+    @pytest.mark.asyncio
+    async def test_done_delivered_to_late_consumer(self, generation_env):
+        """A consumer attaching after the queue overflowed unattended should still end with done."""
+        import asyncio
+        controllers, gate = generation_env
+        gate["release"] = asyncio.Event()
+
+        await controllers.generate_proposals_stream("agent-1")  # nobody reads this stream
+        job = controllers._active_proposal_generations["agent-1"]
+        await asyncio.sleep(0.05)
+        assert job.proposals_generated == gate["count"]  # producer never blocked
+
+        response = await controllers.generate_proposals_stream("agent-1")  # page reload attaches
+        assert controllers._active_proposal_generations["agent-1"] is job
+        body = response.body_iterator
+        frames = [await body.__anext__()]
+        gate["release"].set()
+        frames += [frame async for frame in body]
+
+        events = _sse_events(frames)
+        assert events[-1]["done"] is True
+        assert events[-1]["total"] == gate["count"]
+
+    @pytest.mark.asyncio
+    async def test_skipped_pattern_is_reported_as_status(self, generation_env):
+        """Patterns skipped for unchanged evidence should stream as status events, not proposals."""
+        controllers, gate = generation_env
+        gate["count"] = 1
+        gate["skipped"] = ["wrong_tool"]
+
+        response = await controllers.generate_proposals_stream("agent-1")
+        events = _sse_events([frame async for frame in response.body_iterator])
+
+        assert {
+            "status": "skipped",
+            "pattern": "wrong_tool",
+            "message": "unchanged evidence; pending proposal prop-old kept",
+        } in events
+        assert [e["id"] for e in events if "id" in e] == ["prop-0"]
+        assert events[-1]["total"] == 1
@@ -0,0 +1,646 @@
+"""
+Unit Tests for EvaluatorService
+
+Tests evaluator internals (buffered result writes, streamed completions,
+comparison explanations, the judge cache, combined judging) against a real
+SQLite file and fake LLM clients. No agent or LLM endpoint is contacted.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+async def evaluator(sqlite_service, monkeypatch):
+    """EvaluatorService over a throwaway database, with a short flush window."""
+    from src.api import config
+    from src.api.evaluator_service import EvaluatorService
+
+    monkeypatch.setattr(config, "RESULT_FLUSH_DELAY_SECONDS", 0.01)
+    service = EvaluatorService(sqlite_service, max_concurrent_tests=4)
+    yield service
+    await service.aclose()
+
+
+def _make_run(**kwargs):
+    from src.api.models import EvaluationRun, EvaluationRunStatus
+
+    fields = {
+        "name": "Test Run",
+        "dataset_id": "ds_123",
+        "agent_id": "agent_123",
+        "agent_endpoint": "http://localhost:8002/agents/mock/invoke",
+        "status": EvaluationRunStatus.running,
+    }
+    fields.update(kwargs)
+    return EvaluationRun(**fields)
+
+
+def _make_result(testcase_id, passed=True, retry_count=0):
+    from src.api.models import TestCaseResult
+
+    return TestCaseResult(
+        testcase_id=testcase_id,
+        passed=passed,
+        response_from_agent="ok",
+        expected_tools=[],
+        tool_expectations=[],
+        retry_count=retry_count,
+    )
+
+
+def _chunk(content=None, thinking=None, usage=None):
+    """A streamed chat-completion chunk; content=None with usage set is the final usage-only chunk."""
+    if content is None and thinking is None:
+        return SimpleNamespace(choices=[], usage=usage)
+    delta = SimpleNamespace(content=content, thinking=thinking)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=usage)
+
+
+class _FakeStream:
+    """Async-iterable stand-in for an OpenAI chat-completion stream."""
+
+    def __init__(self, chunks):
+        self._chunks = list(chunks)
+        self.consumed = 0
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.consumed >= len(self._chunks):
+            raise StopAsyncIteration
+        self.consumed += 1
+        return self._chunks[self.consumed - 1]
+
+
+class TestResultRecording:
+    """Tests for _update_eval_run_with_test_result and force_flush."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_results_are_all_written(self, evaluator, sqlite_service):
+        """Results recorded concurrently should all land in the DB after force_flush."""
+        run = await sqlite_service.create_evaluation_run(_make_run(total_tests=6, in_progress_tests=6))
+        results = [
+            _make_result(f"tc_{i}", passed=i % 3 != 0, retry_count=1 if i == 4 else 0)
+            for i in range(6)
+        ]
+
+        await asyncio.gather(*(evaluator._update_eval_run_with_test_result(run, r) for r in results))
+        await evaluator.force_flush(run.id)
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert sorted(tc.testcase_id for tc in stored.test_cases) == [f"tc_{i}" for i in range(6)]
+        assert stored.completed_tests == 6
+        assert stored.passed_count == 4
+        assert stored.failed_tests == 2
+        assert stored.in_progress_tests == 0
+        assert stored.warnings == ["Test tc_4 required 1 retry(ies) due to rate limits"]
+        assert all(tc.failure_mode for tc in stored.test_cases if not tc.passed)
+        assert run.id not in evaluator._flush_tasks
+
+    @pytest.mark.asyncio
+    async def test_concurrent_results_share_one_write(self, evaluator, sqlite_service, monkeypatch):
+        """A burst of results inside the flush window should be written in one batch."""
+        run = await sqlite_service.create_evaluation_run(_make_run(total_tests=5, in_progress_tests=5))
+        batches = []
+        append = sqlite_service.append_test_results
+
+        async def recording_append(evaluation_id, test_results):
+            batches.append([tr.testcase_id for tr in test_results])
+            return await append(evaluation_id, test_results)
+
+        monkeypatch.setattr(sqlite_service, "append_test_results", recording_append)
+
+        await asyncio.gather(*(
+            evaluator._update_eval_run_with_test_result(run, _make_result(f"tc_{i}")) for i in range(5)
+        ))
+        await evaluator.force_flush(run.id)
+
+        assert batches == [[f"tc_{i}" for i in range(5)]]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_result_decrements_in_progress(self, evaluator, sqlite_service):
+        """A second result for the same test case should be dropped and release its in-progress slot."""
+        run = await sqlite_service.create_evaluation_run(_make_run(total_tests=1, in_progress_tests=2))
+
+        await evaluator._update_eval_run_with_test_result(run, _make_result("tc_1", passed=True))
+        await evaluator._update_eval_run_with_test_result(run, _make_result("tc_1", passed=False))
+        await evaluator.force_flush(run.id)
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert [tc.testcase_id for tc in stored.test_cases] == ["tc_1"]
+        assert stored.test_cases[0].passed is True
+        assert stored.completed_tests == 1
+        assert stored.failed_tests == 0
+        assert stored.in_progress_tests == 0
+
+    @pytest.mark.asyncio
+    async def test_result_already_on_run_is_not_rewritten(self, evaluator, sqlite_service):
+        """A result for a test case already stored on the loaded run should only decrement in-progress."""
+        run = await sqlite_service.create_evaluation_run(_make_run(total_tests=1, in_progress_tests=1))
+        await sqlite_service.append_test_results(run.id, [_make_result("tc_1")])
+        await sqlite_service.bump_in_progress(run.id, 1)
+        run = await sqlite_service.get_evaluation_run(run.id)
+
+        await evaluator._update_eval_run_with_test_result(run, _make_result("tc_1"))
+        await evaluator.force_flush(run.id)
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert len(stored.test_cases) == 1
+        assert stored.completed_tests == 1
+        assert stored.in_progress_tests == 0
+
+    @pytest.mark.asyncio
+    async def test_force_flush_awaits_in_flight_flush(self, evaluator, sqlite_service, monkeypatch):
+        """force_flush should wait for a write that is already running, and for flushes chained after it."""
+        run = await sqlite_service.create_evaluation_run(_make_run(total_tests=2, in_progress_tests=2))
+        write_started = asyncio.Event()
+        release_write = asyncio.Event()
+        append = sqlite_service.append_test_results
+
+        async def slow_append(evaluation_id, test_results):
+            write_started.set()
+            await release_write.wait()
+            return await append(evaluation_id, test_results)
+
+        monkeypatch.setattr(sqlite_service, "append_test_results", slow_append)
+
+        await evaluator._update_eval_run_with_test_result(run, _make_result("tc_1"))
+        await asyncio.wait_for(write_started.wait(), timeout=1)
+        # Recorded while the first write is in flight — goes into a second, chained flush
+        await evaluator._update_eval_run_with_test_result(run, _make_result("tc_2"))
+
+        flush = asyncio.create_task(evaluator.force_flush(run.id))
+        await asyncio.sleep(0.05)
+        assert not flush.done()
+
+        release_write.set()
+        await asyncio.wait_for(flush, timeout=1)
+
+        stored = await sqlite_service.get_evaluation_run(run.id)
+        assert [tc.testcase_id for tc in stored.test_cases] == ["tc_1", "tc_2"]
+        assert stored.completed_tests == 2
+
+    @pytest.mark.asyncio
+    async def test_force_flush_without_pending_results(self, evaluator):
+        """force_flush should return immediately when nothing is buffered."""
+        await asyncio.wait_for(evaluator.force_flush("eval_missing"), timeout=1)
+
+
+class TestCollectStream:
+    """Tests for _collect_stream, which rebuilds a completion from streamed chunks."""
+
+    @pytest.mark.asyncio
+    async def test_plain_stream_is_collected(self):
+        """Content, thinking and usage should be reassembled in order."""
+        from src.api.evaluator_service import _collect_stream
+
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=4)
+        stream = _FakeStream([
+            _chunk(thinking="hmm "), _chunk(thinking="ok"),
+            _chunk("Hello"), _chunk(", world"), _chunk(usage=usage),
+        ])
+
+        response = await _collect_stream(stream)
+
+        assert response.choices[0].message.content == "Hello, world"
+        assert response.choices[0].message.thinking == "hmm ok"
+        assert response.usage is usage
+
+    @pytest.mark.asyncio
+    async def test_prose_first_reply_is_read_in_full(self):
+        """A reply that does not open with '{' should be collected completely."""
+        from src.api.evaluator_service import _collect_stream
+
+        stream = _FakeStream([
+            _chunk("<think>check the tools</think>\n"),
+            _chunk('{"passed": true, '), _chunk('"reasoning": "ok"}'),
+            _chunk(" Done."),
+        ])
+
+        response = await _collect_stream(stream, stop_after_json=True)
+
+        assert response.choices[0].message.content == (
+            '<think>check the tools</think>\n{"passed": true, "reasoning": "ok"} Done.'
+        )
+
+    @pytest.mark.asyncio
+    async def test_braces_inside_strings_do_not_close_the_object(self):
+        """Braces inside JSON strings should not end the object early."""
+        from src.api.evaluator_service import _collect_stream, _extract_json
+
+        stream = _FakeStream([
+            _chunk('  {"reasoning": "called it with {to: '),
+            _chunk('x} and }}", '),
+            _chunk('"passed": true}'),
+            _chunk("\n\nExtra commentary."),
+        ])
+
+        response = await _collect_stream(stream, stop_after_json=True)
+
+        content = response.choices[0].message.content
+        assert "Extra commentary" not in content
+        assert _extract_json(content) == {"reasoning": "called it with {to: x} and }}", "passed": True}
+
+    @pytest.mark.asyncio
+    async def test_escaped_quotes_keep_string_state(self):
+        """An escaped quote should not end the string, and an escaped backslash should not escape the quote."""
+        from src.api.evaluator_service import _collect_stream, _extract_json
+
+        stream = _FakeStream([
+            _chunk('{"reasoning": "said \\"}\\" then '),
+            _chunk('C:\\\\", "passed": false}'),
+            _chunk(" trailing"),
+        ])
+
+        response = await _collect_stream(stream, stop_after_json=True)
+
+        content = response.choices[0].message.content
+        assert "trailing" not in content
+        assert _extract_json(content) == {"reasoning": 'said "}" then C:\\', "passed": False}
+
+    @pytest.mark.asyncio
+    async def test_stops_after_short_tail(self):
+        """Reading should stop _JSON_TAIL_CHUNKS chunks after the object closes, dropping trailing text."""
+        from src.api.evaluator_service import _collect_stream, _JSON_TAIL_CHUNKS
+
+        trailing = [_chunk(f" more {i}") for i in range(10)]
+        stream = _FakeStream([_chunk('{"passed": true, "reasoning": "ok"}'), *trailing])
+
+        response = await _collect_stream(stream, stop_after_json=True)
+
+        assert response.choices[0].message.content == '{"passed": true, "reasoning": "ok"}'
+        assert stream.consumed == 1 + _JSON_TAIL_CHUNKS
+
+    @pytest.mark.asyncio
+    async def test_usage_only_final_chunk_is_kept(self):
+        """The usage record following the finish chunk should be read, then reading should stop."""
+        from src.api.evaluator_service import _collect_stream, _usage_tokens
+
+        usage = SimpleNamespace(prompt_tokens=120, completion_tokens=45)
+        stream = _FakeStream([
+            _chunk('{"passed": false,'), _chunk(' "reasoning": "no"}'),
+            _chunk(""),  # finish_reason chunk
+            _chunk(usage=usage),
+            _chunk(" never read"),
+        ])
+
+        response = await _collect_stream(stream, stop_after_json=True)
+
+        assert response.usage is usage
+        assert _usage_tokens(response) == (120, 45)
+        assert stream.consumed == 4
+
+    @pytest.mark.asyncio
+    async def test_usage_estimated_when_tail_has_none(self):
+        """Stopping before the usage record should estimate usage from the prompt and the output."""
+        from src.api.evaluator_service import _collect_stream, _estimate_tokens, _usage_tokens
+
+        verdict = '{"passed": true, "reasoning": "The agent called sendMail."}'
+        prompt = "judge this assertion " * 20
+        stream = _FakeStream([_chunk(verdict), *[_chunk(" and another thing") for _ in range(8)]])
+
+        response = await _collect_stream(stream, stop_after_json=True, prompt_text=prompt)
+
+        assert _usage_tokens(response) == (_estimate_tokens(prompt), _estimate_tokens(verdict))
+
+
+class TestExplainComparison:
+    """Tests for explain_comparison prompt assembly with a stubbed LLM client."""
+
+    @staticmethod
+    def _stub_llm(reply):
+        from unittest.mock import AsyncMock
+
+        message = SimpleNamespace(content=reply)
+        create = AsyncMock(return_value=SimpleNamespace(choices=[SimpleNamespace(message=message)]))
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))), create
+
+    @pytest.mark.asyncio
+    async def test_unchanged_failing_test_is_explained(self, evaluator, sqlite_service):
+        """A test failing in both runs should land in the UNCHANGED section without errors."""
+        from datetime import datetime, timedelta, timezone
+
+        older = datetime.now(timezone.utc) - timedelta(hours=1)
+        baseline = _make_run(id="eval_a", name="Baseline", created_at=older, total_tests=2, passed_count=1, test_cases=[
+            _make_result("tc_pass", passed=True), _make_result("tc_fail", passed=False),
+        ])
+        failing = _make_result("tc_fail", passed=False)
+        failing.execution_error = "Tool sendMail timed out"
+        latest = _make_run(id="eval_b", name="Latest", total_tests=2, passed_count=1, test_cases=[
+            _make_result("tc_pass", passed=True), failing,
+        ])
+        await sqlite_service.create_evaluation_run(baseline)
+        await sqlite_service.create_evaluation_run(latest)
+        evaluator.openai_client, create = self._stub_llm("  Still failing: sendMail times out.  ")
+
+        # Argument order should not matter — the older run is the baseline
+        explanation = await evaluator.explain_comparison(latest.id, baseline.id)
+
+        assert explanation == "Still failing: sendMail times out."
+        messages = create.await_args.kwargs["messages"]
+        system_prompt, user_prompt = messages[0]["content"], messages[1]["content"]
+        assert '- Baseline: "Baseline"' in user_prompt
+        assert "0 improved, 0 regressed, 2 unchanged" in user_prompt
+        assert "## UNCHANGED\n- 1 still passing, 1 still failing" in user_prompt
+        assert "Still-failing tests (investigate these next):" in user_prompt
+        assert "ERROR: Tool sendMail timed out" in user_prompt
+        assert "## Still Failing" in system_prompt
+        assert "## What Regressed" not in system_prompt
+
+
+class TestJudgeCache:
+    """Tests for _judge_completion response caching and in-flight sharing."""
+
+    @staticmethod
+    def _fake_llm(reply='{"passed": true, "reasoning": "ok"}', gate=None):
+        """Zero-arg judge call factory that counts how often the LLM is hit."""
+        calls = []
+
+        async def call_llm():
+            calls.append(reply)
+            if gate is not None:
+                await gate.wait()
+            message = SimpleNamespace(content=reply)
+            usage = SimpleNamespace(prompt_tokens=100, completion_tokens=10)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+        return call_llm, calls
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_llm(self, evaluator):
+        """A repeated prompt in a cache-enabled run should be answered without an LLM call."""
+        run = _make_run(judge_cache_enabled=True)
+        call_llm, calls = self._fake_llm()
+
+        first = await evaluator._judge_completion(run, "system", "judge this", call_llm)
+        second = await evaluator._judge_completion(run, "system", "judge this", call_llm)
+
+        assert len(calls) == 1
+        assert first.result.usage is not None
+        assert second.result.choices[0].message.content == '{"passed": true, "reasoning": "ok"}'
+        assert second.result.usage is None  # not billed twice
+
+    @pytest.mark.asyncio
+    async def test_persisted_entry_survives_restart(self, evaluator, sqlite_service):
+        """A fresh evaluator over the same DB should reuse the stored response."""
+        from src.api.evaluator_service import EvaluatorService
+
+        run = _make_run(judge_cache_enabled=True)
+        call_llm, calls = self._fake_llm()
+        await evaluator._judge_completion(run, "system", "judge this", call_llm)
+
+        restarted = EvaluatorService(sqlite_service, max_concurrent_tests=4)
+        try:
+            cached = await restarted._judge_completion(run, "system", "judge this", call_llm)
+        finally:
+            await restarted.aclose()
+
+        assert len(calls) == 1
+        assert cached.result.choices[0].message.content == '{"passed": true, "reasoning": "ok"}'
+        assert cached.result.usage is None
+
+    @pytest.mark.asyncio
+    async def test_non_json_reply_is_not_cached(self, evaluator, sqlite_service):
+        """A reply that does not parse as JSON should be neither remembered nor persisted."""
+        run = _make_run(judge_cache_enabled=True)
+        call_llm, calls = self._fake_llm(reply="I think it passed.")
+
+        await evaluator._judge_completion(run, "system", "judge this", call_llm)
+        await evaluator._judge_completion(run, "system", "judge this", call_llm)
+
+        assert len(calls) == 2
+        assert len(evaluator._judge_cache) == 0
+        async with sqlite_service._conn() as db:
+            cursor = await db.execute("SELECT COUNT(*) FROM judge_cache")
+            assert (await cursor.fetchone())[0] == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled_run_always_calls_llm(self, evaluator):
+        """Runs without judge_cache_enabled should never reuse an earlier response."""
+        run = _make_run(judge_cache_enabled=False)
+        call_llm, calls = self._fake_llm()
+
+        await evaluator._judge_completion(run, "system", "judge this", call_llm)
+        await evaluator._judge_completion(run, "system", "judge this", call_llm)
+
+        assert len(calls) == 2
+        assert len(evaluator._judge_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_prompts_share_one_call(self, evaluator):
+        """Identical prompts in flight at the same time should make a single LLM call."""
+        run = _make_run()
+        gate = asyncio.Event()
+        call_llm, calls = self._fake_llm(gate=gate)
+
+        pending = [
+            asyncio.create_task(evaluator._judge_completion(run, "system", "judge this", call_llm))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        gate.set()
+        results = await asyncio.wait_for(asyncio.gather(*pending), timeout=1)
+
+        assert len(calls) == 1
+        assert [r.result.choices[0].message.content for r in results] == ['{"passed": true, "reasoning": "ok"}'] * 3
+        assert sum(r.result.usage is not None for r in results) == 1  # only the caller that paid is billed
+        assert evaluator._judge_inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_inflight_calls_not_shared_across_uncached_runs(self, evaluator):
+        """Runs without the judge cache should each send (and pay for) their own call."""
+        runs = [_make_run(id="eval_a"), _make_run(id="eval_b")]
+        gate = asyncio.Event()
+        call_llm, calls = self._fake_llm(gate=gate)
+
+        pending = [
+            asyncio.create_task(evaluator._judge_completion(run, "system", "judge this", call_llm))
+            for run in runs
+        ]
+        await asyncio.sleep(0.01)
+        gate.set()
+        results = await asyncio.wait_for(asyncio.gather(*pending), timeout=1)
+
+        assert len(calls) == 2
+        assert all(r.result.usage is not None for r in results)
+        assert evaluator._judge_inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_inflight_calls_shared_across_cached_runs(self, evaluator):
+        """Runs that opted into the judge cache may join each other's in-flight calls."""
+        runs = [_make_run(id="eval_a", judge_cache_enabled=True), _make_run(id="eval_b", judge_cache_enabled=True)]
+        gate = asyncio.Event()
+        call_llm, calls = self._fake_llm(gate=gate)
+
+        pending = [
+            asyncio.create_task(evaluator._judge_completion(run, "system", "judge this", call_llm))
+            for run in runs
+        ]
+        await asyncio.sleep(0.01)
+        gate.set()
+        await asyncio.wait_for(asyncio.gather(*pending), timeout=1)
+
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_least_recently_used(self, evaluator, monkeypatch):
+        """The in-process cache should hold JUDGE_CACHE_MAX_ENTRIES responses and evict the least recently used."""
+        from src.api import config
+
+        monkeypatch.setattr(config, "JUDGE_CACHE_MAX_ENTRIES", 2)
+        run = _make_run(judge_cache_enabled=True)
+
+        for prompt in ("a", "b"):
+            call_llm, _ = self._fake_llm(reply=f'{{"prompt": "{prompt}"}}')
+            await evaluator._judge_completion(run, "system", prompt, call_llm)
+        call_llm, calls = self._fake_llm()
+        await evaluator._judge_completion(run, "system", "a", call_llm)  # touch "a"
+        assert calls == []
+        call_llm, _ = self._fake_llm(reply='{"prompt": "c"}')
+        await evaluator._judge_completion(run, "system", "c", call_llm)
+
+        cached = [r.choices[0].message.content for r in evaluator._judge_cache.values()]
+        assert cached == ['{"prompt": "a"}', '{"prompt": "c"}']
+
+
+class TestCombinedJudgeCall:
+    """Tests for judging hybrid behavior and response quality assertions in one call."""
+
+    @pytest.mark.asyncio
+    async def test_hybrid_case_with_seeded_config_makes_one_call(self, evaluator, sqlite_service):
+        """A seeded judge config (no combined template of its own) should still judge a hybrid case in one call."""
+        import json
+        from unittest.mock import AsyncMock
+        from src.api.evaluator_service import _TestExecution
+        from src.api.models import BehaviorAssertion, ResponseQualityAssertion, TestCase
+
+        await sqlite_service.ensure_default_judge_configs()
+        judge_config = await sqlite_service.get_judge_config("default-binary", 1)
+        assert "user_prompt_template_combined" not in judge_config
+
+        run = _make_run()
+        run._cached_judge_config = judge_config
+        test_case = TestCase(
+            dataset_id="ds_123",
+            description="Reply to the client",
+            input="Tell the client the report is late",
+            expected_response="An apology email to the client",
+            behavior_assertions=[
+                BehaviorAssertion(assertion="Agent should call sendMail"),
+                BehaviorAssertion(assertion="Agent should not call deleteMail"),
+            ],
+            response_quality_expectation=ResponseQualityAssertion(assertion="Response apologises for the delay"),
+        )
+        assert test_case.assertion_mode == "hybrid"
+        test_exec = _TestExecution(test_case.id, run.id)
+        test_exec.status = "completed"
+        test_exec.agent_response = "I emailed the client to apologise."
+        test_exec.tool_calls = [{"name": "sendMail", "arguments": {"to": "client@example.com"}}]
+        test_exec.actual_tools = ["sendMail"]
+
+        verdicts = {"results": [
+            {"index": 0, "passed": True, "reasoning": "sendMail was called."},
+            {"index": 1, "passed": True, "reasoning": "deleteMail was not called."},
+            {"index": 2, "passed": False, "reasoning": "No apology in the response."},
+        ]}
+        message = SimpleNamespace(content=json.dumps(verdicts))
+        usage = SimpleNamespace(prompt_tokens=300, completion_tokens=40)
+        create = AsyncMock(return_value=SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage))
+        evaluator.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        await evaluator._judge_and_build_result(run, test_exec, test_case)
+
+        assert create.await_count == 1
+        messages = create.await_args.kwargs["messages"]
+        assert messages[0]["content"] == judge_config["system_prompt"]
+        assert "[2] Response apologises for the delay" in messages[1]["content"]
+        result = test_exec.test_case_result
+        assert [ba.passed for ba in result.behavior_assertions] == [True, True]
+        assert result.response_quality_assertion.passed is False
+        assert result.passed is False
+
+
+class TestSingleAssertionStreaming:
+    """Tests for the streamed single-assertion judge call."""
+
+    @staticmethod
+    def _case_and_exec(run):
+        from src.api.evaluator_service import _TestExecution
+        from src.api.models import TestCase
+
+        test_case = TestCase(
+            dataset_id="ds_123",
+            description="Reply to the client",
+            input="Tell the client the report is late",
+            expected_response="An apology email",
+        )
+        test_exec = _TestExecution(test_case.id, run.id)
+        test_exec.agent_response = "Sorry, the report is late."
+        return test_case, test_exec
+
+    async def _judge(self, evaluator, run):
+        test_case, test_exec = self._case_and_exec(run)
+        result = await evaluator._evaluate_single_assertion(
+            eval_run=run, assertion_text="Response apologises", tool_name=None, argument_name=None,
+            test_case=test_case, test_exec=test_exec, assertion_type="response_quality",
+        )
+        return result, test_exec
+
+    @pytest.mark.asyncio
+    async def test_stream_is_closed_once_verdict_is_complete(self, evaluator):
+        """A judge that keeps writing past the verdict should be cut off and still be billed."""
+        from unittest.mock import AsyncMock
+        from src.api.evaluator_service import _JSON_TAIL_CHUNKS
+
+        stream = _FakeStream([
+            _chunk('{"passed": true, '), _chunk('"reasoning": "It apologises."}'),
+            *[_chunk(" Additionally, ...") for _ in range(50)],
+        ])
+        create = AsyncMock(return_value=stream)
+        evaluator.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        result, test_exec = await self._judge(evaluator, _make_run())
+
+        assert result == {"passed": True, "reasoning": "It apologises."}
+        assert create.await_args.kwargs["stream"] is True
+        assert stream.consumed == 2 + _JSON_TAIL_CHUNKS
+        assert stream.closed
+        assert test_exec.judge_tokens_in > 0 and test_exec.judge_tokens_out > 0
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_streaming_is_rejected(self, evaluator):
+        """An endpoint that refuses streamed requests should get plain calls from then on."""
+        import httpx
+        import openai
+
+        verdict = SimpleNamespace(content='{"passed": false, "reasoning": "No apology."}')
+        plain = SimpleNamespace(choices=[SimpleNamespace(message=verdict)], usage=SimpleNamespace(prompt_tokens=50, completion_tokens=9))
+        calls = []
+
+        async def create(**kwargs):
+            calls.append(kwargs.get("stream", False))
+            if kwargs.get("stream"):
+                response = httpx.Response(400, request=httpx.Request("POST", "http://llm/v1/chat/completions"))
+                raise openai.BadRequestError("Unrecognized request argument supplied: stream_options", response=response, body=None)
+            return plain
+
+        evaluator.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        run = _make_run()
+
+        first, test_exec = await self._judge(evaluator, run)
+        second, _ = await self._judge(evaluator, run)
+
+        assert first == second == {"passed": False, "reasoning": "No apology."}
+        assert calls == [True, False, False]
+        assert (test_exec.judge_tokens_in, test_exec.judge_tokens_out) == (50, 9)
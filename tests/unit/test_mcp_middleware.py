@@ -0,0 +1,72 @@
+"""
+Unit Tests for the MCP Error-Handling Middleware
+
+Tests the early JSON validation of MCP request bodies using a minimal app.
+"""
+
+import pytest
+from fastapi import FastAPI, Request, status
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def mcp_client():
+    """Test client for an app with an echo route under /mcp and one outside it."""
+    from src.api.mcp_middleware import MCP400ErrorHandlerMiddleware
+
+    app = FastAPI()
+    app.add_middleware(MCP400ErrorHandlerMiddleware)
+
+    @app.post("/mcp/echo")
+    async def mcp_echo(request: Request):
+        return {"body": (await request.body()).decode()}
+
+    @app.post("/api/echo")
+    async def api_echo(request: Request):
+        return {"body": (await request.body()).decode()}
+
+    with TestClient(app) as client:
+        yield client
+
+
+class TestMCPBodyValidation:
+    """Tests for JSON validation of POST bodies on /mcp paths."""
+
+    def test_valid_json_is_forwarded(self, mcp_client):
+        """A well-formed body should reach the endpoint unchanged."""
+        body = '{"jsonrpc": "2.0", "method": "tools/list", "id": 1}'
+        response = mcp_client.post("/mcp/echo", content=body, headers={"Content-Type": "application/json"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["body"] == body
+
+    def test_malformed_json_is_rejected(self, mcp_client):
+        """A body that is not JSON should get a 400 before reaching the endpoint."""
+        response = mcp_client.post("/mcp/echo", content='{"jsonrpc": "2.0",', headers={"Content-Type": "application/json"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {
+            "error": "Bad Request",
+            "message": "Invalid JSON format in request body",
+            "path": "/mcp/echo",
+        }
+
+    @pytest.mark.parametrize("body", [
+        '{"value": NaN}',
+        '{"value": Infinity}',
+        '{"value": -Infinity}',
+        '{"value": 123456789012345678901234567890}',
+    ])
+    def test_json_accepted_by_stdlib_is_forwarded(self, mcp_client, body):
+        """Bodies that orjson rejects but json accepts should not be treated as malformed."""
+        response = mcp_client.post("/mcp/echo", content=body, headers={"Content-Type": "application/json"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["body"] == body
+
+    def test_non_mcp_paths_are_not_validated(self, mcp_client):
+        """Only /mcp paths should have their bodies checked."""
+        response = mcp_client.post("/api/echo", content="not json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["body"] == "not json"